@@ -0,0 +1,269 @@
+# admission.py
+"""
+Admission des exécutions du pipeline: classes de priorité et partage équitable.
+
+Chaque exécution demande une place à l'``AdmissionController`` du worker:
+- deux classes, ``interactive`` (servie en priorité stricte) et ``batch``
+- une capacité globale et un plafond par classe: le plafond ``batch``
+  inférieur à la capacité réserve des places aux requêtes interactives,
+  tandis que le lot occupe toutes les places restantes
+- dans une classe, les demandes en attente sont servies par file équitable
+  pondérée (start-time fair queuing) entre tenants (clé d'API ou client):
+  un gros lot d'un tenant ne retarde pas les demandes d'un autre
+- une demande partagée par plusieurs appelants (exécution single-flight)
+  passe dans la classe du plus prioritaire d'entre eux tant qu'elle attend
+Le temps d'attente de chaque classe est mesuré (``admission_wait_<classe>_seconds``).
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+from config import Config
+from metrics import metrics
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Ordre de service: une classe n'est servie que si les précédentes n'attendent plus de place
+PRIORITY_CLASSES = (INTERACTIVE, BATCH)
+
+DEFAULT_TENANT = "default"
+
+
+class AdmissionRejected(RuntimeError):
+    """File d'attente de la classe pleine: la demande est refusée"""
+
+
+class _Waiter:
+    __slots__ = ("future", "tenant", "start_tag")
+
+    def __init__(self, future: asyncio.Future, tenant: str, start_tag: float):
+        self.future = future
+        self.tenant = tenant
+        self.start_tag = start_tag
+
+
+class AdmissionTicket:
+    """
+    Place demandée pour une exécution partagée entre plusieurs appelants
+
+    Tant qu'elle attend, sa classe peut être relevée par un appelant plus
+    prioritaire qui la rejoint (voir ``AdmissionController.promote``).
+    """
+
+    def __init__(self, priority: Optional[str] = None, tenant: Optional[str] = None):
+        self.priority = priority
+        self.tenant = tenant or DEFAULT_TENANT
+        self.waiter: Optional[_Waiter] = None
+        self.admitted = False
+
+
+class FairQueue:
+    """
+    Demandes en attente d'une classe: une file FIFO par tenant, servies par
+    ordre d'étiquette de début virtuelle (coût 1 / poids du tenant)
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self._tenants: Dict[str, Deque[_Waiter]] = {}
+        self._last_finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self.size = 0
+
+    def _weight(self, tenant: str) -> float:
+        return max(self.weights.get(tenant, 1.0), 1e-6)
+
+    def push(self, future: asyncio.Future, tenant: str) -> _Waiter:
+        start_tag = max(self._virtual_time, self._last_finish.get(tenant, 0.0))
+        self._last_finish[tenant] = start_tag + 1.0 / self._weight(tenant)
+        waiter = _Waiter(future, tenant, start_tag)
+        self._tenants.setdefault(tenant, deque()).append(waiter)
+        self.size += 1
+        return waiter
+
+    def pop(self) -> Optional[_Waiter]:
+        if not self.size:
+            return None
+        tenant = min(self._tenants, key=lambda name: self._tenants[name][0].start_tag)
+        queue = self._tenants[tenant]
+        waiter = queue.popleft()
+        if not queue:
+            del self._tenants[tenant]
+        self.size -= 1
+        self._virtual_time = waiter.start_tag
+        # Tenants inactifs: leur avance est périmée, l'historique n'est pas conservé
+        for name in [name for name, finish in self._last_finish.items()
+                     if finish <= self._virtual_time and name not in self._tenants]:
+            del self._last_finish[name]
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        queue = self._tenants.get(waiter.tenant)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._tenants[waiter.tenant]
+            self.size -= 1
+
+    def tenants(self) -> Dict[str, int]:
+        return {name: len(queue) for name, queue in self._tenants.items()}
+
+
+class AdmissionController:
+    """Places d'exécution du worker, attribuées par priorité puis équitablement entre tenants"""
+
+    def __init__(self, capacity: int, class_limits: Dict[str, int],
+                 tenant_weights: Optional[Dict[str, float]] = None, max_queue: int = 0):
+        self.capacity = capacity
+        self.class_limits = {cls: min(capacity, class_limits.get(cls, capacity)) for cls in PRIORITY_CLASSES}
+        self.max_queue = max_queue
+        self._active = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._queues = {cls: FairQueue(tenant_weights or {}) for cls in PRIORITY_CLASSES}
+
+    @staticmethod
+    def normalize_priority(priority: Optional[str]) -> str:
+        if priority is None:
+            return INTERACTIVE
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Priorité inconnue: {priority} (disponibles: {', '.join(PRIORITY_CLASSES)})")
+        return priority
+
+    def _can_start(self, cls: str) -> bool:
+        return (sum(self._active.values()) < self.capacity
+                and self._active[cls] < self.class_limits[cls])
+
+    def _dispatch(self) -> None:
+        """Attribue les places libres aux demandes en attente, par ordre de priorité"""
+        for cls in PRIORITY_CLASSES:
+            queue = self._queues[cls]
+            while queue.size and self._can_start(cls):
+                waiter = queue.pop()
+                if waiter.future.done():
+                    continue
+                self._active[cls] += 1
+                waiter.future.set_result(True)
+        self._update_gauges()
+
+    def _release(self, cls: str) -> None:
+        self._active[cls] -= 1
+        self._dispatch()
+
+    def _update_gauges(self) -> None:
+        for cls in PRIORITY_CLASSES:
+            metrics.set_gauge(f"admission_active_{cls}", self._active[cls])
+            metrics.set_gauge(f"admission_queued_{cls}", self._queues[cls].size)
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None, tenant: Optional[str] = None,
+                   ticket: Optional[AdmissionTicket] = None):
+        """
+        Réserve une place pour la durée du bloc
+
+        ``ticket`` (à la place de ``priority`` et ``tenant``) permet de relever
+        la classe de la demande pendant son attente. Lève ``AdmissionRejected``
+        si la file de la classe est pleine et ``ValueError`` pour une priorité
+        inconnue.
+        """
+        if ticket is None:
+            ticket = AdmissionTicket(priority, tenant)
+        ticket.priority = self.normalize_priority(ticket.priority)
+        queue = self._queues[ticket.priority]
+        start = time.perf_counter()
+
+        if not queue.size and self._can_start(ticket.priority):
+            self._active[ticket.priority] += 1
+            self._update_gauges()
+        else:
+            if self.max_queue and queue.size >= self.max_queue:
+                metrics.increment(f"admission_rejected_{ticket.priority}")
+                raise AdmissionRejected(f"File d'attente {ticket.priority} pleine ({queue.size} demandes)")
+            ticket.waiter = queue.push(asyncio.get_running_loop().create_future(), ticket.tenant)
+            self._update_gauges()
+            try:
+                # La classe (et donc la file) peut changer pendant l'attente: relue ensuite
+                await ticket.waiter.future
+            except asyncio.CancelledError:
+                if ticket.waiter.future.done() and not ticket.waiter.future.cancelled():
+                    # Place attribuée au moment de l'annulation: elle est rendue
+                    self._release(ticket.priority)
+                else:
+                    self._queues[ticket.priority].remove(ticket.waiter)
+                    self._update_gauges()
+                raise
+            finally:
+                ticket.waiter = None
+
+        ticket.admitted = True
+        cls = ticket.priority
+        metrics.observe(f"admission_wait_{cls}_seconds", time.perf_counter() - start)
+        metrics.increment(f"admission_admitted_{cls}")
+        try:
+            yield
+        finally:
+            self._release(cls)
+
+    def promote(self, ticket: AdmissionTicket, priority: Optional[str]) -> bool:
+        """
+        Relève la classe d'une demande encore en attente (sans effet sinon)
+
+        La demande passe dans la file de la nouvelle classe, avec la même
+        place d'équité que toute nouvelle demande de son tenant.
+        """
+        cls = self.normalize_priority(priority)
+        current = self.normalize_priority(ticket.priority)
+        if ticket.admitted or PRIORITY_CLASSES.index(cls) >= PRIORITY_CLASSES.index(current):
+            return False
+        waiter = ticket.waiter
+        if waiter is not None:
+            if waiter.future.done():
+                # Place déjà attribuée dans la classe d'origine
+                return False
+            self._queues[current].remove(waiter)
+            ticket.waiter = self._queues[cls].push(waiter.future, ticket.tenant)
+        ticket.priority = cls
+        metrics.increment(f"admission_promoted_{current}")
+        self._dispatch()
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        classes = {}
+        for cls in PRIORITY_CLASSES:
+            classes[cls] = {
+                'active': self._active[cls],
+                'queued': self._queues[cls].size,
+                'limit': self.class_limits[cls],
+                'queued_by_tenant': self._queues[cls].tenants(),
+                'wait_p50_seconds': metrics.percentile(f"admission_wait_{cls}_seconds", 50),
+                'wait_p95_seconds': metrics.percentile(f"admission_wait_{cls}_seconds", 95)
+            }
+        return {'capacity': self.capacity, 'classes': classes}
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """Poids des tenants au format ``tenant=poids,autre=poids``"""
+    weights: Dict[str, float] = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() and weight.strip():
+            weights[name.strip()] = float(weight)
+    return weights
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+def get_admission_controller() -> AdmissionController:
+    """Contrôleur d'admission du processus"""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                Config.ADMISSION_CAPACITY,
+                {INTERACTIVE: Config.ADMISSION_INTERACTIVE_LIMIT, BATCH: Config.ADMISSION_BATCH_LIMIT},
+                parse_weights(Config.ADMISSION_TENANT_WEIGHTS),
+                Config.ADMISSION_MAX_QUEUE
+            )
+        return _controller
@@ -1,257 +1,469 @@
-# agents.py
-import json
-import random
-import google.generativeai as genai
-from tavily import TavilyClient
-from typing import Dict, Any, List
-from datetime import datetime
-from config import Config
-from models import AgentState, SearchResult
-
-class BaseAgent:
-    """Classe de base pour tous les agents"""
-    
-    def __init__(self, name: str):
-        self.name = name
-        Config.validate()
-    
-    def log(self, message: str):
-        print(f"[{self.name}] {message}")
-
-class ResearchAgent(BaseAgent):
-    """Agent de recherche utilisant l'API Tavily"""
-    
-    def __init__(self):
-        super().__init__("Research Agent")
-        self.client = TavilyClient(api_key=Config.get_tavily_api_key())
-    
-    def execute(self, state: AgentState) -> AgentState:
-        """Effectue une recherche web sur la requête"""
-        self.log(f"Recherche pour: {state.query}")
-        
-        try:
-            response = self.client.search(
-                query=state.query,
-                max_results=Config.TAVILY_MAX_RESULTS,
-                search_depth=Config.TAVILY_SEARCH_DEPTH,
-                include_answer=True,
-                include_raw_content=True
-            )
-            
-            search_results = []
-            for result in response.get('results', []):
-                search_results.append({
-                    'title': result.get('title', ''),
-                    'url': result.get('url', ''),
-                    'content': result.get('content', ''),
-                    'score': result.get('score', 0.0)
-                })
-            
-            state.search_results = search_results
-            state.current_agent = self.name
-            self.log(f"Trouvé {len(search_results)} résultats")
-            
-        except Exception as e:
-            state.error_message = f"Erreur de recherche: {str(e)}"
-            self.log(f"Erreur: {state.error_message}")
-        
-        return state
-
-class SummarizerAgent(BaseAgent):
-    """Agent de résumé utilisant Gemini"""
-    
-    def __init__(self):
-        super().__init__("Summarizer Agent")
-        genai.configure(api_key=Config.get_gemini_api_key())
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
-    
-    def execute(self, state: AgentState) -> AgentState:
-        """Résume les résultats de recherche"""
-        if not state.search_results:
-            state.error_message = "Aucun résultat de recherche à résumer"
-            return state
-        
-        self.log("Génération du résumé...")
-        
-        try:
-            # Prépare le contenu pour le résumé
-            content = f"Requête: {state.query}\n\n"
-            for i, result in enumerate(state.search_results, 1):
-                content += f"Source {i}: {result['title']}\n{result['content']}\n\n"
-            
-            prompt = f"""
-            Tu es un expert en synthèse d'information. Résume les informations suivantes de manière claire et structurée.
-            
-            {content}
-            
-            Instructions:
-            - Crée un résumé cohérent et informatif
-            - Organise les informations par thèmes principaux
-            - Cite les sources importantes
-            - Garde un ton objectif et professionnel
-            - Limite à 500 mots maximum
-            """
-            
-            response = self.model.generate_content(prompt)
-            state.summary = response.text
-            state.current_agent = self.name
-            self.log("Résumé généré avec succès")
-            
-        except Exception as e:
-            state.error_message = f"Erreur de résumé: {str(e)}"
-            self.log(f"Erreur: {state.error_message}")
-        
-        return state
-
-class EditorAgent(BaseAgent):
-    """Agent d'édition utilisant Gemini"""
-    
-    def __init__(self):
-        super().__init__("Editor Agent")
-        genai.configure(api_key=Config.get_gemini_api_key())
-        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
-    
-    def execute(self, state: AgentState, human_instructions: str = None) -> AgentState:
-        """Édite et reformule le contenu selon le style demandé et instructions humaines optionnelles"""
-        if not state.summary:
-            state.error_message = "Aucun résumé à éditer"
-            return state
-        
-        self.log(f"Édition dans le style: {state.style}")
-        
-        try:
-            prompt = f"""
-            Tu es un rédacteur expert. Reformule le texte suivant dans un style {state.style}.
-            Texte original:
-            {state.summary}
-            Instructions pour le style '{state.style}':
-            - Si académique: utilise un langage précis, des références, une structure claire
-            - Si journalistique: rends le texte accessible, utilise des titres accrocheurs
-            - Si technique: utilise la terminologie appropriée, sois précis
-            - Si vulgarisation: simplifie les concepts, utilise des exemples
-            """
-            if human_instructions:
-                prompt += f"\nInstructions humaines supplémentaires : {human_instructions}\nApplique strictement ces instructions."
-            prompt += "\nConserve toute l'information importante tout en adaptant le style."
-            
-            response = self.model.generate_content(prompt)
-            state.edited_content = response.text
-            state.current_agent = self.name
-            self.log("Édition terminée avec succès")
-            
-        except Exception as e:
-            state.error_message = f"Erreur d'édition: {str(e)}"
-            self.log(f"Erreur: {state.error_message}")
-        
-        return state
-
-class HumanValidatorAgent(BaseAgent):
-    """Agent de validation humaine (simulée)"""
-    
-    def __init__(self):
-        super().__init__("Human Validator Agent")
-    
-    def execute(self, state: AgentState) -> AgentState:
-        """Simule une validation humaine"""
-        if not state.edited_content:
-            state.error_message = "Aucun contenu à valider"
-            return state
-        
-        self.log("Validation du contenu...")
-        
-        # Simulation simple: 90% de chance d'approbation
-        # En production, ceci serait une interface utilisateur
-        approval_chance = 0.9
-        state.validation_approved = random.random() < approval_chance
-        
-        state.current_agent = self.name
-        
-        if state.validation_approved:
-            self.log("✅ Contenu approuvé")
-        else:
-            self.log("❌ Contenu rejeté - révision nécessaire")
-        
-        return state
-
-class FeedbackAgent(BaseAgent):
-    """Agent de collecte de feedback"""
-    
-    def __init__(self):
-        super().__init__("Feedback Agent")
-    
-    def execute(self, state: AgentState) -> AgentState:
-        """Collecte des feedbacks (simulés)"""
-        self.log("Collecte des feedbacks...")
-        
-        # Simulation de feedbacks variés
-        positive_feedback = [
-            "Excellente synthèse, très claire et complète",
-            "Bon travail sur la structuration de l'information",
-            "Les sources sont pertinentes et bien utilisées"
-        ]
-        
-        negative_feedback = [
-            "Le contenu pourrait être plus détaillé",
-            "Certaines informations semblent manquer",
-            "Le style pourrait être amélioré"
-        ]
-        
-        if state.validation_approved:
-            state.feedback = random.choice(positive_feedback)
-        else:
-            state.feedback = random.choice(negative_feedback)
-        
-        state.current_agent = self.name
-        self.log(f"Feedback collecté: {state.feedback}")
-        
-        return state
-
-class MemoryAgent(BaseAgent):
-    """Agent de mémorisation"""
-    
-    def __init__(self):
-        super().__init__("Memory Agent")
-    
-    def execute(self, state: AgentState) -> AgentState:
-        """Sauvegarde les résultats dans un fichier JSON"""
-        if not state.edited_content:
-            state.error_message = "Aucun contenu à sauvegarder"
-            return state
-        
-        self.log("Sauvegarde en mémoire...")
-        
-        try:
-            # Prépare les données à sauvegarder
-            memory_data = {
-                'timestamp': state.timestamp.isoformat(),
-                'query': state.query,
-                'style': state.style,
-                'final_content': state.edited_content,
-                'validation_approved': state.validation_approved,
-                'feedback': state.feedback,
-                'search_count': len(state.search_results) if state.search_results else 0
-            }
-            
-            # Charge la mémoire existante
-            try:
-                with open(Config.MEMORY_FILE, 'r', encoding='utf-8') as f:
-                    memory = json.load(f)
-            except FileNotFoundError:
-                memory = {'research_history': []}
-            
-            # Ajoute la nouvelle entrée
-            memory['research_history'].append(memory_data)
-            
-            # Sauvegarde
-            with open(Config.MEMORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(memory, f, ensure_ascii=False, indent=2)
-            
-            state.saved_to_memory = True
-            state.current_agent = self.name
-            self.log(f"Sauvegardé dans {Config.MEMORY_FILE}")
-            
-        except Exception as e:
-            state.error_message = f"Erreur de sauvegarde: {str(e)}"
-            self.log(f"Erreur: {state.error_message}")
-        
+# agents.py
+import json
+import random
+import google.generativeai as genai
+from tavily import TavilyClient
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+from config import Config
+from models import AgentState, SearchResult
+from memory_store import get_memory_store
+from metrics import metrics
+from resilience import CircuitOpenError, DeadlineExceeded, guarded_call
+from extractive import extractive_summary
+from offline import OfflineModel, OfflineSearchClient
+from sources import dedupe_results, get_source_registry, resolve_sources
+from usage import (
+    CHARS_PER_TOKEN, BudgetExceeded, add_usage, estimate_tokens, get_usage_ledger, plan_call, response_usage
+)
+
+def create_model(model_name: Optional[str] = None):
+    """Modèle Gemini configuré (``Config.GEMINI_MODEL`` par défaut), ou son substitut hors ligne"""
+    model_name = model_name or Config.GEMINI_MODEL
+    if Config.OFFLINE_MODE:
+        return OfflineModel(model_name)
+    genai.configure(api_key=Config.get_gemini_api_key())
+    return genai.GenerativeModel(model_name)
+
+class BaseAgent:
+    """Classe de base pour tous les agents"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        Config.validate()
+    
+    def log(self, message: str):
+        print(f"[{self.name}] {message}")
+
+class ResearchAgent(BaseAgent):
+    """Agent de recherche utilisant l'API Tavily"""
+    
+    def __init__(self):
+        super().__init__("Research Agent")
+        if Config.OFFLINE_MODE:
+            self.client = OfflineSearchClient()
+        else:
+            self.client = TavilyClient(api_key=Config.get_tavily_api_key())
+    
+    def execute(self, state: AgentState) -> AgentState:
+        """Effectue une recherche web sur la requête"""
+        self.log(f"Recherche pour: {state.query}")
+        
+        max_results = state.max_results or Config.TAVILY_MAX_RESULTS
+        search_depth = state.search_depth or Config.TAVILY_SEARCH_DEPTH
+        
+        try:
+            if search_depth == "adaptive":
+                # Recherche "basic" rapide, escalade en "advanced" seulement si nécessaire
+                basic_results = min(max_results, Config.TAVILY_ADAPTIVE_BASIC_RESULTS)
+                search_results = self._search(state.query, basic_results, "basic", state.deadline)
+                state.search_depth_used = "basic"
+                
+                if self._needs_escalation(state.query, search_results, basic_results):
+                    self.log("Résultats insuffisants, escalade en recherche avancée")
+                    metrics.increment("search_escalations")
+                    search_results = self._search(state.query, max_results, "advanced", state.deadline)
+                    state.search_depth_used = "advanced"
+            else:
+                search_results = self._search(state.query, max_results, search_depth, state.deadline)
+                state.search_depth_used = search_depth
+            
+            # Résultats bruts: l'étape "sources" les enregistre pendant que le résumé est rédigé
+            state.search_results = dedupe_results(search_results)
+            state.current_agent = self.name
+            self.log(f"Trouvé {len(state.search_results)} résultats ({state.search_depth_used})")
+            
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            state.error_message = f"Recherche indisponible: {str(e)}"
+            self.log(f"Erreur: {state.error_message}")
+        except Exception as e:
+            state.error_message = f"Erreur de recherche: {str(e)}"
+            self.log(f"Erreur: {state.error_message}")
+        
+        return state
+    
+    def _search(self, query: str, max_results: int, search_depth: str,
+                deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Appel Tavily (borné, doublé si lent) normalisé en liste de résultats"""
+        metrics.increment(f"tavily_searches_{search_depth}")
+        with metrics.timer(f"tavily_search_{search_depth}_seconds"):
+            response = guarded_call(
+                "tavily",
+                lambda: self.client.search(
+                    query=query,
+                    max_results=max_results,
+                    search_depth=search_depth,
+                    include_answer=True,
+                    include_raw_content=True
+                ),
+                timeout=Config.SEARCH_TIMEOUT,
+                deadline=deadline,
+                latency_metric=f"tavily_call_{search_depth}_seconds",
+                hedge=Config.SEARCH_HEDGE_ENABLED
+            )
+        
+        search_results = []
+        for result in response.get('results', []):
+            search_results.append({
+                'title': result.get('title', ''),
+                'url': result.get('url', ''),
+                'content': result.get('content', ''),
+                'score': result.get('score', 0.0)
+            })
+        return search_results
+    
+    def _needs_escalation(self, query: str, results: List[Dict[str, Any]], expected: int) -> bool:
+        """Décide si les résultats "basic" justifient une recherche avancée"""
+        if len(results) < expected:
+            return True
+        
+        # Score moyen de pertinence renvoyé par Tavily
+        mean_score = sum(r.get('score') or 0.0 for r in results) / len(results)
+        if mean_score < Config.TAVILY_ADAPTIVE_MIN_SCORE:
+            return True
+        
+        # Couverture: part des termes significatifs de la requête présents dans les résultats
+        terms = {term for term in query.lower().split() if len(term) > 3}
+        if terms:
+            text = " ".join(f"{r['title']} {r['content']}" for r in results).lower()
+            coverage = sum(1 for term in terms if term in text) / len(terms)
+            if coverage < Config.TAVILY_ADAPTIVE_MIN_COVERAGE:
+                return True
+        
+        return False
+
+class SourceAgent(BaseAgent):
+    """Agent d'enregistrement des sources dans le registre partagé"""
+    
+    def __init__(self):
+        super().__init__("Source Agent")
+        self.sources = get_source_registry()
+    
+    def execute(self, state: AgentState) -> AgentState:
+        """Remplace les résultats bruts de la recherche par leurs références"""
+        if not state.search_results:
+            return state
+        
+        try:
+            # Contenus enregistrés une fois dans le registre: l'état ne garde que les références
+            state.search_results = self.sources.register(state.search_results)
+            self.log(f"{len(state.search_results)} sources enregistrées")
+        except Exception as e:
+            # Registre indisponible: l'état garde les résultats bruts, lisibles par resolve_sources
+            metrics.increment("source_registration_errors")
+            self.log(f"Erreur d'enregistrement des sources: {str(e)}")
+        
+        return state
+
+class GeminiAgent(BaseAgent):
+    """Agent appelant Gemini: budgets appliqués et tokens comptés à chaque appel"""
+    
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.model = create_model()
+        self._models = {Config.GEMINI_MODEL: self.model}
+        self.ledger = get_usage_ledger()
+    
+    def _get_model(self, model_name: str):
+        if model_name not in self._models:
+            self._models[model_name] = create_model(model_name)
+        return self._models[model_name]
+    
+    def generate(self, state: AgentState, prompt: str, shrink=None) -> str:
+        """
+        Appel au modèle dans les limites des budgets (voir ``usage.plan_call``)
+        
+        ``shrink(max_tokens)`` reconstruit un prompt plus court si le budget de
+        l'exécution ne permet plus d'envoyer le prompt complet. Lève
+        ``BudgetExceeded`` si l'appel ne tient pas dans le budget.
+        """
+        prompt_tokens = estimate_tokens(prompt)
+        plan = plan_call(self.ledger, state.token_usage, prompt_tokens, state.token_budget)
+        if plan.max_input_tokens is not None and prompt_tokens > plan.max_input_tokens:
+            if shrink is not None:
+                self.log(f"Contexte réduit à {plan.max_input_tokens} tokens (budget de l'exécution)")
+                metrics.increment("budget_context_shrinks")
+                prompt = shrink(plan.max_input_tokens)
+            if shrink is None or estimate_tokens(prompt) > plan.max_input_tokens:
+                raise BudgetExceeded("Prompt trop long pour le budget restant de l'exécution")
+        if plan.model != Config.GEMINI_MODEL:
+            self.log(f"Budget quotidien bientôt atteint: modèle {plan.model}")
+        
+        model = self._get_model(plan.model)
+        generation_config = {
+            'max_output_tokens': plan.max_output_tokens,
+            'temperature': Config.GEMINI_TEMPERATURE
+        }
+        response = guarded_call(
+            "gemini", lambda: model.generate_content(prompt, generation_config=generation_config),
+            timeout=Config.LLM_TIMEOUT, deadline=state.deadline,
+            latency_metric="gemini_call_seconds"
+        )
+        text = response.text
+        
+        input_tokens, output_tokens = response_usage(response, prompt, text)
+        state.token_usage = add_usage(state.token_usage, plan.model, input_tokens, output_tokens)
+        try:
+            self.ledger.record(state.style, plan.model, input_tokens, output_tokens)
+        except Exception as e:
+            self.log(f"Usage non enregistré: {str(e)}")
+        return text
+
+class SummarizerAgent(GeminiAgent):
+    """Agent de résumé utilisant Gemini"""
+    
+    def __init__(self):
+        super().__init__("Summarizer Agent")
+    
+    @staticmethod
+    def _build_prompt(query: str, sources: List[Dict[str, Any]],
+                      max_source_chars: Optional[int] = None) -> str:
+        content = f"Requête: {query}\n\n"
+        for i, result in enumerate(sources, 1):
+            text = result['content']
+            if max_source_chars is not None and len(text) > max_source_chars:
+                text = text[:max_source_chars] + "…"
+            content += f"Source {i}: {result['title']}\n{text}\n\n"
+        
+        return f"""
+            Tu es un expert en synthèse d'information. Résume les informations suivantes de manière claire et structurée.
+            
+            {content}
+            
+            Instructions:
+            - Crée un résumé cohérent et informatif
+            - Organise les informations par thèmes principaux
+            - Cite les sources importantes
+            - Garde un ton objectif et professionnel
+            - Limite à 500 mots maximum
+            """
+    
+    def execute(self, state: AgentState) -> AgentState:
+        """Résume les résultats de recherche"""
+        if not state.search_results:
+            state.error_message = "Aucun résultat de recherche à résumer"
+            return state
+        
+        self.log("Génération du résumé...")
+        
+        try:
+            # Prépare le contenu pour le résumé
+            sources = resolve_sources(state.search_results)
+            prompt = self._build_prompt(state.query, sources)
+            
+            def shrink(max_tokens: int) -> str:
+                # Contenus des sources tronqués à parts égales pour tenir dans le budget
+                overhead = len(self._build_prompt(state.query, sources, 0))
+                per_source = (max_tokens * CHARS_PER_TOKEN - overhead) // max(1, len(sources)) - 1
+                return self._build_prompt(state.query, sources, max(0, per_source))
+            
+            state.summary = self.generate(state, prompt, shrink)
+            state.current_agent = self.name
+            self.log("Résumé généré avec succès")
+            
+        except (CircuitOpenError, DeadlineExceeded, BudgetExceeded) as e:
+            if Config.DEGRADED_MODE_ENABLED:
+                # Mode dégradé: synthèse extractive locale à partir des résultats déjà obtenus
+                self.log(f"LLM indisponible ({str(e)}), résumé extractif local")
+                metrics.increment("degraded_summaries")
+                state.summary = extractive_summary(
+                    state.query, resolve_sources(state.search_results), Config.EXTRACTIVE_SUMMARY_SENTENCES
+                )
+                state.degraded = True
+                state.current_agent = self.name
+            else:
+                state.error_message = f"Résumé indisponible: {str(e)}"
+                self.log(f"Erreur: {state.error_message}")
+        except Exception as e:
+            state.error_message = f"Erreur de résumé: {str(e)}"
+            self.log(f"Erreur: {state.error_message}")
+        
+        return state
+
+class EditorAgent(GeminiAgent):
+    """Agent d'édition utilisant Gemini"""
+    
+    def __init__(self):
+        super().__init__("Editor Agent")
+    
+    def execute(self, state: AgentState, human_instructions: str = None) -> AgentState:
+        """Édite et reformule le contenu selon le style demandé et instructions humaines optionnelles"""
+        if not state.summary:
+            state.error_message = "Aucun résumé à éditer"
+            return state
+        
+        if state.degraded:
+            # Résumé déjà produit en mode dégradé: pas de nouvel appel au LLM
+            self.log("Mode dégradé: le résumé est conservé tel quel")
+            state.edited_content = state.summary
+            state.current_agent = self.name
+            return state
+        
+        self.log(f"Édition dans le style: {state.style}")
+        
+        try:
+            prompt = f"""
+            Tu es un rédacteur expert. Reformule le texte suivant dans un style {state.style}.
+            Texte original:
+            {state.summary}
+            Instructions pour le style '{state.style}':
+            - Si académique: utilise un langage précis, des références, une structure claire
+            - Si journalistique: rends le texte accessible, utilise des titres accrocheurs
+            - Si technique: utilise la terminologie appropriée, sois précis
+            - Si vulgarisation: simplifie les concepts, utilise des exemples
+            """
+            if human_instructions:
+                prompt += f"\nInstructions humaines supplémentaires : {human_instructions}\nApplique strictement ces instructions."
+            prompt += "\nConserve toute l'information importante tout en adaptant le style."
+            
+            state.edited_content = self.generate(state, prompt)
+            state.current_agent = self.name
+            self.log("Édition terminée avec succès")
+            
+        except (CircuitOpenError, DeadlineExceeded, BudgetExceeded) as e:
+            if Config.DEGRADED_MODE_ENABLED:
+                self.log(f"LLM indisponible ({str(e)}), résumé non édité")
+                metrics.increment("degraded_edits")
+                state.edited_content = state.summary
+                state.degraded = True
+                state.current_agent = self.name
+            else:
+                state.error_message = f"Édition indisponible: {str(e)}"
+                self.log(f"Erreur: {state.error_message}")
+        except Exception as e:
+            state.error_message = f"Erreur d'édition: {str(e)}"
+            self.log(f"Erreur: {state.error_message}")
+        
+        return state
+
+    def revise(self, state: AgentState, current_text: str, human_instructions: str) -> AgentState:
+        """Applique de nouvelles instructions au dernier texte édité, sans repartir du résumé"""
+        self.log("Révision selon les instructions humaines...")
+        
+        try:
+            # Seuls le texte courant et les nouvelles instructions sont envoyés au modèle
+            prompt = f"""
+            Tu es un rédacteur expert. Applique les instructions ci-dessous au texte suivant, rédigé dans un style {state.style}.
+            Texte actuel:
+            {current_text}
+            Instructions : {human_instructions}
+            Modifie uniquement ce que demandent les instructions et retourne le texte complet révisé.
+            """
+            state.edited_content = self.generate(state, prompt)
+            state.current_agent = self.name
+            self.log("Révision terminée avec succès")
+            
+        except (CircuitOpenError, DeadlineExceeded, BudgetExceeded) as e:
+            state.error_message = f"Révision indisponible: {str(e)}"
+            self.log(f"Erreur: {state.error_message}")
+        except Exception as e:
+            state.error_message = f"Erreur de révision: {str(e)}"
+            self.log(f"Erreur: {state.error_message}")
+        
+        return state
+
+class HumanValidatorAgent(BaseAgent):
+    """Agent de validation humaine (simulée)"""
+    
+    def __init__(self):
+        super().__init__("Human Validator Agent")
+    
+    def execute(self, state: AgentState) -> AgentState:
+        """Simule une validation humaine"""
+        if not state.edited_content:
+            state.error_message = "Aucun contenu à valider"
+            return state
+        
+        self.log("Validation du contenu...")
+        
+        # Simulation simple: 90% de chance d'approbation
+        # En production, ceci serait une interface utilisateur
+        approval_chance = 0.9
+        state.validation_approved = random.random() < approval_chance
+        
+        state.current_agent = self.name
+        
+        if state.validation_approved:
+            self.log("✅ Contenu approuvé")
+        else:
+            self.log("❌ Contenu rejeté - révision nécessaire")
+        
+        return state
+
+class FeedbackAgent(BaseAgent):
+    """Agent de collecte de feedback"""
+    
+    def __init__(self):
+        super().__init__("Feedback Agent")
+    
+    # En dessous de cette taille, un brouillon est jugé trop court
+    MIN_DRAFT_CHARS = 200
+    
+    def execute(self, state: AgentState) -> AgentState:
+        """Collecte des feedbacks (simulés) sur le brouillon édité, pendant sa validation"""
+        self.log("Collecte des feedbacks...")
+        
+        # Simulation de feedbacks variés
+        positive_feedback = [
+            "Excellente synthèse, très claire et complète",
+            "Bon travail sur la structuration de l'information",
+            "Les sources sont pertinentes et bien utilisées"
+        ]
+        
+        negative_feedback = [
+            "Le contenu pourrait être plus détaillé",
+            "Certaines informations semblent manquer",
+            "Le style pourrait être amélioré"
+        ]
+        
+        draft = state.edited_content or ""
+        if draft and not state.degraded and len(draft) >= self.MIN_DRAFT_CHARS:
+            state.feedback = random.choice(positive_feedback)
+        else:
+            state.feedback = random.choice(negative_feedback)
+        
+        self.log(f"Feedback collecté: {state.feedback}")
+        
+        return state
+
+class MemoryAgent(BaseAgent):
+    """Agent de mémorisation"""
+    
+    def __init__(self):
+        super().__init__("Memory Agent")
+        self.store = get_memory_store()
+    
+    def execute(self, state: AgentState) -> AgentState:
+        """Sauvegarde les résultats dans un fichier JSON"""
+        if not state.edited_content:
+            state.error_message = "Aucun contenu à sauvegarder"
+            return state
+        
+        self.log("Sauvegarde en mémoire...")
+        
+        try:
+            # Prépare les données à sauvegarder
+            memory_data = {
+                'timestamp': state.timestamp.isoformat(),
+                'query': state.query,
+                'style': state.style,
+                'final_content': state.edited_content,
+                'validation_approved': state.validation_approved,
+                'feedback': state.feedback,
+                'search_count': len(state.search_results) if state.search_results else 0,
+                'input_tokens': (state.token_usage or {}).get('input_tokens', 0),
+                'output_tokens': (state.token_usage or {}).get('output_tokens', 0)
+            }
+            
+            # Ajout atomique et verrouillé: plusieurs workers peuvent écrire en même temps
+            self.store.append(memory_data)
+            
+            state.saved_to_memory = True
+            state.current_agent = self.name
+            self.log(f"Sauvegardé dans la mémoire ({Config.MEMORY_BACKEND})")
+            
+        except Exception as e:
+            state.error_message = f"Erreur de sauvegarde: {str(e)}"
+            self.log(f"Erreur: {state.error_message}")
+        
         return state
\ No newline at end of file
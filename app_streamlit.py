@@ -1,163 +1,304 @@
-from dotenv import load_dotenv
-load_dotenv()
-
-import streamlit as st
-from orchestrator import orchestrator
-from models import ResearchRequest
-import asyncio
-
-st.set_page_config(page_title="Assistant de Recherche Multi-Agent", layout="wide")
-st.title("🤖 Assistant de Recherche Multi-Agent (SMA)")
-
-# --- Sidebar ---
-st.sidebar.header("Paramètres de la recherche")
-query = st.sidebar.text_area("Votre requête de recherche", "Qu'est-ce que l'intelligence artificielle ?")
-style = st.sidebar.selectbox(
-    "Style de rédaction",
-    ["académique", "journalistique", "technique", "vulgarisation"]
-)
-launch = st.sidebar.button("Lancer la recherche multi-agent 🚀")
-
-# --- Tabs ---
-tabs = st.tabs(["Recherche", "Historique", "Statistiques", "Mémoire"])
-
-# --- Gestion de l'état du workflow ---
-if 'step' not in st.session_state:
-    st.session_state.step = 0
-if 'result_state' not in st.session_state:
-    st.session_state.result_state = None
-if 'edited_summary' not in st.session_state:
-    st.session_state.edited_summary = ''
-if 'user_feedback' not in st.session_state:
-    st.session_state.user_feedback = ''
-
-# --- Lancer la recherche multi-agent (jusqu'au résumé) ---
-if launch:
-    with st.spinner("Traitement en cours..."):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        request = ResearchRequest(query=query, style=style)
-        # Lance le workflow jusqu'à l'étape résumé
-        result_state = loop.run_until_complete(
-            orchestrator.process_research_request(query=request.query, style=request.style)
-        )
-        loop.close()
-    st.session_state.result_state = result_state
-    st.session_state.step = 1
-    st.session_state.edited_summary = result_state.get("summary") or ""
-    st.session_state.user_feedback = ""
-
-# --- Etape 1 : Affichage recherche et résumé modifiable ---
-if st.session_state.step == 1 and st.session_state.result_state:
-    with tabs[0]:
-        st.subheader("1️⃣ Résultats de la recherche web")
-        if st.session_state.result_state.get("search_results"):
-            for r in st.session_state.result_state.get("search_results"):
-                st.markdown(f"**{r['title']}**\n{r['url']}\n{r['content'][:300]}...")
-        else:
-            st.info("Aucun résultat trouvé.")
-
-        st.subheader("2️⃣ Résumé généré")
-        st.write(st.session_state.result_state.get("summary") or "Résumé non disponible")
-
-        st.subheader("3️⃣ Instructions de modification pour l'agent d'édition")
-        st.session_state.human_instructions = st.text_area(
-            "Écrivez ici vos instructions pour modifier le texte édité (ex: remplacer X par Y, supprimer le paragraphe 2, etc.) :",
-            getattr(st.session_state, 'human_instructions', ''),
-            height=120
-        )
-        if st.button("Appliquer les instructions humaines"):
-            # Ajoute les instructions à l'état et relance l'édition
-            st.session_state.result_state["human_instructions"] = st.session_state.human_instructions
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            # Appelle uniquement le nœud d'édition avec instructions
-            from orchestrator import orchestrator
-            edited_state = orchestrator._edit_node(st.session_state.result_state)
-            loop.close()
-            st.session_state.result_state.update(edited_state)
-            st.session_state.step = 2
-
-# --- Etape 2 : Affichage du texte édité par l'agent après instructions humaines ---
-if st.session_state.step == 2:
-    with tabs[0]:
-        st.subheader("4️⃣ Texte édité par l'agent après instructions humaines")
-        st.write(st.session_state.result_state.get("edited_content") or "Contenu édité non disponible")
-        valider = st.button("✅ Valider le contenu édité")
-        rejeter = st.button("❌ Rejeter le contenu édité")
-        if valider or rejeter:
-            st.session_state.result_state["validation_approved"] = valider
-            st.session_state.step = 3
-
-# --- Etape 3 : Feedback utilisateur ---
-if st.session_state.step == 3:
-    with tabs[0]:
-        st.subheader("4️⃣ Feedback utilisateur (manuel)")
-        st.session_state.user_feedback = st.text_area(
-            "Votre feedback sur le contenu :",
-            st.session_state.user_feedback,
-            height=100
-        )
-        if st.button("Envoyer le feedback et finaliser"):
-            st.session_state.result_state["feedback"] = st.session_state.user_feedback
-            st.session_state.step = 4
-
-# --- Etape 4 : Sauvegarde et affichage final ---
-if st.session_state.step == 4:
-    with tabs[0]:
-        st.subheader("5️⃣ Sauvegarde en mémoire et résultat final")
-        # Simule la sauvegarde en mémoire (appelle le MemoryAgent si besoin)
-        st.session_state.result_state["saved_to_memory"] = True
-        st.session_state.result_state["final_result"] = st.session_state.result_state.get("edited_content")
-        st.success("Résultat sauvegardé en mémoire.")
-        st.write("Résultat final :")
-        st.write(st.session_state.result_state.get("final_result") or "Non disponible")
-        if st.button("Nouvelle recherche"):
-            st.session_state.step = 0
-            st.session_state.result_state = None
-            st.session_state.edited_summary = ''
-            st.session_state.user_feedback = ''
-
-# --- Historique ---
-with tabs[1]:
-    st.subheader("Historique des recherches")
-    memory = orchestrator.get_memory_history()
-    history = memory.get('research_history', [])
-    if history:
-        for item in reversed(history):
-            st.markdown(f"**{item['timestamp']}** | *{item['style']}* | {item['query']}")
-            st.write(item['final_content'][:300] + "...")
-            st.write(f"Validation : {'✅' if item.get('validation_approved') else '❌'} | Feedback : {item.get('feedback', '')}")
-            st.markdown("---")
-    else:
-        st.info("Aucune recherche en mémoire.")
-
-# --- Statistiques ---
-with tabs[2]:
-    st.subheader("Statistiques d'utilisation")
-    stats = orchestrator.get_memory_history()
-    history = stats.get('research_history', [])
-    total = len(history)
-    approved = sum(1 for h in history if h.get('validation_approved'))
-    st.metric("Total recherches", total)
-    st.metric("Recherches validées", approved)
-    st.metric("Taux de validation", f"{(approved/total*100) if total else 0:.1f}%")
-    styles = {}
-    for h in history:
-        s = h.get('style', 'inconnu')
-        styles[s] = styles.get(s, 0) + 1
-    st.write("Styles utilisés :", styles)
-
-# --- Mémoire (reset) ---
-with tabs[3]:
-    st.subheader("Gestion de la mémoire")
-    if st.button("Effacer la mémoire des recherches"):
-        import os
-        from config import Config
-        if os.path.exists(Config.MEMORY_FILE):
-            os.remove(Config.MEMORY_FILE)
-            st.success("Mémoire effacée !")
-        else:
-            st.info("Aucune mémoire à effacer.")
-    else:
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, Dict, List
+
+import streamlit as st
+from models import ResearchRequest
+from sources import resolve_sources
+
+# Durée maximale de validité des lectures de mémoire mises en cache
+# (les écritures d'autres processus, comme l'API, ne sont vues qu'après ce délai)
+MEMORY_CACHE_TTL = 30
+
+
+class BackgroundRunner:
+    """
+    Boucle asyncio dédiée, partagée par toutes les sessions Streamlit
+
+    Les traitements y sont soumis sans bloquer le thread du script: l'interface
+    interroge leur état et reste réactive, et les sessions ne s'attendent pas.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="streamlit-runner", daemon=True)
+        self._thread.start()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, label: str, coroutine) -> str:
+        job_id = uuid.uuid4().hex
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        with self._lock:
+            self._jobs[job_id] = {'label': label, 'future': future, 'started': time.time()}
+        return job_id
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return {'state': 'unknown'}
+        elapsed = time.time() - job['started']
+        if not job['future'].done():
+            return {'state': 'running', 'label': job['label'], 'elapsed': elapsed}
+        return {'state': 'done', 'label': job['label'], 'elapsed': elapsed}
+
+    def result(self, job_id: str) -> Any:
+        """Résultat d'un traitement terminé (relève son exception éventuelle)"""
+        with self._lock:
+            job = self._jobs.pop(job_id)
+        return job['future'].result()
+
+
+@st.cache_resource
+def get_orchestrator():
+    # Agents, clients Tavily/Gemini et cache créés une seule fois par processus
+    from orchestrator import orchestrator
+    return orchestrator
+
+
+@st.cache_resource
+def get_store():
+    from memory_store import get_memory_store
+    store = get_memory_store()
+    # Index plein texte vérifié une fois par processus, pas pendant les recherches
+    store.repair_index()
+    return store
+
+
+@st.cache_resource
+def get_runner() -> BackgroundRunner:
+    return BackgroundRunner()
+
+
+@st.cache_data(ttl=MEMORY_CACHE_TTL, show_spinner=False)
+def load_history(revision: int) -> List[Dict[str, Any]]:
+    """Historique (métadonnées seules), relu uniquement après une écriture"""
+    return get_orchestrator().get_memory_history(include_content=False).get('research_history', [])
+
+
+@st.cache_data(ttl=MEMORY_CACHE_TTL, show_spinner=False)
+def search_history(text: str, revision: int) -> Dict[str, Any]:
+    return get_orchestrator().search_memory(text)
+
+
+orchestrator = get_orchestrator()
+runner = get_runner()
+store = get_store()
+
+st.set_page_config(page_title="Assistant de Recherche Multi-Agent", layout="wide")
+st.title("🤖 Assistant de Recherche Multi-Agent (SMA)")
+
+# --- Sidebar ---
+st.sidebar.header("Paramètres de la recherche")
+query = st.sidebar.text_area("Votre requête de recherche", "Qu'est-ce que l'intelligence artificielle ?")
+style = st.sidebar.selectbox(
+    "Style de rédaction",
+    ["académique", "journalistique", "technique", "vulgarisation"]
+)
+launch = st.sidebar.button("Lancer la recherche multi-agent 🚀")
+
+# --- Tabs ---
+tabs = st.tabs(["Recherche", "Historique", "Statistiques", "Mémoire"])
+
+# --- Gestion de l'état du workflow ---
+if 'step' not in st.session_state:
+    st.session_state.step = 0
+if 'result_state' not in st.session_state:
+    st.session_state.result_state = None
+if 'edited_summary' not in st.session_state:
+    st.session_state.edited_summary = ''
+if 'user_feedback' not in st.session_state:
+    st.session_state.user_feedback = ''
+
+def start_job(kind: str, label: str, coroutine) -> None:
+    st.session_state.job = {'id': runner.submit(label, coroutine), 'kind': kind}
+
+
+@st.fragment(run_every=1.0)
+def show_job_progress() -> None:
+    """Interroge le traitement en cours sans relancer tout le script"""
+    job = st.session_state.get('job')
+    if not job:
+        return
+    status = runner.status(job['id'])
+    if status['state'] == 'running':
+        st.info(f"⏳ {status['label']} en cours... ({status['elapsed']:.0f}s)")
+    else:
+        st.rerun()
+
+
+def collect_job() -> None:
+    """Récupère le résultat d'un traitement terminé et avance le workflow"""
+    job = st.session_state.get('job')
+    if not job:
+        return
+    state = runner.status(job['id'])['state']
+    if state == 'running':
+        return
+    st.session_state.job = None
+    if state == 'unknown':
+        return
+    try:
+        result_state = runner.result(job['id'])
+    except Exception as e:
+        st.session_state.job_error = str(e)
+        return
+    if job['kind'] == 'research':
+        st.session_state.result_state = result_state
+        st.session_state.step = 1
+        st.session_state.edited_summary = result_state.get("summary") or ""
+        st.session_state.user_feedback = ""
+    elif job['kind'] == 'edit':
+        if result_state.get("error_message"):
+            st.session_state.job_error = result_state["error_message"]
+            return
+        st.session_state.result_state.update(result_state)
+        st.session_state.step = 2
+
+
+def submit_revision(instructions: str) -> None:
+    """Révision en arrière-plan: repart du dernier texte édité de l'exécution enregistrée"""
+    run_id = st.session_state.result_state.get("run_id")
+    if not run_id:
+        st.warning("Cette recherche n'a pas été enregistrée: relancez-la pour pouvoir la réviser.")
+        return
+    st.session_state.result_state["human_instructions"] = instructions
+    start_job('edit', "Révision", orchestrator.resume_run(run_id, instructions))
+    st.rerun()
+
+
+if 'job' not in st.session_state:
+    st.session_state.job = None
+
+# --- Lancer la recherche multi-agent (jusqu'au résumé), en arrière-plan ---
+if launch and not st.session_state.job:
+    request = ResearchRequest(query=query, style=style)
+    start_job('research', "Recherche multi-agent",
+              orchestrator.process_research_request(query=request.query, style=request.style))
+
+collect_job()
+with tabs[0]:
+    if st.session_state.get('job_error'):
+        st.error(f"Erreur: {st.session_state.pop('job_error')}")
+    show_job_progress()
+
+# --- Etape 1 : Affichage recherche et résumé modifiable ---
+if st.session_state.step == 1 and st.session_state.result_state:
+    with tabs[0]:
+        st.subheader("1️⃣ Résultats de la recherche web")
+        if st.session_state.result_state.get("search_results"):
+            for r in resolve_sources(st.session_state.result_state.get("search_results")):
+                st.markdown(f"**{r['title']}**\n{r['url']}\n{r['content'][:300]}...")
+        else:
+            st.info("Aucun résultat trouvé.")
+
+        st.subheader("2️⃣ Résumé généré")
+        st.write(st.session_state.result_state.get("summary") or "Résumé non disponible")
+
+        st.subheader("3️⃣ Instructions de modification pour l'agent d'édition")
+        st.session_state.human_instructions = st.text_area(
+            "Écrivez ici vos instructions pour modifier le texte édité (ex: remplacer X par Y, supprimer le paragraphe 2, etc.) :",
+            getattr(st.session_state, 'human_instructions', ''),
+            height=120
+        )
+        if st.button("Appliquer les instructions humaines", disabled=bool(st.session_state.job)):
+            submit_revision(st.session_state.human_instructions)
+
+# --- Etape 2 : Affichage du texte édité par l'agent après instructions humaines ---
+if st.session_state.step == 2:
+    with tabs[0]:
+        st.subheader("4️⃣ Texte édité par l'agent après instructions humaines")
+        if st.session_state.result_state.get("revision"):
+            st.caption(f"Révision n°{st.session_state.result_state['revision']}")
+        st.write(st.session_state.result_state.get("edited_content") or "Contenu édité non disponible")
+        further_instructions = st.text_area("Nouvelles instructions (appliquées à ce texte) :", "", height=80)
+        if st.button("Réviser à nouveau", disabled=bool(st.session_state.job) or not further_instructions.strip()):
+            submit_revision(further_instructions)
+        valider = st.button("✅ Valider le contenu édité")
+        rejeter = st.button("❌ Rejeter le contenu édité")
+        if valider or rejeter:
+            st.session_state.result_state["validation_approved"] = valider
+            st.session_state.step = 3
+
+# --- Etape 3 : Feedback utilisateur ---
+if st.session_state.step == 3:
+    with tabs[0]:
+        st.subheader("4️⃣ Feedback utilisateur (manuel)")
+        st.session_state.user_feedback = st.text_area(
+            "Votre feedback sur le contenu :",
+            st.session_state.user_feedback,
+            height=100
+        )
+        if st.button("Envoyer le feedback et finaliser"):
+            st.session_state.result_state["feedback"] = st.session_state.user_feedback
+            st.session_state.step = 4
+
+# --- Etape 4 : Sauvegarde et affichage final ---
+if st.session_state.step == 4:
+    with tabs[0]:
+        st.subheader("5️⃣ Sauvegarde en mémoire et résultat final")
+        # Simule la sauvegarde en mémoire (appelle le MemoryAgent si besoin)
+        st.session_state.result_state["saved_to_memory"] = True
+        st.session_state.result_state["final_result"] = st.session_state.result_state.get("edited_content")
+        st.success("Résultat sauvegardé en mémoire.")
+        st.write("Résultat final :")
+        st.write(st.session_state.result_state.get("final_result") or "Non disponible")
+        if st.button("Nouvelle recherche"):
+            st.session_state.step = 0
+            st.session_state.result_state = None
+            st.session_state.edited_summary = ''
+            st.session_state.user_feedback = ''
+
+# --- Historique ---
+with tabs[1]:
+    st.subheader("Historique des recherches")
+    search_text = st.text_input("Rechercher dans l'historique", "")
+    if search_text.strip():
+        found = search_history(search_text, store.revision)
+        st.caption(f"{found['total']} résultat(s)")
+        for item in found['results']:
+            st.markdown(f"**{item['timestamp']}** | *{item['style']}* | {item['query']}")
+            st.markdown(item['snippet'])
+            st.markdown("---")
+    else:
+        history = load_history(store.revision)
+        if history:
+            for item in reversed(history):
+                st.markdown(f"**{item['timestamp']}** | *{item['style']}* | {item['query']}")
+                st.write(item.get('preview', '') + "...")
+                st.write(f"Validation : {'✅' if item.get('validation_approved') else '❌'} | Feedback : {item.get('feedback', '')}")
+                st.markdown("---")
+        else:
+            st.info("Aucune recherche en mémoire.")
+
+# --- Statistiques ---
+with tabs[2]:
+    st.subheader("Statistiques d'utilisation")
+    history = load_history(store.revision)
+    total = len(history)
+    approved = sum(1 for h in history if h.get('validation_approved'))
+    st.metric("Total recherches", total)
+    st.metric("Recherches validées", approved)
+    st.metric("Taux de validation", f"{(approved/total*100) if total else 0:.1f}%")
+    styles = {}
+    for h in history:
+        s = h.get('style', 'inconnu')
+        styles[s] = styles.get(s, 0) + 1
+    st.write("Styles utilisés :", styles)
+
+# --- Mémoire (reset) ---
+with tabs[3]:
+    st.subheader("Gestion de la mémoire")
+    if st.button("Effacer la mémoire des recherches"):
+        if store.clear():
+            st.success("Mémoire effacée !")
+        else:
+            st.info("Aucune mémoire à effacer.")
+    else:
         st.info("Utilisez ce bouton pour réinitialiser l'historique des recherches.") 
\ No newline at end of file
@@ -0,0 +1,359 @@
+# batch_runner.py
+"""
+Évaluation en masse d'un corpus de requêtes via ``MultiAgentOrchestrator``.
+
+Le fichier d'entrée est un JSONL (un objet ``{"query": ..., "style": ...}``
+ou une chaîne par ligne) ou un CSV avec au moins une colonne ``query``;
+colonnes optionnelles: ``id``, ``style``, ``max_results``, ``search_depth``,
+``profile``. Les résultats sont écrits au fil de l'eau dans des fragments
+JSONL du répertoire de sortie: une relance reprend là où le lot s'était
+arrêté; les requêtes en erreur sont rejouées. Un rapport (latences, coûts
+estimés, erreurs, cache) est produit à la fin, sur l'ensemble des fragments.
+
+Le cache des résultats, la popularité, la mémoire et les exécutions
+enregistrées sont propres à chaque évaluation (sous ``<output-dir>/state``):
+deux évaluations de modèles ou de paramètres différents ne partagent aucun
+résultat, et la mémoire de production n'est pas alimentée. ``--shared-state``
+utilise à la place les chemins configurés.
+
+Exemples:
+    python batch_runner.py queries.jsonl --output-dir eval/academique --concurrency 8
+    python batch_runner.py queries.csv --output-dir eval/flash --offline \\
+        --set GEMINI_MODEL=gemini-1.5-flash
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from config import Config
+from metrics import percentile
+from sources import resolve_sources
+
+# Champs de requête reconnus dans le fichier d'entrée
+QUERY_FIELDS = ("query", "style", "max_results", "search_depth", "profile")
+
+# Fichiers dont le contenu dépend des résultats: propres à chaque évaluation.
+# Le registre des sources (adressé par contenu) et le registre d'usage (budgets) restent partagés
+EVALUATION_STATE_PATHS = (
+    "CACHE_DB_FILE", "MEMORY_FILE", "MEMORY_DB_FILE", "MEMORY_CONTENT_DIR",
+    "MEMORY_INDEX_FILE", "MEMORY_ARCHIVE_DIR", "RUNS_DB_FILE",
+)
+
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    """Lit le corpus (JSONL ou CSV); chaque requête reçoit un identifiant stable"""
+    queries = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = []
+            for line in f:
+                line = line.strip()
+                if line:
+                    item = json.loads(line)
+                    rows.append({'query': item} if isinstance(item, str) else item)
+
+    for number, row in enumerate(rows, 1):
+        if not row.get('query'):
+            raise ValueError(f"Ligne {number}: champ 'query' manquant")
+        request = {key: row[key] for key in QUERY_FIELDS if row.get(key) not in (None, '')}
+        if 'max_results' in request:
+            request['max_results'] = int(request['max_results'])
+        request['id'] = str(row.get('id') or f"row-{number}")
+        queries.append(request)
+    return queries
+
+
+def apply_overrides(overrides: List[str]) -> Dict[str, Any]:
+    """Applique des ``CLE=valeur`` à ``Config``, convertis au type de la valeur existante"""
+    applied = {}
+    for override in overrides:
+        key, _, raw = override.partition('=')
+        if not hasattr(Config, key):
+            raise ValueError(f"Paramètre de configuration inconnu: {key}")
+        current = getattr(Config, key)
+        if isinstance(current, bool):
+            value = raw.lower() in ('1', 'true', 'yes', 'oui')
+        elif isinstance(current, (int, float)):
+            value = type(current)(raw)
+        else:
+            value = raw
+        setattr(Config, key, value)
+        applied[key] = value
+    return applied
+
+
+def isolate_state(output_dir: str) -> Dict[str, str]:
+    """Place le cache, la mémoire et les exécutions de l'évaluation sous ``<output_dir>/state``"""
+    directory = os.path.join(output_dir, 'state')
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for key in EVALUATION_STATE_PATHS:
+        paths[key] = os.path.join(directory, os.path.basename(getattr(Config, key)))
+        setattr(Config, key, paths[key])
+    return paths
+
+
+class ResultShards:
+    """Résultats en fragments JSONL, une ligne par requête traitée"""
+
+    def __init__(self, directory: str, shard_size: int):
+        self.directory = directory
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._count = 0
+        self._index = len(self._shard_paths())
+
+    def _shard_paths(self) -> List[str]:
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.startswith('results-') and name.endswith('.jsonl')
+        )
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        for path in self._shard_paths():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Dernière ligne tronquée par un arrêt brutal: la requête sera rejouée
+                        continue
+
+    def latest_records(self) -> Dict[str, Dict[str, Any]]:
+        """Dernier enregistrement de chaque requête (une requête rejouée en a plusieurs)"""
+        return {record['id']: record for record in self.records()}
+
+    def completed_ids(self) -> Set[str]:
+        """Requêtes traitées sans erreur: celles en erreur sont rejouées à la relance"""
+        return {record_id for record_id, record in self.latest_records().items()
+                if not record.get('error')}
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if self._file is None or self._count >= self.shard_size:
+            if self._file is not None:
+                self._file.close()
+            path = os.path.join(self.directory, f"results-{self._index:05d}.jsonl")
+            self._file = open(path, 'a', encoding='utf-8')
+            self._index += 1
+            self._count = 0
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        self._count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def estimate_cost(request: Dict[str, Any], state: Dict[str, Any]) -> Tuple[int, float]:
+    """
+    Tokens et coût (USD) estimés d'une exécution
+
+    Un résultat servi par le cache ou une exécution partagée ne coûte rien.
+    Faute de comptage exact, les tokens sont estimés à 4 caractères près à
+    partir des textes envoyés et produits.
+    """
+    if state.get('cache_hit') or state.get('coalesced'):
+        return 0, 0.0
+
+    searches = Counter()
+    depth_used = state.get('search_depth_used')
+    if depth_used:
+        requested = request.get('search_depth') or Config.TAVILY_SEARCH_DEPTH
+        if requested == "adaptive" and depth_used == "advanced":
+            searches["basic"] += 1
+        searches[depth_used] += 1
+    search_cost = sum(Config.TAVILY_COST_PER_SEARCH.get(depth, 0.0) * n for depth, n in searches.items())
+
+    usage = state.get('token_usage')
+    if usage:
+        input_tokens, output_tokens = usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+    else:
+        sources = sum(len(r.get('title', '')) + len(r.get('content', ''))
+                      for r in resolve_sources(state.get('search_results')))
+        summary, edited = state.get('summary') or '', state.get('edited_content') or ''
+        input_chars = (sources + 600 if summary else 0) + (len(summary) + 600 if edited else 0)
+        input_tokens, output_tokens = input_chars // 4, (len(summary) + len(edited)) // 4
+
+    llm_cost = (input_tokens * Config.GEMINI_INPUT_COST_PER_1M
+                + output_tokens * Config.GEMINI_OUTPUT_COST_PER_1M) / 1_000_000
+    return input_tokens + output_tokens, round(search_cost + llm_cost, 6)
+
+
+async def run_one(orchestrator, request: Dict[str, Any], priority: str = "batch",
+                  tenant: Optional[str] = None) -> Dict[str, Any]:
+    """Exécute une requête et la résume en un enregistrement de résultat"""
+    start = time.perf_counter()
+    record: Dict[str, Any] = {'id': request['id'], **{k: request.get(k) for k in QUERY_FIELDS}}
+    try:
+        state = await orchestrator.process_research_request(
+            request['query'],
+            style=request.get('style') or "académique",
+            max_results=request.get('max_results'),
+            search_depth=request.get('search_depth'),
+            profile=request.get('profile') or "full",
+            priority=priority,
+            tenant=tenant
+        )
+    except Exception as e:
+        state = {'error_message': f"{type(e).__name__}: {str(e)}"}
+    tokens, cost = estimate_cost(request, state)
+    record.update({
+        'ok': bool(state.get('final_result')) and not state.get('error_message'),
+        'error': state.get('error_message'),
+        'latency_seconds': round(time.perf_counter() - start, 4),
+        'cached': bool(state.get('cache_hit')),
+        'coalesced': bool(state.get('coalesced')),
+        'degraded': bool(state.get('degraded')),
+        'search_depth_used': state.get('search_depth_used'),
+        'search_count': len(state.get('search_results') or []),
+        'estimated_tokens': tokens,
+        'estimated_cost_usd': cost,
+        'run_id': state.get('run_id'),
+        'final_result': state.get('final_result'),
+        'finished_at': time.time()
+    })
+    return record
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        'mean': round(sum(values) / len(values), 4) if values else 0.0,
+        'p50': round(percentile(values, 50), 4),
+        'p90': round(percentile(values, 90), 4),
+        'p95': round(percentile(values, 95), 4),
+        'p99': round(percentile(values, 99), 4),
+        'max': round(max(values), 4) if values else 0.0
+    }
+
+
+def build_report(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rapport agrégé: volumes, erreurs, cache, latences et coûts, global et par style"""
+    def summarize(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+        total = len(group)
+        failed = [r for r in group if not r['ok']]
+        cost = sum(r.get('estimated_cost_usd') or 0.0 for r in group)
+        return {
+            'queries': total,
+            'succeeded': total - len(failed),
+            'error_rate': round(len(failed) / total, 4) if total else 0.0,
+            'cache_hit_ratio': round(sum(r['cached'] for r in group) / total, 4) if total else 0.0,
+            'coalesced': sum(r['coalesced'] for r in group),
+            'degraded': sum(r['degraded'] for r in group),
+            'latency_seconds': _latency_summary([r['latency_seconds'] for r in group]),
+            'estimated_tokens': sum(r.get('estimated_tokens') or 0 for r in group),
+            'estimated_cost_usd': round(cost, 4),
+            'estimated_cost_per_query_usd': round(cost / total, 6) if total else 0.0
+        }
+
+    by_style = defaultdict(list)
+    for record in records:
+        by_style[record.get('style') or "académique"].append(record)
+    errors = Counter((r['error'] or "résultat vide")[:120] for r in records if not r['ok'])
+    return {
+        **summarize(records),
+        'top_errors': [{'error': error, 'count': count} for error, count in errors.most_common(10)],
+        'by_style': {style: summarize(group) for style, group in sorted(by_style.items())}
+    }
+
+
+async def run_batch(args: argparse.Namespace) -> Dict[str, Any]:
+    # Importé après les surcharges de Config: les agents lisent la configuration à leur création
+    from orchestrator import orchestrator
+
+    queries = load_queries(args.input)
+    if args.limit:
+        queries = queries[:args.limit]
+    shards = ResultShards(args.output_dir, args.shard_size)
+    done = shards.completed_ids()
+    pending = iter([q for q in queries if q['id'] not in done])
+    remaining = len(queries) - len(done & {q['id'] for q in queries})
+    print(f"📦 {len(queries)} requête(s), {len(queries) - remaining} déjà traitée(s), "
+          f"{remaining} à exécuter (concurrence {args.concurrency})", file=sys.stderr)
+
+    processed = 0
+    start = time.perf_counter()
+
+    async def worker():
+        nonlocal processed
+        for request in pending:
+            record = await run_one(orchestrator, request, args.priority, args.tenant)
+            shards.append(record)
+            processed += 1
+            if processed % args.progress_every == 0 or processed == remaining:
+                rate = processed / (time.perf_counter() - start)
+                print(f"⏳ {processed}/{remaining} ({rate:.1f} req/s)", file=sys.stderr)
+
+    # Les journaux des agents sont très verbeux sur un lot: masqués sauf --verbose
+    quiet = open(os.devnull, 'w') if not args.verbose else None
+    try:
+        with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+            await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+            await orchestrator.drain(timeout=Config.SHUTDOWN_TIMEOUT)
+    finally:
+        shards.close()
+        if quiet:
+            quiet.close()
+
+    wall_time = time.perf_counter() - start
+    ids = {q['id'] for q in queries}
+    report = build_report([r for r in shards.latest_records().values() if r['id'] in ids])
+    report['session'] = {
+        'processed': processed,
+        'wall_time_seconds': round(wall_time, 2),
+        'throughput_per_second': round(processed / wall_time, 2) if wall_time else 0.0,
+        'concurrency': args.concurrency,
+        'offline': Config.OFFLINE_MODE,
+        'model': Config.GEMINI_MODEL,
+        'overrides': args.applied_overrides,
+        'state_paths': args.state_paths
+    }
+    with open(os.path.join(args.output_dir, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Évaluation en masse d'un corpus de requêtes")
+    parser.add_argument("input", help="Fichier de requêtes (.jsonl ou .csv)")
+    parser.add_argument("--output-dir", required=True, help="Répertoire des fragments de résultats et du rapport")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requêtes exécutées en parallèle")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Résultats par fragment")
+    parser.add_argument("--limit", type=int, default=0, help="Ne traiter que les N premières requêtes")
+    parser.add_argument("--offline", action="store_true", help="Backends hors ligne (aucun appel réseau)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="CLE=VALEUR",
+                        help="Surcharge d'un paramètre de Config (répétable)")
+    parser.add_argument("--priority", choices=("batch", "interactive"), default="batch",
+                        help="Classe d'admission des exécutions (plafond ADMISSION_BATCH_LIMIT en batch)")
+    parser.add_argument("--tenant", default="batch-runner", help="Tenant pour le partage équitable")
+    parser.add_argument("--shared-state", action="store_true",
+                        help="Cache, mémoire et exécutions aux chemins configurés plutôt que sous --output-dir")
+    parser.add_argument("--progress-every", type=int, default=50)
+    parser.add_argument("--verbose", action="store_true", help="Afficher les journaux des agents")
+    args = parser.parse_args(argv)
+
+    if args.offline:
+        Config.OFFLINE_MODE = True
+    # Avant les surcharges: un --set CACHE_DB_FILE=... explicite reste prioritaire
+    args.state_paths = {} if args.shared_state else isolate_state(args.output_dir)
+    args.applied_overrides = apply_overrides(args.overrides)
+
+    report = asyncio.run(run_batch(args))
+    print(json.dumps({key: value for key, value in report.items() if key != 'by_style'},
+                     ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+# benchmark.py
+"""
+Micro-benchmarks des chemins critiques, sans appel réseau.
+
+Usage:
+    python benchmark.py serialization [--results 10] [--content-chars 8000] [--repeat 200]
+    python benchmark.py workflow [--profile full] [--latency research=0.8,summarize=1.2] [--runs 5]
+
+``serialization`` compare, sur une réponse ``/research`` et un historique de
+mémoire représentatifs, le chemin d'origine (validation pydantic puis
+``jsonable_encoder`` et ``json`` de la bibliothèque standard, fichier mémoire
+indenté) et le chemin rapide (``construct`` puis ``serialization.dumps``):
+temps d'encodage, de décodage et taille en octets.
+
+``workflow`` exécute le graphe LangGraph d'un profil avec les backends hors
+ligne et une latence simulée par étape (``--latency``), construit en chaîne
+linéaire (avant) puis avec les étapes indépendantes en parallèle (après):
+chemin critique théorique (plus longue chaîne de dépendances) et durée
+mesurée d'une exécution.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+import serialization
+from models import ResearchOutput, SearchResult
+
+_WORDS = (
+    "intelligence artificielle données modèle recherche énergie réseau analyse "
+    "performance sécurité régulation marché innovation système usage coût"
+).split()
+
+
+def _text(rng: random.Random, chars: int) -> str:
+    words: List[str] = []
+    size = 0
+    while size < chars:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def sample_state(results: int, content_chars: int, seed: int = 0) -> Dict[str, Any]:
+    """État final d'exécution typique (contenus bruts inclus)"""
+    rng = random.Random(seed)
+    edited = _text(rng, 3000)
+    return {
+        'query': "impact de l'intelligence artificielle sur l'énergie",
+        'final_result': edited,
+        'summary': _text(rng, 2500),
+        'edited_content': edited,
+        'validation_approved': True,
+        'feedback': "Excellente synthèse, très claire et complète",
+        'timestamp': datetime.now(),
+        'run_id': "0" * 32,
+        'search_depth_used': "advanced",
+        'search_results': [
+            {
+                'source_id': f"{i:016x}",
+                'title': f"Source {i} : {_text(rng, 60)}",
+                'url': f"https://example.org/articles/{i}",
+                'content': _text(rng, content_chars),
+                'score': round(rng.random(), 3)
+            }
+            for i in range(results)
+        ]
+    }
+
+
+def _validated_output(state: Dict[str, Any]) -> ResearchOutput:
+    return ResearchOutput(
+        query=state['query'], final_content=state['final_result'],
+        search_results=[SearchResult(**r) for r in state['search_results']],
+        summary=state['summary'], edited_content=state['edited_content'],
+        validation_status=state['validation_approved'], feedback=state['feedback'],
+        timestamp=state['timestamp'], run_id=state['run_id'],
+        search_depth=state['search_depth_used']
+    )
+
+
+def _constructed_output(state: Dict[str, Any]) -> ResearchOutput:
+    return ResearchOutput.construct(
+        query=state['query'], final_content=state['final_result'],
+        search_results=[SearchResult.construct(**r) for r in state['search_results']],
+        summary=state['summary'], edited_content=state['edited_content'],
+        validation_status=state['validation_approved'], feedback=state['feedback'],
+        timestamp=state['timestamp'], run_id=state['run_id'],
+        search_depth=state['search_depth_used']
+    )
+
+
+def _timeit(fn: Callable[[], Any], repeat: int) -> float:
+    """Durée moyenne d'un appel, en millisecondes"""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_serialization(results: int, content_chars: int, repeat: int) -> List[Dict[str, Any]]:
+    state = sample_state(results, content_chars)
+    history = {'research_history': [
+        {'id': f"{i:032x}", 'timestamp': datetime.now().isoformat(), 'query': state['query'],
+         'style': "académique", 'final_content': state['edited_content'],
+         'validation_approved': True, 'feedback': state['feedback'], 'search_count': results}
+        for i in range(200)
+    ]}
+
+    def stdlib_response() -> bytes:
+        # Chemin FastAPI d'origine: validation du modèle, revalidation et encodage générique
+        output = ResearchOutput(**_validated_output(state).dict())
+        return json.dumps(jsonable_encoder(output), ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+    def fast_response() -> bytes:
+        return serialization.dumps(_constructed_output(state).dict())
+
+    def stdlib_memory() -> bytes:
+        return json.dumps(history, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def fast_memory() -> bytes:
+        return serialization.dumps(history)
+
+    def stdlib_checkpoint() -> bytes:
+        return json.dumps(state, ensure_ascii=False, default=str).encode('utf-8')
+
+    def fast_checkpoint() -> bytes:
+        return serialization.dumps(state)
+
+    rows = []
+    cases = [
+        ("réponse /research", stdlib_response, fast_response),
+        ("fichier mémoire (200 entrées)", stdlib_memory, fast_memory),
+        ("état en cache / exécution", stdlib_checkpoint, fast_checkpoint),
+    ]
+    for name, baseline, fast in cases:
+        for path, encode in (("json + pydantic" if "réponse" in name else "json", baseline),
+                             (serialization.BACKEND, fast)):
+            payload = encode()
+            rows.append({
+                'case': name,
+                'path': path,
+                'encode_ms': _timeit(encode, repeat),
+                'decode_ms': _timeit(lambda: (json.loads if encode is baseline
+                                              else serialization.loads)(payload), repeat),
+                'bytes': len(payload)
+            })
+    return rows
+
+
+# Latences simulées par défaut (secondes): appels Tavily et Gemini, enregistrement des sources,
+# relectures de validation et de feedback
+DEFAULT_STAGE_LATENCY = {
+    'research': 0.8, 'sources': 0.05, 'summarize': 1.2, 'edit': 1.0,
+    'validate': 0.5, 'feedback_node': 0.5, 'review': 0.0, 'finalize': 0.0,
+}
+
+# Agent de l'orchestrateur exécuté par chaque étape
+_STAGE_AGENTS = {
+    'research': 'research_agent', 'sources': 'source_agent', 'summarize': 'summarizer_agent',
+    'edit': 'editor_agent', 'validate': 'validator_agent', 'feedback_node': 'feedback_agent',
+}
+
+
+def parse_latency(value: str) -> Dict[str, float]:
+    """Latences au format ``etape=secondes,autre=secondes``"""
+    latency = dict(DEFAULT_STAGE_LATENCY)
+    for item in value.split(","):
+        stage, _, seconds = item.partition("=")
+        if stage.strip():
+            latency[stage.strip()] = float(seconds)
+    return latency
+
+
+def critical_path(dependencies: Dict[str, List[str]], latency: Dict[str, float]) -> float:
+    """Durée de la plus longue chaîne de dépendances (étapes dans l'ordre topologique)"""
+    finish: Dict[str, float] = {}
+    for stage, after in dependencies.items():
+        finish[stage] = max((finish[d] for d in after), default=0.0) + latency.get(stage, 0.0)
+    return max(finish.values())
+
+
+def bench_workflow(profile: str, latency: Dict[str, float], runs: int) -> List[Dict[str, Any]]:
+    # Backends hors ligne et fichiers de l'orchestrateur (mémoire, sources, cache...) temporaires
+    os.environ["OFFLINE_MODE"] = "true"
+    os.environ["OFFLINE_LATENCY"] = "0"
+    os.chdir(tempfile.mkdtemp(prefix="benchmark-workflow-"))
+    from orchestrator import MultiAgentOrchestrator, stage_dependencies
+
+    orchestrator = MultiAgentOrchestrator()
+    for stage, attribute in _STAGE_AGENTS.items():
+        agent = getattr(orchestrator, attribute)
+
+        def delayed(state, *args, _execute=agent.execute, _stage=stage):
+            time.sleep(latency.get(_stage, 0.0))
+            state = _execute(state, *args)
+            if _stage == "validate" and not state.error_message:
+                # Rejets simulés (10 %) écartés: ils relancent l'édition dans les deux graphes
+                state.validation_approved = True
+            return state
+        agent.execute = delayed
+
+    stages = orchestrator._get_profile(profile)["stages"]
+    rows = []
+    for name, parallel in (("linéaire", False), ("parallèle", True)):
+        workflow = orchestrator._build_workflow(profile, parallel=parallel)
+        durations = []
+        for _ in range(runs):
+            state = {'query': "impact de l'intelligence artificielle sur l'énergie",
+                     'style': "académique", 'timestamp': datetime.now()}
+            start = time.perf_counter()
+            asyncio.run(workflow.ainvoke(state))
+            durations.append(time.perf_counter() - start)
+        rows.append({
+            'graph': name,
+            'critical_path_ms': critical_path(stage_dependencies(stages, parallel), latency) * 1000,
+            'measured_ms': sum(durations) / len(durations) * 1000,
+        })
+    orchestrator.memory_writer.flush(5)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks du système multi-agent")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serial = subparsers.add_parser("serialization", help="Encodage JSON des réponses et enregistrements")
+    serial.add_argument("--results", type=int, default=10, help="Résultats de recherche par réponse")
+    serial.add_argument("--content-chars", type=int, default=8000, help="Taille du contenu de chaque résultat")
+    serial.add_argument("--repeat", type=int, default=200, help="Répétitions par mesure")
+
+    graph = subparsers.add_parser("workflow", help="Chemin critique du graphe, linéaire ou parallèle")
+    graph.add_argument("--profile", default="full", help="Profil de pipeline")
+    graph.add_argument("--latency", default="", help="Latences simulées (etape=secondes,...)")
+    graph.add_argument("--runs", type=int, default=5, help="Exécutions par graphe")
+
+    args = parser.parse_args()
+    if args.command == "workflow":
+        rows = bench_workflow(args.profile, parse_latency(args.latency), args.runs)
+        print(f"{'graphe':<12}{'chemin critique ms':>20}{'mesuré ms':>12}")
+        for row in rows:
+            print(f"{row['graph']:<12}{row['critical_path_ms']:>20.1f}{row['measured_ms']:>12.1f}")
+    elif args.command == "serialization":
+        rows = bench_serialization(args.results, args.content_chars, args.repeat)
+        print(f"{'cas':<32}{'chemin':<18}{'encodage ms':>13}{'décodage ms':>13}{'octets':>11}")
+        for row in rows:
+            print(f"{row['case']:<32}{row['path']:<18}{row['encode_ms']:>13.3f}"
+                  f"{row['decode_ms']:>13.3f}{row['bytes']:>11}")
+
+
+if __name__ == "__main__":
+    main()
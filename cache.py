@@ -0,0 +1,126 @@
+# cache.py
+"""
+Cache clé/valeur partagé entre les workers.
+
+Stocké dans une base SQLite locale (``Config.CACHE_DB_FILE``) qui tient lieu
+de store partagé: tous les processus d'une même machine, ou les conteneurs
+montant le même volume, voient les mêmes entrées.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from config import Config
+from serialization import dumps_str, loads
+
+
+def make_cache_key(namespace: str, *parts: Any) -> str:
+    """Construit une clé stable à partir de parties normalisées"""
+    normalized = [" ".join(str(part).lower().split()) for part in parts]
+    digest = hashlib.sha256("\x1f".join(normalized).encode('utf-8')).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class SharedCache:
+    """Cache avec TTL persistant dans SQLite, sûr entre threads et processus"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL
+                )
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return loads(value)
+
+    def get_entry(self, key: str, max_stale: float = 0) -> Optional[Tuple[Any, bool]]:
+        """
+        Retourne ``(valeur, périmée)``; une entrée expirée depuis moins de
+        ``max_stale`` secondes est encore retournée, marquée comme périmée
+        """
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        now = time.time()
+        if expires_at is None or expires_at >= now:
+            return loads(value), False
+        if now - expires_at <= max_stale:
+            return loads(value), True
+        return None
+
+    def expires_at(self, key: str) -> Optional[float]:
+        """Date d'expiration d'une entrée, sans lire sa valeur (None si absente ou sans TTL)"""
+        row = self._connection().execute(
+            "SELECT expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, dumps_str(value), now, expires_at)
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        with self._connection() as conn:
+            return conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            ).rowcount
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_cache: Optional[SharedCache] = None
+_cache_lock = threading.Lock()
+
+def get_shared_cache() -> SharedCache:
+    """Retourne le cache partagé du processus"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SharedCache(Config.CACHE_DB_FILE)
+        return _cache
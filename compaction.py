@@ -0,0 +1,251 @@
+# compaction.py
+"""
+Rétention, compaction et archivage de la mémoire des recherches.
+
+La compaction travaille sur un instantané de l'historique: les entrées
+expirées selon la ``RetentionPolicy`` sont exportées dans un segment
+d'archive compressé (JSON Lines + gzip), retirées du store, puis les
+contenus qui ne sont plus référencés sont supprimés. Les écrivains ne sont
+bloqués que pendant la suppression des entrées, jamais pendant l'export.
+"""
+import gzip
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import Config
+from memory_store import FileLock, MemoryStore
+from metrics import metrics
+from serialization import dumps, loads
+
+
+class RetentionPolicy:
+    """Politique de rétention par âge, nombre d'entrées et taille des contenus (0 = illimité)"""
+
+    def __init__(self, max_age_days: int = 0, max_entries: int = 0, max_bytes: int = 0):
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_config(cls) -> "RetentionPolicy":
+        return cls(
+            max_age_days=Config.MEMORY_RETENTION_DAYS,
+            max_entries=Config.MEMORY_MAX_ENTRIES,
+            max_bytes=Config.MEMORY_MAX_BYTES
+        )
+
+    def select_expired(self, history: List[Dict[str, Any]], blob_size) -> List[Dict[str, Any]]:
+        """Entrées à retirer, en conservant les plus récentes"""
+        expired_ids = set()
+
+        if self.max_age_days:
+            limit = datetime.now() - timedelta(days=self.max_age_days)
+            for item in history:
+                try:
+                    if datetime.fromisoformat(item['timestamp']) < limit:
+                        expired_ids.add(item['id'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+        remaining = [item for item in history if item['id'] not in expired_ids]
+
+        if self.max_entries and len(remaining) > self.max_entries:
+            for item in remaining[:len(remaining) - self.max_entries]:
+                expired_ids.add(item['id'])
+            remaining = remaining[len(remaining) - self.max_entries:]
+
+        if self.max_bytes:
+            # Parcours du plus récent au plus ancien; un contenu partagé n'est compté qu'une fois
+            total, seen = 0, set()
+            for item in reversed(remaining):
+                cid = item.get('content_id')
+                if cid and cid not in seen:
+                    seen.add(cid)
+                    total += blob_size(cid)
+                if total > self.max_bytes:
+                    expired_ids.add(item['id'])
+
+        return [item for item in history if item['id'] in expired_ids]
+
+
+class MemoryArchive:
+    """Segments d'archive compressés, relus à la demande"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, name: str) -> str:
+        # Le nom vient de l'API: on interdit toute sortie du répertoire d'archive
+        if os.path.basename(name) != name or not name.endswith('.jsonl.gz'):
+            raise ValueError(f"Segment d'archive invalide: {name}")
+        return os.path.join(self.directory, name)
+
+    def write_segment(self, entries: List[Dict[str, Any]]) -> str:
+        """Écrit un segment (une entrée JSON par ligne) et retourne son nom"""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"segment-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.jsonl.gz"
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        with gzip.open(tmp_path, 'wb') as f:
+            for entry in entries:
+                f.write(dumps(entry) + b"\n")
+        os.replace(tmp_path, self._path(name))
+        return name
+
+    def list_segments(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            {'name': name, 'size_bytes': os.path.getsize(os.path.join(self.directory, name))}
+            for name in sorted(os.listdir(self.directory))
+            if name.endswith('.jsonl.gz')
+        ]
+
+    def iter_segment(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Lecture paresseuse: les entrées sont décompressées au fil de l'itération"""
+        with gzip.open(self._path(name), 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+
+    def read_segment(self, name: str, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        entries = []
+        for index, entry in enumerate(self.iter_segment(name)):
+            if index >= offset + limit:
+                break
+            if index >= offset:
+                entries.append(entry)
+        return entries
+
+    def restore_segment(self, name: str, store: MemoryStore) -> int:
+        """Recharge les entrées d'un segment dans la mémoire active"""
+        restored = 0
+        for entry in self.iter_segment(name):
+            record = {key: value for key, value in entry.items()
+                      if key not in ('id', 'content_id', 'preview', 'content_length', '_inline_content')}
+            if record.get('final_content') is None:
+                # Segments écrits sans contenu: on récupère au mieux le contenu en ligne ou l'aperçu
+                record['final_content'] = entry.get('_inline_content') or entry.get('preview') or ''
+            store.append(record)
+            restored += 1
+        return restored
+
+
+class Compactor:
+    """Applique la politique de rétention, archive et nettoie la mémoire"""
+
+    def __init__(self, store: MemoryStore, archive: MemoryArchive, policy: RetentionPolicy,
+                 lock_path: str, content_grace_seconds: float = 300):
+        self.store = store
+        self.archive = archive
+        self.policy = policy
+        self.lock = FileLock(lock_path)
+        self.content_grace_seconds = content_grace_seconds
+
+    def run(self) -> Dict[str, Any]:
+        """Une passe de compaction; ignorée si un autre processus compacte déjà"""
+        with self.lock.acquire(blocking=False) as acquired:
+            if not acquired:
+                return {'skipped': True}
+            start = time.perf_counter()
+
+            # 1. Instantané sans verrou long et sélection des entrées expirées
+            history = self.store.list_history()
+            expired = self.policy.select_expired(history, self.store.contents.blob_size)
+
+            # 2. Export des entrées expirées avec leur contenu, avant toute suppression.
+            # Une entrée dont le contenu est introuvable n'est ni archivée ni supprimée
+            self.store.load_contents(expired)
+            exported = [entry for entry in expired if entry.get('final_content') is not None]
+            kept = len(expired) - len(exported)
+            if kept:
+                metrics.increment("memory_compaction_unexported", kept)
+                print(f"[Compaction] {kept} entrée(s) conservée(s): contenu introuvable")
+            segment = self.archive.write_segment(exported) if exported else None
+
+            # 3. Suppression des entrées exportées puis des contenus orphelins
+            removed = self.store.remove_entries({entry['id'] for entry in exported})
+            referenced = self.store.referenced_content_ids()
+            collected = 0
+            for cid in list(self.store.contents.collectable_ids(self.content_grace_seconds)):
+                if cid not in referenced:
+                    self.store.contents.delete(cid)
+                    collected += 1
+
+            # 4. Reconstruction des index (index plein texte réparé s'il ne couvre plus les entrées)
+            if self.store.repair_index():
+                metrics.increment("memory_index_repairs")
+                print("[Compaction] Index plein texte reconstruit")
+            self.store.rebuild_indexes()
+
+            duration = time.perf_counter() - start
+            stats = self.store.stats()
+            metrics.observe("memory_compaction_seconds", duration)
+            metrics.increment("memory_entries_expired", removed)
+            metrics.increment("memory_contents_collected", collected)
+            update_memory_gauges(stats)
+
+            if removed or collected:
+                print(f"[Compaction] {removed} entrée(s) archivée(s), "
+                      f"{collected} contenu(s) supprimé(s) en {duration:.2f}s")
+
+            return {
+                'skipped': False,
+                'expired_entries': removed,
+                'unexported_entries': kept,
+                'collected_contents': collected,
+                'archive_segment': segment,
+                'duration_seconds': round(duration, 4),
+                **stats
+            }
+
+
+def update_memory_gauges(stats: Dict[str, int]) -> None:
+    metrics.set_gauge("memory_entries", stats['entries'])
+    metrics.set_gauge("memory_metadata_bytes", stats['metadata_bytes'])
+    metrics.set_gauge("memory_content_bytes", stats['content_bytes'])
+
+
+class CompactionScheduler:
+    """Lance la compaction périodiquement dans un thread en arrière-plan"""
+
+    def __init__(self, compactor: Compactor, interval: float):
+        self.compactor = compactor
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="memory-compaction", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.compactor.run()
+            except Exception as e:
+                print(f"[Compaction] Erreur: {str(e)}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_compactor: Optional[Compactor] = None
+
+def get_compactor(store: MemoryStore) -> Compactor:
+    """Compacteur du processus, configuré depuis ``Config``"""
+    global _compactor
+    if _compactor is None:
+        _compactor = Compactor(
+            store,
+            MemoryArchive(Config.MEMORY_ARCHIVE_DIR),
+            RetentionPolicy.from_config(),
+            lock_path=os.path.join(Config.MEMORY_ARCHIVE_DIR, 'compaction.lock')
+        )
+    return _compactor
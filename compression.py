@@ -0,0 +1,120 @@
+# compression.py
+"""
+Compression des réponses HTTP (brotli ou gzip) au-delà d'une taille minimale.
+
+Middleware ASGI: l'encodage est négocié avec l'en-tête ``Accept-Encoding``
+du client (brotli prioritaire si le paquet optionnel ``brotli`` est
+installé, gzip sinon). Seules les réponses d'un seul bloc (toutes celles de
+l'API) sont compressées; les réponses diffusées par morceaux sont
+transmises telles quelles.
+"""
+import gzip
+from typing import Dict, List, Optional, Tuple
+
+from metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle: gzip seulement
+    brotli = None
+
+# Types de contenu qui gagnent à être compressés
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Encodages acceptés par le client et leur poids (``q``)"""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        parts = [part.strip() for part in item.split(";")]
+        if not parts[0]:
+            continue
+        weight = 1.0
+        for parameter in parts[1:]:
+            if parameter.startswith("q="):
+                try:
+                    weight = float(parameter[2:])
+                except ValueError:
+                    weight = 0.0
+        accepted[parts[0].lower()] = weight
+    return accepted
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    accepted = parse_accept_encoding(header)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    for encoding in candidates:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress_body(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        # Qualité brotli de 0 à 11, niveau gzip de 1 à 9: même position relative
+        return brotli.compress(body, quality=min(11, round(level * 11 / 9)))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compresse les réponses d'au moins ``minimum_size`` octets"""
+
+    def __init__(self, app, minimum_size: int = 1024, level: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # En-têtes retenus jusqu'au corps: la décision dépend de sa taille
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers: List[Tuple[bytes, bytes]] = list(start_message.get("headers") or [])
+            names = {name.lower(): value for name, value in headers}
+            content_type = names.get(b"content-type", b"").decode("latin-1")
+            if (message.get("more_body") or len(body) < self.minimum_size
+                    or b"content-encoding" in names
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress_body(body, encoding, self.level)
+            metrics.increment(f"responses_compressed_{encoding}")
+            metrics.increment("response_bytes_saved", len(body) - len(compressed))
+            headers = [(name, value) for name, value in headers
+                       if name.lower() not in (b"content-length", b"vary")]
+            vary = names.get(b"vary")
+            headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
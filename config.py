@@ -1,36 +1,147 @@
-# config.py
-import os
-from typing import Optional
-
-class Config:
-    """Configuration centralisée pour le système multi-agent"""
-    
-    # Paramètres des modèles
-    GEMINI_MODEL: str = "gemini-2.0-flash-exp"
-    GEMINI_TEMPERATURE: float = 0.7
-    GEMINI_MAX_TOKENS: int = 4000
-    
-    # Paramètres de recherche
-    TAVILY_MAX_RESULTS: int = 5
-    TAVILY_SEARCH_DEPTH: str = "advanced"
-    
-    # Chemins des fichiers
-    MEMORY_FILE: str = "research_memory.json"
-
-    @classmethod
-    def get_gemini_api_key(cls) -> Optional[str]:
-        import os
-        return os.getenv("GEMINI_API_KEY")
-
-    @classmethod
-    def get_tavily_api_key(cls) -> Optional[str]:
-        import os
-        return os.getenv("TAVILY_API_KEY")
-
-    @classmethod
-    def validate(cls) -> bool:
-        if not cls.get_gemini_api_key():
-            raise ValueError("GEMINI_API_KEY n'est pas définie")
-        if not cls.get_tavily_api_key():
-            raise ValueError("TAVILY_API_KEY n'est pas définie")
+# config.py
+import os
+from typing import Dict, Optional
+
+class Config:
+    """Configuration centralisée pour le système multi-agent"""
+    
+    # Backends hors ligne (offline.py) à la place de Tavily et Gemini: ni réseau ni clés d'API
+    OFFLINE_MODE: bool = os.getenv("OFFLINE_MODE", "false").lower() == "true"
+    OFFLINE_LATENCY: float = float(os.getenv("OFFLINE_LATENCY", "0.2"))
+    
+    # Paramètres des modèles
+    GEMINI_MODEL: str = "gemini-2.0-flash-exp"
+    GEMINI_TEMPERATURE: float = 0.7
+    GEMINI_MAX_TOKENS: int = 4000
+    
+    # Budgets de tokens (0 = illimité): par exécution, et quotidien pour tous les workers.
+    # Au-delà de BUDGET_DOWNGRADE_RATIO du budget quotidien, GEMINI_BUDGET_MODEL remplace le modèle
+    REQUEST_TOKEN_BUDGET: int = int(os.getenv("REQUEST_TOKEN_BUDGET", "0"))
+    DAILY_TOKEN_BUDGET: int = int(os.getenv("DAILY_TOKEN_BUDGET", "0"))
+    BUDGET_DOWNGRADE_RATIO: float = float(os.getenv("BUDGET_DOWNGRADE_RATIO", "0.8"))
+    GEMINI_BUDGET_MODEL: str = os.getenv("GEMINI_BUDGET_MODEL", "gemini-1.5-flash-8b")
+    USAGE_DB_FILE: str = os.getenv("USAGE_DB_FILE", "research_usage.db")
+    
+    # Estimation des coûts (rapports d'évaluation): USD par million de tokens et par recherche
+    GEMINI_INPUT_COST_PER_1M: float = 0.10
+    GEMINI_OUTPUT_COST_PER_1M: float = 0.40
+    TAVILY_COST_PER_SEARCH: Dict[str, float] = {"basic": 0.008, "advanced": 0.016}
+    
+    # Paramètres de recherche
+    TAVILY_MAX_RESULTS: int = 5
+    # "basic", "advanced" ou "adaptive" (basic puis advanced si les résultats sont insuffisants)
+    TAVILY_SEARCH_DEPTH: str = os.getenv("TAVILY_SEARCH_DEPTH", "adaptive")
+    
+    # Recherche adaptative: seuils d'escalade vers la profondeur "advanced"
+    TAVILY_ADAPTIVE_BASIC_RESULTS: int = 3
+    TAVILY_ADAPTIVE_MIN_SCORE: float = 0.5
+    TAVILY_ADAPTIVE_MIN_COVERAGE: float = 0.6
+    
+    # Délais (secondes) des appels externes et d'une exécution complète du pipeline
+    SEARCH_TIMEOUT: float = float(os.getenv("SEARCH_TIMEOUT", "15"))
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))
+    RUN_DEADLINE: float = float(os.getenv("RUN_DEADLINE", "180"))
+    
+    # Graphe LangGraph: étapes indépendantes en parallèle (false: chaîne linéaire des profils)
+    WORKFLOW_PARALLEL: bool = os.getenv("WORKFLOW_PARALLEL", "true").lower() == "true"
+    # Super-étapes LangGraph par exécution (25 par défaut: deux rejets de validation suffisaient)
+    WORKFLOW_RECURSION_LIMIT: int = int(os.getenv("WORKFLOW_RECURSION_LIMIT", "100"))
+    EXTERNAL_CALL_THREADS: int = int(os.getenv("EXTERNAL_CALL_THREADS", "32"))
+    
+    # Mode dégradé: résumé extractif local si le LLM dépasse son délai ou si son circuit est ouvert
+    DEGRADED_MODE_ENABLED: bool = os.getenv("DEGRADED_MODE_ENABLED", "true").lower() == "true"
+    EXTRACTIVE_SUMMARY_SENTENCES: int = 8
+    
+    # Recherche doublée si la première n'a pas répondu après le p95 des latences observées
+    SEARCH_HEDGE_ENABLED: bool = os.getenv("SEARCH_HEDGE_ENABLED", "true").lower() == "true"
+    SEARCH_HEDGE_MIN_SAMPLES: int = 20
+    SEARCH_HEDGE_DEFAULT_DELAY: float = 3.0
+    SEARCH_HEDGE_MIN_DELAY: float = 0.5
+    
+    # Disjoncteurs par fournisseur: ouverture après N échecs consécutifs, essai après le délai
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RESET_TIMEOUT: float = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+    
+    # Chemins des fichiers
+    MEMORY_FILE: str = os.getenv("MEMORY_FILE", "research_memory.json")
+    
+    # Mémoire partagée entre processus: "json" (fichier + verrou) ou "sqlite"
+    MEMORY_BACKEND: str = os.getenv("MEMORY_BACKEND", "json")
+    MEMORY_DB_FILE: str = os.getenv("MEMORY_DB_FILE", "research_memory.db")
+    
+    # Contenus compressés et dédupliqués (backend json), longueur des aperçus
+    MEMORY_CONTENT_DIR: str = os.getenv("MEMORY_CONTENT_DIR", "research_content")
+    MEMORY_PREVIEW_CHARS: int = 300
+    
+    # Index plein texte de la mémoire (backend json; le backend sqlite l'héberge dans sa base)
+    MEMORY_INDEX_FILE: str = os.getenv("MEMORY_INDEX_FILE", "research_index.db")
+    
+    # Rétention de la mémoire (0 = illimité) et compaction en arrière-plan
+    MEMORY_RETENTION_DAYS: int = int(os.getenv("MEMORY_RETENTION_DAYS", "0"))
+    MEMORY_MAX_ENTRIES: int = int(os.getenv("MEMORY_MAX_ENTRIES", "0"))
+    MEMORY_MAX_BYTES: int = int(os.getenv("MEMORY_MAX_BYTES", "0"))
+    MEMORY_ARCHIVE_DIR: str = os.getenv("MEMORY_ARCHIVE_DIR", "research_archive")
+    MEMORY_COMPACTION_INTERVAL: int = int(os.getenv("MEMORY_COMPACTION_INTERVAL", "3600"))
+    
+    # Exécutions conservées pour les révisions humaines (0 = sans limite de durée)
+    RUNS_DB_FILE: str = os.getenv("RUNS_DB_FILE", "research_runs.db")
+    RUN_RETENTION_DAYS: int = int(os.getenv("RUN_RETENTION_DAYS", "7"))
+    
+    # Admission des exécutions (par worker): capacité, plafonds par classe, file d'attente (0 = illimitée)
+    # Le plafond batch inférieur à la capacité réserve des places aux requêtes interactives
+    ADMISSION_CAPACITY: int = int(os.getenv("ADMISSION_CAPACITY", "8"))
+    ADMISSION_INTERACTIVE_LIMIT: int = int(os.getenv("ADMISSION_INTERACTIVE_LIMIT", "8"))
+    ADMISSION_BATCH_LIMIT: int = int(os.getenv("ADMISSION_BATCH_LIMIT", "6"))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "500"))
+    # Poids du partage équitable entre tenants: "tenant=poids,autre=poids" (1 par défaut)
+    ADMISSION_TENANT_WEIGHTS: str = os.getenv("ADMISSION_TENANT_WEIGHTS", "")
+    
+    # Registre des sources web (URL canonisées, contenus dédupliqués entre exécutions)
+    SOURCES_DB_FILE: str = os.getenv("SOURCES_DB_FILE", "research_sources.db")
+    SOURCE_RETENTION_DAYS: int = int(os.getenv("SOURCE_RETENTION_DAYS", "30"))
+    SOURCE_CACHE_SIZE: int = 512
+    
+    # Cache partagé entre workers (SQLite local en attendant un store distant)
+    CACHE_DB_FILE: str = os.getenv("CACHE_DB_FILE", "research_cache.db")
+    RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", "3600"))
+    
+    # Stale-while-revalidate: un résultat expiré depuis moins de RESULT_CACHE_STALE_TTL
+    # secondes est servi pendant son recalcul; les requêtes populaires sont rafraîchies
+    # REFRESH_AHEAD_SECONDS avant expiration, dans la limite d'un budget horaire
+    RESULT_CACHE_STALE_TTL: int = int(os.getenv("RESULT_CACHE_STALE_TTL", "600"))
+    REFRESH_INTERVAL: int = int(os.getenv("REFRESH_INTERVAL", "300"))
+    REFRESH_AHEAD_SECONDS: int = int(os.getenv("REFRESH_AHEAD_SECONDS", "600"))
+    REFRESH_MIN_SCORE: float = float(os.getenv("REFRESH_MIN_SCORE", "3"))
+    REFRESH_HALF_LIFE: int = int(os.getenv("REFRESH_HALF_LIFE", "86400"))
+    REFRESH_MAX_RUNS_PER_HOUR: int = int(os.getenv("REFRESH_MAX_RUNS_PER_HOUR", "20"))
+    
+    # Paramètres du serveur
+    API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
+    API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    API_RELOAD: bool = os.getenv("API_RELOAD", "true").lower() == "true"
+    SHUTDOWN_TIMEOUT: int = int(os.getenv("SHUTDOWN_TIMEOUT", "30"))
+    
+    # Compression des réponses (brotli si installé, gzip sinon) au-delà de cette taille (0 = désactivée)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    RESPONSE_COMPRESSION_LEVEL: int = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "5"))
+
+    @classmethod
+    def get_gemini_api_key(cls) -> Optional[str]:
+        import os
+        return os.getenv("GEMINI_API_KEY")
+
+    @classmethod
+    def get_tavily_api_key(cls) -> Optional[str]:
+        import os
+        return os.getenv("TAVILY_API_KEY")
+
+    @classmethod
+    def validate(cls) -> bool:
+        if cls.OFFLINE_MODE:
+            return True
+        if not cls.get_gemini_api_key():
+            raise ValueError("GEMINI_API_KEY n'est pas définie")
+        if not cls.get_tavily_api_key():
+            raise ValueError("TAVILY_API_KEY n'est pas définie")
         return True
\ No newline at end of file
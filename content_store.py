@@ -0,0 +1,282 @@
+# content_store.py
+"""
+Stockage des contenus de recherche, adressés par leur contenu et compressés.
+
+Chaque texte est identifié par le SHA-256 de son contenu: un texte identique
+n'est stocké qu'une fois, quel que soit le nombre d'entrées qui le référencent.
+Les corps sont compressés avec zstd si le paquet optionnel ``zstandard`` est
+installé, zlib sinon, avec dans les deux cas un dictionnaire partagé qui
+améliore le taux de compression des textes courts et répétitifs.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle: repli sur zlib
+    zstandard = None
+
+
+# Dictionnaire partagé: tournures et balisage fréquents dans les synthèses produites.
+# Ne pas modifier sans changer les identifiants de codec (les blobs existants en dépendent).
+SHARED_DICTIONARY = " ".join([
+    "Source", "Sources", "Résumé", "Introduction", "Conclusion", "Contexte",
+    "Points clés", "En résumé", "Par ailleurs", "En effet", "Cependant", "notamment",
+    "l'intelligence artificielle", "la recherche", "les données", "le développement",
+    "selon", "dans le cadre de", "il est important de", "en outre", "de plus",
+    "Les principaux", "Les enjeux", "Les avantages", "Les limites", "Les perspectives",
+    "académique", "journalistique", "technique", "vulgarisation",
+    "## ", "### ", "**", "* ", "- ", "1. ", "2. ", "3. ", "\n\n", "https://", "www.",
+    "de la ", "de l'", " des ", " les ", " une ", " est ", " sont ", " pour ", " avec ",
+    " qui ", " que ", " dans ", " sur ", " par ", " plus ", " ainsi ", " comme ",
+]).encode('utf-8')
+
+CODEC_RAW = b'r'
+CODEC_ZLIB = b'z'
+CODEC_ZSTD = b's'
+
+# En dessous de cette taille, la compression coûte plus qu'elle ne rapporte
+MIN_COMPRESS_BYTES = 64
+
+
+def content_id(text: str) -> str:
+    """Identifiant d'un contenu: SHA-256 hexadécimal du texte UTF-8"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compress(text: str) -> bytes:
+    """Compresse un texte, préfixé d'un octet identifiant le codec"""
+    data = text.encode('utf-8')
+    if len(data) < MIN_COMPRESS_BYTES:
+        return CODEC_RAW + data
+    if zstandard is not None:
+        dictionary = zstandard.ZstdCompressionDict(
+            SHARED_DICTIONARY, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=10, dict_data=dictionary).compress(data)
+    compressor = zlib.compressobj(level=9, zdict=SHARED_DICTIONARY)
+    return CODEC_ZLIB + compressor.compress(data) + compressor.flush()
+
+
+def decompress(blob: bytes) -> str:
+    """Décompresse un blob produit par ``compress``"""
+    codec, payload = blob[:1], blob[1:]
+    if codec == CODEC_RAW:
+        data = payload
+    elif codec == CODEC_ZLIB:
+        decompressor = zlib.decompressobj(zdict=SHARED_DICTIONARY)
+        data = decompressor.decompress(payload) + decompressor.flush()
+    elif codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Contenu compressé avec zstd: installez le paquet 'zstandard'")
+        dictionary = zstandard.ZstdCompressionDict(
+            SHARED_DICTIONARY, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+        data = zstandard.ZstdDecompressor(dict_data=dictionary).decompress(payload)
+    else:
+        raise ValueError(f"Codec de contenu inconnu: {codec!r}")
+    return data.decode('utf-8')
+
+
+class ContentStore(ABC):
+    """Interface commune: stockage de blobs compressés indexés par identifiant"""
+
+    def put(self, text: str) -> str:
+        """Stocke un texte (une seule fois) et retourne son identifiant"""
+        cid = content_id(text)
+        if self.exists(cid):
+            # Rafraîchit la date du contenu: le protège du ramasse-miettes
+            # le temps que l'entrée qui le référence soit écrite
+            self._touch(cid)
+        else:
+            self._write_blob(cid, compress(text))
+        return cid
+
+    def get(self, cid: str) -> Optional[str]:
+        blob = self._read_blob(cid)
+        return decompress(blob) if blob is not None else None
+
+    @abstractmethod
+    def exists(self, cid: str) -> bool:
+        """Indique si un contenu est stocké"""
+
+    @abstractmethod
+    def delete(self, cid: str) -> None:
+        """Supprime un contenu (sans erreur s'il n'existe pas)"""
+
+    @abstractmethod
+    def ids(self) -> Iterator[str]:
+        """Identifiants des contenus stockés"""
+
+    @abstractmethod
+    def size_bytes(self) -> int:
+        """Taille compressée totale des contenus"""
+
+    @abstractmethod
+    def blob_size(self, cid: str) -> int:
+        """Taille compressée d'un contenu (0 s'il n'existe pas)"""
+
+    @abstractmethod
+    def collectable_ids(self, grace_seconds: float) -> Iterator[str]:
+        """Contenus non écrits ni réutilisés depuis ``grace_seconds``"""
+
+    def clear(self) -> None:
+        for cid in list(self.ids()):
+            self.delete(cid)
+
+    @abstractmethod
+    def _touch(self, cid: str) -> None:
+        """Rafraîchit la date d'un contenu existant"""
+
+    @abstractmethod
+    def _read_blob(self, cid: str) -> Optional[bytes]:
+        """Blob compressé d'un contenu (None s'il n'existe pas)"""
+
+    @abstractmethod
+    def _write_blob(self, cid: str, blob: bytes) -> None:
+        """Écrit le blob compressé d'un nouveau contenu"""
+
+
+class FileContentStore(ContentStore):
+    """Un fichier par contenu, réparti en sous-répertoires par préfixe d'identifiant"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, cid: str) -> str:
+        return os.path.join(self.directory, cid[:2], cid)
+
+    def exists(self, cid: str) -> bool:
+        return os.path.exists(self._path(cid))
+
+    def _read_blob(self, cid: str) -> Optional[bytes]:
+        try:
+            with open(self._path(cid), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_blob(self, cid: str, blob: bytes) -> None:
+        # Écriture atomique: deux workers écrivant le même contenu produisent le même fichier
+        directory = os.path.dirname(self._path(cid))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.content-', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, self._path(cid))
+
+    def delete(self, cid: str) -> None:
+        try:
+            os.remove(self._path(cid))
+        except FileNotFoundError:
+            pass
+
+    def ids(self) -> Iterator[str]:
+        if not os.path.isdir(self.directory):
+            return
+        for prefix in os.listdir(self.directory):
+            subdirectory = os.path.join(self.directory, prefix)
+            if os.path.isdir(subdirectory):
+                for name in os.listdir(subdirectory):
+                    if not name.startswith('.'):
+                        yield name
+
+    def size_bytes(self) -> int:
+        return sum(self.blob_size(cid) for cid in self.ids())
+
+    def blob_size(self, cid: str) -> int:
+        try:
+            return os.path.getsize(self._path(cid))
+        except FileNotFoundError:
+            return 0
+
+    def collectable_ids(self, grace_seconds: float) -> Iterator[str]:
+        limit = time.time() - grace_seconds
+        for cid in list(self.ids()):
+            try:
+                if os.path.getmtime(self._path(cid)) < limit:
+                    yield cid
+            except FileNotFoundError:
+                continue
+
+    def _touch(self, cid: str) -> None:
+        try:
+            os.utime(self._path(cid))
+        except FileNotFoundError:
+            pass
+
+
+class SqliteContentStore(ContentStore):
+    """Contenus stockés dans une table de la base SQLite de la mémoire"""
+
+    def __init__(self, connection: Callable[[], sqlite3.Connection]):
+        self._connection = connection
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS contents (
+                    id TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    created_at REAL
+                )
+            """)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(contents)")}
+            if 'created_at' not in existing:
+                conn.execute("ALTER TABLE contents ADD COLUMN created_at REAL")
+
+    def exists(self, cid: str) -> bool:
+        return self._connection().execute(
+            "SELECT 1 FROM contents WHERE id = ?", (cid,)
+        ).fetchone() is not None
+
+    def _read_blob(self, cid: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT data FROM contents WHERE id = ?", (cid,)
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def _write_blob(self, cid: str, blob: bytes) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO contents (id, data, created_at) VALUES (?, ?, ?)",
+                (cid, blob, time.time())
+            )
+
+    def delete(self, cid: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM contents WHERE id = ?", (cid,))
+
+    def ids(self) -> Iterator[str]:
+        for (cid,) in self._connection().execute("SELECT id FROM contents").fetchall():
+            yield cid
+
+    def size_bytes(self) -> int:
+        row = self._connection().execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM contents").fetchone()
+        return row[0]
+
+    def blob_size(self, cid: str) -> int:
+        row = self._connection().execute(
+            "SELECT LENGTH(data) FROM contents WHERE id = ?", (cid,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def collectable_ids(self, grace_seconds: float) -> Iterator[str]:
+        rows = self._connection().execute(
+            "SELECT id FROM contents WHERE created_at IS NULL OR created_at < ?",
+            (time.time() - grace_seconds,)
+        ).fetchall()
+        for (cid,) in rows:
+            yield cid
+
+    def _touch(self, cid: str) -> None:
+        with self._connection() as conn:
+            conn.execute("UPDATE contents SET created_at = ? WHERE id = ?", (time.time(), cid))
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM contents")
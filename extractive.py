@@ -0,0 +1,98 @@
+# extractive.py
+"""
+Résumé extractif local, utilisé en mode dégradé quand le LLM est indisponible.
+
+Les phrases des résultats de recherche sont notées sans appel réseau:
+- centralité: fréquence de leurs termes dans l'ensemble des résultats
+- pertinence: part des termes de la requête qu'elles contiennent
+- position: les premières phrases d'un résultat résument souvent la page
+- score de pertinence de la source renvoyé par le moteur de recherche
+Les meilleures phrases non redondantes sont restituées dans l'ordre des
+sources, avec leur référence.
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Set
+
+# Mots vides ignorés dans le calcul des scores (français et anglais)
+STOPWORDS = {
+    "les", "des", "une", "est", "sont", "pour", "avec", "qui", "que", "dans", "sur",
+    "par", "plus", "ainsi", "comme", "cette", "ces", "aux", "son", "ses", "leur",
+    "leurs", "mais", "pas", "été", "être", "fait", "elle", "ils", "nous", "vous",
+    "the", "and", "for", "are", "with", "that", "this", "from", "was", "were",
+    "has", "have", "its", "not", "but", "can", "will", "which", "their",
+}
+
+MIN_SENTENCE_CHARS = 40
+MAX_SENTENCE_CHARS = 400
+REDUNDANCY_THRESHOLD = 0.6
+
+
+def _terms(text: str) -> List[str]:
+    return [term for term in re.findall(r"\w+", text.lower(), flags=re.UNICODE)
+            if len(term) > 2 and term not in STOPWORDS and not term.isdigit()]
+
+
+def _sentences(text: str) -> List[str]:
+    sentences = re.split(r"(?<=[.!?])\s+", " ".join(text.split()))
+    return [s for s in sentences if MIN_SENTENCE_CHARS <= len(s) <= MAX_SENTENCE_CHARS]
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def extractive_summary(query: str, search_results: List[Dict[str, Any]],
+                       max_sentences: int = 8) -> str:
+    """Résumé par sélection des phrases les mieux notées des résultats"""
+    candidates = []
+    for source_index, result in enumerate(search_results, 1):
+        for position, sentence in enumerate(_sentences(result.get('content') or '')):
+            terms = _terms(sentence)
+            if terms:
+                candidates.append({
+                    'text': sentence,
+                    'terms': terms,
+                    'source': source_index,
+                    'position': position,
+                    'source_score': result.get('score') or 0.0
+                })
+
+    if not candidates:
+        # Rien d'exploitable dans les contenus: on se contente des sources
+        lines = [f"- {r.get('title', '')} ({r.get('url', '')})" for r in search_results]
+        return "\n".join([f"Sources trouvées pour « {query} » :"] + lines)
+
+    corpus = Counter(term for candidate in candidates for term in set(candidate['terms']))
+    query_terms = set(_terms(query))
+
+    for candidate in candidates:
+        unique = set(candidate['terms'])
+        centrality = sum(math.log1p(corpus[term]) for term in unique) / math.sqrt(len(candidate['terms']))
+        relevance = len(unique & query_terms) / len(query_terms) if query_terms else 0.0
+        position = 1.0 / (1 + candidate['position'])
+        candidate['score'] = centrality + 2.0 * relevance + 0.5 * position + candidate['source_score']
+
+    selected: List[Dict[str, Any]] = []
+    for candidate in sorted(candidates, key=lambda c: c['score'], reverse=True):
+        unique = set(candidate['terms'])
+        if any(_similarity(unique, set(s['terms'])) > REDUNDANCY_THRESHOLD for s in selected):
+            continue
+        selected.append(candidate)
+        if len(selected) >= max_sentences:
+            break
+
+    # Restitution dans l'ordre des sources pour garder un fil de lecture
+    selected.sort(key=lambda c: (c['source'], c['position']))
+    used_sources = sorted({c['source'] for c in selected})
+
+    lines = [f"Synthèse extractive pour « {query} » :", ""]
+    lines += [f"- {c['text']} [{c['source']}]" for c in selected]
+    lines += ["", "Sources :"]
+    for index in used_sources:
+        result = search_results[index - 1]
+        lines.append(f"[{index}] {result.get('title', '')} - {result.get('url', '')}")
+    return "\n".join(lines)
@@ -1,241 +1,640 @@
-# main.py
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
-import time
-from datetime import datetime
-
-from orchestrator import orchestrator
-from models import ResearchRequest, ResearchOutput, SearchResult, AgentState
-from config import Config
-
-from dotenv import load_dotenv
-load_dotenv()
-
-from config import Config
-Config.validate()
-
-import os
-print("GEMINI_API_KEY =", os.getenv("GEMINI_API_KEY"))
-
-# Configuration de l'application FastAPI
-app = FastAPI(
-    title="Assistant de Recherche Multi-Agent",
-    description="Système multi-agent orchestré avec LangGraph pour la recherche intelligente",
-    version="1.0.0"
-)
-
-# Configuration CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-class HealthResponse(BaseModel):
-    status: str
-    timestamp: datetime
-    agents_available: bool
-
-class ErrorResponse(BaseModel):
-    error: str
-    details: Optional[str] = None
-    timestamp: datetime
-
-@app.get("/", response_model=Dict[str, str])
-async def root():
-    """Point d'entrée de l'API"""
-    return {
-        "message": "Assistant de Recherche Multi-Agent",
-        "version": "1.0.0",
-        "status": "operational",
-        "documentation": "/docs"
-    }
-
-@app.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Vérification de l'état de santé du système"""
-    try:
-        Config.validate()
-        agents_available = True
-    except Exception:
-        agents_available = False
-    
-    return HealthResponse(
-        status="healthy" if agents_available else "degraded",
-        timestamp=datetime.now(),
-        agents_available=agents_available
-    )
-
-@app.post("/research", response_model=ResearchOutput)
-async def research(request: ResearchRequest):
-    """
-    Endpoint principal pour effectuer une recherche avec le système multi-agent
-    
-    Args:
-        request: Requête de recherche contenant la query et les paramètres
-    
-    Returns:
-        ResearchOutput: Résultat complet de la recherche
-    """
-    start_time = time.time()
-    
-    try:
-        # Validation des paramètres
-        if not request.query.strip():
-            raise HTTPException(
-                status_code=400, 
-                detail="La requête de recherche ne peut pas être vide"
-            )
-        
-        # Traitement par le système multi-agent
-        result_state = await orchestrator.process_research_request(
-            query=request.query,
-            style=request.style
-        )
-        
-        # Vérification des erreurs
-        if result_state.error_message:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erreur du système multi-agent: {result_state.error_message}"
-            )
-        
-        # Construction de la réponse
-        search_results = []
-        if result_state.search_results:
-            for result in result_state.search_results:
-                search_results.append(SearchResult(
-                    title=result.get('title', ''),
-                    url=result.get('url', ''),
-                    content=result.get('content', ''),
-                    score=result.get('score')
-                ))
-        
-        processing_time = time.time() - start_time
-        
-        output = ResearchOutput(
-            query=result_state.query,
-            final_content=result_state.final_result or "Contenu non disponible",
-            search_results=search_results,
-            summary=result_state.summary or "Résumé non disponible",
-            edited_content=result_state.edited_content or "Contenu édité non disponible",
-            validation_status=result_state.validation_approved or False,
-            feedback=result_state.feedback,
-            timestamp=result_state.timestamp,
-            processing_time=round(processing_time, 2)
-        )
-        
-        return output
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur interne du serveur: {str(e)}"
-        )
-
-@app.get("/memory", response_model=Dict[str, Any])
-async def get_memory():
-    """
-    Récupère l'historique des recherches stockées en mémoire
-    
-    Returns:
-        Dict contenant l'historique des recherches
-    """
-    try:
-        memory_data = orchestrator.get_memory_history()
-        return memory_data
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur lors de la récupération de la mémoire: {str(e)}"
-        )
-
-@app.get("/memory/stats", response_model=Dict[str, Any])
-async def get_memory_stats():
-    """
-    Récupère les statistiques de l'historique des recherches
-    
-    Returns:
-        Dict contenant les statistiques
-    """
-    try:
-        memory_data = orchestrator.get_memory_history()
-        
-        if 'error' in memory_data:
-            return memory_data
-        
-        history = memory_data.get('research_history', [])
-        
-        # Calcul des statistiques
-        total_searches = len(history)
-        approved_searches = sum(1 for item in history if item.get('validation_approved', False))
-        
-        styles_used = {}
-        for item in history:
-            style = item.get('style', 'unknown')
-            styles_used[style] = styles_used.get(style, 0) + 1
-        
-        stats = {
-            'total_searches': total_searches,
-            'approved_searches': approved_searches,
-            'approval_rate': round(approved_searches / total_searches * 100, 2) if total_searches > 0 else 0,
-            'styles_used': styles_used,
-            'last_search': history[-1]['timestamp'] if history else None
-        }
-        
-        return stats
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur lors du calcul des statistiques: {str(e)}"
-        )
-
-@app.delete("/memory", response_model=Dict[str, str])
-async def clear_memory():
-    """
-    Efface l'historique des recherches
-    
-    Returns:
-        Message de confirmation
-    """
-    try:
-        import os
-        from config import Config
-        
-        if os.path.exists(Config.MEMORY_FILE):
-            os.remove(Config.MEMORY_FILE)
-            return {"message": "Mémoire effacée avec succès"}
-        else:
-            return {"message": "Aucune mémoire à effacer"}
-            
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Erreur lors de l'effacement de la mémoire: {str(e)}"
-        )
-
-# Point d'entrée pour le développement
-if __name__ == "__main__":
-    import uvicorn
-    
-    print("🚀 Démarrage de l'Assistant de Recherche Multi-Agent")
-    print("📋 Configuration:")
-    print(f"   - Modèle Gemini: {Config.GEMINI_MODEL}")
-    print(f"   - Fichier mémoire: {Config.MEMORY_FILE}")
-    print(f"   - Max résultats Tavily: {Config.TAVILY_MAX_RESULTS}")
-    print("=" * 50)
-    
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
+# main.py
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
+from typing import Dict, Any, List, Optional, Set
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+
+from orchestrator import orchestrator, PIPELINE_PROFILES
+from memory_store import get_memory_store
+from admission import PRIORITY_CLASSES, AdmissionRejected
+from compression import CompressionMiddleware
+from compaction import CompactionScheduler, get_compactor, update_memory_gauges
+from metrics import metrics
+from refresh import RefreshScheduler
+from resilience import breakers_snapshot
+from runs import RevisionConflict
+from serialization import FastJSONResponse
+from sources import get_source_registry, resolve_sources
+from usage import BudgetExceeded, budget_status
+from models import ResearchRequest, ResearchOutput, SearchResult, AgentState, RevisionRequest, RevisionOutput
+from config import Config
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from config import Config
+Config.validate()
+
+import os
+print("GEMINI_API_KEY =", os.getenv("GEMINI_API_KEY"))
+
+# Configuration de l'application FastAPI
+app = FastAPI(
+    title="Assistant de Recherche Multi-Agent",
+    description="Système multi-agent orchestré avec LangGraph pour la recherche intelligente",
+    version="1.0.0",
+    default_response_class=FastJSONResponse
+)
+
+# Configuration CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Compression brotli/gzip des réponses volumineuses
+if Config.RESPONSE_COMPRESSION_MIN_BYTES > 0:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=Config.RESPONSE_COMPRESSION_MIN_BYTES,
+        level=Config.RESPONSE_COMPRESSION_LEVEL
+    )
+
+# Compaction périodique de la mémoire (démarrée au lancement du worker)
+compaction_scheduler: Optional[CompactionScheduler] = None
+refresh_scheduler: Optional[RefreshScheduler] = None
+
+class HealthResponse(BaseModel):
+    status: str
+    timestamp: datetime
+    agents_available: bool
+    circuit_breakers: Dict[str, Dict[str, Any]] = {}
+
+class ErrorResponse(BaseModel):
+    error: str
+    details: Optional[str] = None
+    timestamp: datetime
+
+def resolve_tenant(tenant_id: Optional[str], api_key: Optional[str]) -> Optional[str]:
+    """Tenant de la requête: en-tête X-Tenant-ID, sinon empreinte de la clé d'API"""
+    if tenant_id:
+        return tenant_id
+    if api_key:
+        return "key-" + hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+    return None
+
+def admission_rejected(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=429, detail=f"Serveur saturé: {str(e)}", headers={"Retry-After": "5"})
+
+def budget_exceeded(e: BudgetExceeded) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e))
+
+# Champs textuels dédupliqués dans la réponse de /research, par ordre de priorité
+DEDUPLICATED_FIELDS = ("final_content", "edited_content", "summary")
+
+def parse_fields(fields: Optional[str]) -> Optional[Dict[str, Optional[Set[str]]]]:
+    """
+    Projection demandée par ``fields`` ("final_content,search_results.url"):
+    champ de premier niveau -> sous-champs des résultats (None = tous)
+    
+    Lève ``ValueError`` pour un champ inconnu.
+    """
+    if not fields:
+        return None
+    projection: Dict[str, Optional[Set[str]]] = {}
+    for item in (part.strip() for part in fields.split(",")):
+        if not item:
+            continue
+        name, _, subfield = item.partition(".")
+        if name not in ResearchOutput.__fields__:
+            raise ValueError(f"Champ inconnu: {name} (disponibles: {', '.join(ResearchOutput.__fields__)})")
+        if not subfield:
+            projection[name] = None
+            continue
+        if name != "search_results" or subfield not in SearchResult.__fields__:
+            raise ValueError(f"Sous-champ inconnu: {item}")
+        if name not in projection or projection[name] is not None:
+            projection.setdefault(name, set()).add(subfield)
+    return projection
+
+def project_output(output: Dict[str, Any], projection: Optional[Dict[str, Optional[Set[str]]]]) -> Dict[str, Any]:
+    """Ne conserve que les champs demandés"""
+    if projection is None:
+        return output
+    projected = {name: output[name] for name in projection if name in output}
+    subfields = projection.get("search_results")
+    if subfields and "search_results" in projected:
+        projected["search_results"] = [
+            {key: value for key, value in result.items() if key in subfields}
+            for result in projected["search_results"]
+        ]
+    return projected
+
+def dedupe_output(output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Remplace par null les textes identiques à un champ précédent
+    
+    ``duplicates`` indique pour chaque champ vidé le champ qui porte sa valeur
+    (pour ``styled_contents``, sous la forme ``styled_contents.<style>``).
+    """
+    duplicates: Dict[str, str] = {}
+    seen: Dict[str, str] = {}
+    for name in DEDUPLICATED_FIELDS:
+        value = output.get(name)
+        if not value:
+            continue
+        if value in seen:
+            output[name] = None
+            duplicates[name] = seen[value]
+        else:
+            seen[value] = name
+    if output.get("styled_contents"):
+        styled = dict(output["styled_contents"])
+        for style, value in styled.items():
+            if value and value in seen:
+                styled[style] = None
+                duplicates[f"styled_contents.{style}"] = seen[value]
+        output["styled_contents"] = styled
+    if duplicates:
+        output["duplicates"] = duplicates
+    return output
+
+@app.get("/", response_model=Dict[str, str])
+async def root():
+    """Point d'entrée de l'API"""
+    return {
+        "message": "Assistant de Recherche Multi-Agent",
+        "version": "1.0.0",
+        "status": "operational",
+        "documentation": "/docs"
+    }
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Vérification de l'état de santé du système"""
+    try:
+        Config.validate()
+        agents_available = True
+    except Exception:
+        agents_available = False
+    
+    # Un fournisseur dont le disjoncteur n'est pas fermé dégrade le service
+    breakers = breakers_snapshot()
+    upstreams_ok = all(b['state'] == "closed" for b in breakers.values())
+    
+    return HealthResponse(
+        status="healthy" if agents_available and upstreams_ok else "degraded",
+        timestamp=datetime.now(),
+        agents_available=agents_available,
+        circuit_breakers=breakers
+    )
+
+@app.get("/metrics", response_model=Dict[str, Any])
+async def get_metrics():
+    """Métriques du worker courant (cache, requêtes fusionnées, latences)"""
+    return metrics.snapshot()
+
+@app.get("/usage", response_model=Dict[str, Any])
+async def get_usage(days: int = Query(7, ge=1, le=366)):
+    """Tokens Gemini consommés par jour, style et modèle (tous workers), et état des budgets"""
+    loop = asyncio.get_running_loop()
+    summary = await loop.run_in_executor(None, orchestrator.usage.summary, days)
+    budget = await loop.run_in_executor(None, budget_status, orchestrator.usage)
+    return {**summary, 'budget': budget}
+
+@app.get("/admission", response_model=Dict[str, Any])
+async def get_admission():
+    """Places d'exécution du worker: actives et en attente par classe et par tenant, attente p50/p95"""
+    return orchestrator.admission.snapshot()
+
+@app.post("/research", response_model=ResearchOutput)
+async def research(
+    request: ResearchRequest,
+    fields: Optional[str] = Query(None, description="Champs retournés, séparés par des virgules (ex: final_content,search_results.url)"),
+    dedupe: bool = Query(False, description="Remplace par null les textes identiques à un champ précédent"),
+    x_tenant_id: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Endpoint principal pour effectuer une recherche avec le système multi-agent
+    
+    Args:
+        request: Requête de recherche contenant la query et les paramètres
+        fields: Projection de la réponse (tous les champs par défaut)
+        dedupe: Déduplication des champs textuels identiques (voir ``duplicates``)
+        X-Tenant-ID / X-API-Key: tenant pour le partage équitable des places d'exécution
+    
+    Returns:
+        ResearchOutput: Résultat complet de la recherche, ou les seuls champs demandés
+    """
+    start_time = time.time()
+    
+    try:
+        try:
+            projection = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Validation des paramètres
+        if not request.query.strip():
+            raise HTTPException(
+                status_code=400, 
+                detail="La requête de recherche ne peut pas être vide"
+            )
+        if request.profile not in PIPELINE_PROFILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Profil inconnu, profils disponibles: {', '.join(PIPELINE_PROFILES)}"
+            )
+        if request.search_depth and request.search_depth not in ("basic", "advanced", "adaptive"):
+            raise HTTPException(
+                status_code=400,
+                detail="search_depth doit valoir basic, advanced ou adaptive"
+            )
+        if request.priority and request.priority not in PRIORITY_CLASSES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"priority doit valoir {' ou '.join(PRIORITY_CLASSES)}"
+            )
+        
+        # Mode multi-styles: le style principal est placé en tête de liste
+        styles = None
+        if request.styles:
+            styles = [request.style] + [s for s in request.styles if s != request.style]
+        
+        # Traitement par le système multi-agent
+        result_state = await orchestrator.process_research_request(
+            query=request.query,
+            style=request.style,
+            max_results=request.max_results,
+            search_depth=request.search_depth,
+            styles=styles,
+            profile=request.profile,
+            priority=request.priority,
+            tenant=resolve_tenant(x_tenant_id, x_api_key),
+            token_budget=request.token_budget
+        )
+        
+        # Vérification des erreurs
+        if result_state.get("error_message"):
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erreur du système multi-agent: {result_state['error_message']}"
+            )
+        
+        # Construction de la réponse
+        # Les contenus des sources ne sont lus que s'ils font partie de la réponse
+        wanted = projection is None or "search_results" in projection
+        subfields = projection.get("search_results") if projection else None
+        sources = result_state.get("search_results") or []
+        if wanted and (subfields is None or "content" in subfields):
+            # Lecture SQLite et décompression des contenus: hors de la boucle d'événements
+            loop = asyncio.get_running_loop()
+            sources = await loop.run_in_executor(None, resolve_sources, sources)
+        
+        search_results = []
+        if wanted:
+            for result in sources:
+                search_results.append(SearchResult.construct(
+                    source_id=result.get('source_id'),
+                    title=result.get('title', ''),
+                    url=result.get('url', ''),
+                    content=result.get('content', ''),
+                    score=result.get('score')
+                ))
+        
+        processing_time = time.time() - start_time
+        
+        # Valeurs issues de l'orchestrateur: modèle construit sans nouvelle validation,
+        # réponse encodée directement (voir serialization.FastJSONResponse)
+        output = ResearchOutput.construct(
+            query=result_state["query"],
+            final_content=result_state.get("final_result") or "Contenu non disponible",
+            search_results=search_results,
+            summary=result_state.get("summary") or "Résumé non disponible",
+            edited_content=result_state.get("edited_content") or "Contenu édité non disponible",
+            validation_status=result_state.get("validation_approved") or False,
+            feedback=result_state.get("feedback"),
+            timestamp=result_state["timestamp"],
+            processing_time=round(processing_time, 2),
+            run_id=result_state.get("run_id"),
+            cached=bool(result_state.get("cache_hit")),
+            stale=bool(result_state.get("stale")),
+            degraded=bool(result_state.get("degraded")),
+            search_depth=result_state.get("search_depth_used"),
+            token_usage=result_state.get("token_usage"),
+            styled_contents=result_state.get("styled_contents"),
+            failed_styles=result_state.get("failed_styles")
+        )
+        
+        response = project_output(output.dict(), projection)
+        if dedupe:
+            response = dedupe_output(response)
+        return FastJSONResponse(response)
+        
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+    except BudgetExceeded as e:
+        raise budget_exceeded(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur interne du serveur: {str(e)}"
+        )
+
+@app.post("/research/{run_id}/revisions", response_model=RevisionOutput)
+async def revise_research(run_id: str, request: RevisionRequest,
+                          x_tenant_id: Optional[str] = Header(None),
+                          x_api_key: Optional[str] = Header(None)):
+    """
+    Révise une recherche enregistrée avec de nouvelles instructions humaines
+    
+    La recherche et le résumé de l'exécution sont réutilisés: seul le dernier
+    texte édité est retravaillé selon les instructions (un appel au modèle).
+    """
+    start_time = time.time()
+    try:
+        result_state = await orchestrator.resume_run(
+            run_id, request.human_instructions, tenant=resolve_tenant(x_tenant_id, x_api_key)
+        )
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+    except BudgetExceeded as e:
+        raise budget_exceeded(e)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Exécution inconnue ou expirée: {run_id}")
+    except RevisionConflict as e:
+        raise HTTPException(status_code=409, detail=f"{str(e)}: relancez la révision")
+    
+    if result_state.get("error_message"):
+        raise HTTPException(status_code=503, detail=result_state["error_message"])
+    
+    return RevisionOutput(
+        run_id=run_id,
+        revision=result_state["revision"],
+        instructions=request.human_instructions,
+        edited_content=result_state["edited_content"],
+        processing_time=round(time.time() - start_time, 2),
+        token_usage=result_state.get("token_usage")
+    )
+
+@app.get("/research/{run_id}/revisions", response_model=Dict[str, Any])
+def get_research_revisions(run_id: str):
+    """Historique des révisions d'une recherche enregistrée"""
+    run_state = orchestrator.runs.get(run_id)
+    if run_state is None:
+        raise HTTPException(status_code=404, detail=f"Exécution inconnue ou expirée: {run_id}")
+    return {
+        "run_id": run_id,
+        "query": run_state.get("query"),
+        "style": run_state.get("style"),
+        "original_content": run_state.get("edited_content"),
+        "revisions": orchestrator.runs.revisions(run_id)
+    }
+
+@app.get("/memory", response_model=Dict[str, Any])
+async def get_memory(include_content: bool = True):
+    """
+    Récupère l'historique des recherches stockées en mémoire
+    
+    Args:
+        include_content: Inclut le contenu complet, sinon seulement les métadonnées et aperçus
+    
+    Returns:
+        Dict contenant l'historique des recherches
+    """
+    try:
+        memory_data = orchestrator.get_memory_history(include_content=include_content)
+        return FastJSONResponse(memory_data)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la récupération de la mémoire: {str(e)}"
+        )
+
+@app.get("/memory/search", response_model=Dict[str, Any])
+def search_memory(
+    q: str,
+    style: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Recherche plein texte dans l'historique (requête, contenu final, feedback)
+    
+    Args:
+        q: Termes recherchés (le dernier terme est traité comme un préfixe)
+        style: Filtre sur le style
+        since: Date ISO minimale (incluse)
+        until: Date ISO maximale (incluse)
+        limit: Taille de page
+        offset: Décalage de pagination
+    
+    Returns:
+        Dict contenant le nombre total de résultats et la page classée par pertinence
+    """
+    try:
+        results = orchestrator.search_memory(q, style=style, since=since, until=until,
+                                             limit=limit, offset=offset)
+        return {"query": q, "limit": limit, "offset": offset, **results}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la recherche dans la mémoire: {str(e)}"
+        )
+
+@app.get("/memory/content/{content_id}", response_model=Dict[str, str])
+def get_memory_content(content_id: str):
+    """Récupère le contenu complet d'une entrée de l'historique"""
+    content = get_memory_store().get_content(content_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Contenu introuvable")
+    return {"content_id": content_id, "content": content}
+
+@app.get("/sources/{source_id}", response_model=Dict[str, Any])
+def get_source(source_id: str, include_content: bool = False):
+    """Métadonnées d'une source du registre (URL canonique, récupérations), avec son contenu si demandé"""
+    registry = get_source_registry()
+    source = registry.get(source_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Source introuvable")
+    if include_content:
+        source['content'] = registry.content(source['content_id'])
+    return source
+
+@app.get("/memory/stats", response_model=Dict[str, Any])
+async def get_memory_stats():
+    """
+    Récupère les statistiques de l'historique des recherches
+    
+    Returns:
+        Dict contenant les statistiques
+    """
+    try:
+        memory_data = orchestrator.get_memory_history(include_content=False)
+        
+        if 'error' in memory_data:
+            return memory_data
+        
+        history = memory_data.get('research_history', [])
+        
+        # Calcul des statistiques
+        total_searches = len(history)
+        approved_searches = sum(1 for item in history if item.get('validation_approved', False))
+        
+        styles_used = {}
+        for item in history:
+            style = item.get('style', 'unknown')
+            styles_used[style] = styles_used.get(style, 0) + 1
+        
+        stats = {
+            'total_searches': total_searches,
+            'approved_searches': approved_searches,
+            'approval_rate': round(approved_searches / total_searches * 100, 2) if total_searches > 0 else 0,
+            'styles_used': styles_used,
+            'last_search': history[-1]['timestamp'] if history else None,
+            'storage': get_memory_store().stats()
+        }
+        update_memory_gauges(stats['storage'])
+        
+        return stats
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du calcul des statistiques: {str(e)}"
+        )
+
+@app.delete("/memory", response_model=Dict[str, str])
+async def clear_memory():
+    """
+    Efface l'historique des recherches
+    
+    Returns:
+        Message de confirmation
+    """
+    try:
+        if get_memory_store().clear():
+            return {"message": "Mémoire effacée avec succès"}
+        else:
+            return {"message": "Aucune mémoire à effacer"}
+            
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'effacement de la mémoire: {str(e)}"
+        )
+
+@app.post("/memory/compact", response_model=Dict[str, Any])
+async def compact_memory():
+    """
+    Applique immédiatement la politique de rétention (archivage des entrées expirées)
+    
+    Returns:
+        Rapport de compaction (entrées archivées, contenus supprimés, durée, taille)
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, get_compactor(get_memory_store()).run)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la compaction de la mémoire: {str(e)}"
+        )
+
+@app.get("/memory/archives", response_model=List[Dict[str, Any]])
+def list_memory_archives():
+    """Liste les segments d'archive de la mémoire"""
+    return get_compactor(get_memory_store()).archive.list_segments()
+
+@app.get("/memory/archives/{name}", response_model=Dict[str, Any])
+def read_memory_archive(name: str, offset: int = 0, limit: int = 50):
+    """Lit une page d'un segment d'archive, décompressé à la demande"""
+    archive = get_compactor(get_memory_store()).archive
+    try:
+        entries = archive.read_segment(name, offset=offset, limit=limit)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="Segment d'archive introuvable")
+    return {"name": name, "offset": offset, "limit": limit, "entries": entries}
+
+@app.post("/memory/archives/{name}/restore", response_model=Dict[str, Any])
+async def restore_memory_archive(name: str):
+    """Recharge un segment d'archive dans la mémoire active"""
+    store = get_memory_store()
+    try:
+        loop = asyncio.get_running_loop()
+        restored = await loop.run_in_executor(
+            None, get_compactor(store).archive.restore_segment, name, store
+        )
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="Segment d'archive introuvable")
+    return {"name": name, "restored_entries": restored}
+
+@app.on_event("startup")
+async def startup():
+    """Démarre la compaction périodique de la mémoire et le rafraîchissement du cache"""
+    global compaction_scheduler, refresh_scheduler
+    # Index plein texte vérifié une fois au démarrage, pas pendant les recherches
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(None, get_memory_store().repair_index):
+        metrics.increment("memory_index_repairs")
+        print("🔎 Index plein texte de la mémoire reconstruit")
+    compaction_scheduler = CompactionScheduler(
+        get_compactor(get_memory_store()), Config.MEMORY_COMPACTION_INTERVAL
+    )
+    compaction_scheduler.start()
+    refresh_scheduler = RefreshScheduler(
+        orchestrator, orchestrator.popularity, orchestrator.cache, get_memory_store(),
+        lock_path=f"{Config.CACHE_DB_FILE}.refresh.lock"
+    )
+    refresh_scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Arrêt propre: termine les recherches en cours avant de fermer les stores"""
+    if compaction_scheduler is not None:
+        compaction_scheduler.stop()
+    if refresh_scheduler is not None:
+        await refresh_scheduler.stop()
+    await orchestrator.drain(timeout=Config.SHUTDOWN_TIMEOUT)
+    get_memory_store().close()
+    orchestrator.popularity.close()
+    orchestrator.runs.close()
+    get_source_registry().close()
+    orchestrator.usage.close()
+    orchestrator.cache.close()
+
+# Point d'entrée (développement avec --reload, production avec --workers N)
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Assistant de Recherche Multi-Agent")
+    parser.add_argument("--host", default=Config.API_HOST)
+    parser.add_argument("--port", type=int, default=Config.API_PORT)
+    parser.add_argument("--workers", type=int, default=Config.API_WORKERS,
+                        help="Nombre de processus workers (désactive le rechargement si > 1)")
+    args = parser.parse_args()
+    
+    # Le rechargement automatique n'est compatible qu'avec un seul worker
+    reload = Config.API_RELOAD and args.workers == 1
+    
+    print("🚀 Démarrage de l'Assistant de Recherche Multi-Agent")
+    print("📋 Configuration:")
+    print(f"   - Modèle Gemini: {Config.GEMINI_MODEL}")
+    print(f"   - Mémoire: {Config.MEMORY_BACKEND} ({Config.MEMORY_DB_FILE if Config.MEMORY_BACKEND == 'sqlite' else Config.MEMORY_FILE})")
+    print(f"   - Cache partagé: {Config.CACHE_DB_FILE}")
+    print(f"   - Max résultats Tavily: {Config.TAVILY_MAX_RESULTS}")
+    print(f"   - Workers: {args.workers}{' (rechargement auto)' if reload else ''}")
+    print("=" * 50)
+    
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=reload,
+        timeout_graceful_shutdown=Config.SHUTDOWN_TIMEOUT,
+        log_level="info"
     )
\ No newline at end of file
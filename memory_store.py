@@ -0,0 +1,488 @@
+# memory_store.py
+"""
+Stockage de la mémoire des recherches, sûr entre plusieurs processus.
+
+Deux backends sont disponibles (``Config.MEMORY_BACKEND``):
+- ``json``: le fichier historique ``research_memory.json``, protégé par un
+  verrou fichier et réécrit de manière atomique
+- ``sqlite``: une base SQLite en mode WAL, adaptée à plusieurs workers
+
+Dans les deux cas les contenus sont stockés à part (voir ``content_store``).
+"""
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, List, Optional, Set
+
+from config import Config
+from content_store import ContentStore, FileContentStore, SqliteContentStore
+from search_index import SearchIndex
+from serialization import dumps, loads
+
+try:
+    import fcntl
+except ImportError:  # Windows: on se contente du verrou intra-processus
+    fcntl = None
+
+
+class FileLock:
+    """Verrou exclusif inter-processus basé sur un fichier ``.lock``"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+
+    @contextmanager
+    def acquire(self, blocking: bool = True):
+        """Prend le verrou; en mode non bloquant, produit False s'il est déjà pris"""
+        if not self._thread_lock.acquire(blocking):
+            yield False
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a') as lock_file:
+                if fcntl:
+                    try:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                    except BlockingIOError:
+                        yield False
+                        return
+                try:
+                    yield True
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+
+class MemoryStore(ABC):
+    """
+    Interface commune des backends de mémoire
+
+    Les entrées sont des métadonnées légères (requête, style, aperçu...):
+    le contenu final est stocké à part dans un ``ContentStore`` compressé
+    et dédupliqué, référencé par ``content_id``.
+    """
+
+    contents: ContentStore
+    index: SearchIndex
+
+    # Nombre d'écritures faites par ce processus: invalide les lectures mises en cache
+    revision = 0
+
+    @abstractmethod
+    def append(self, record: Dict[str, Any]) -> None:
+        """Ajoute une entrée, son contenu étant stocké à part"""
+
+    @abstractmethod
+    def list_history(self) -> List[Dict[str, Any]]:
+        """Métadonnées des entrées, sans charger les contenus"""
+
+    def count(self) -> int:
+        """Nombre d'entrées, sans charger les contenus"""
+        return len(self.list_history())
+
+    def get_content(self, cid: str) -> Optional[str]:
+        return self.contents.get(cid)
+
+    def load(self, include_content: bool = True) -> Dict[str, Any]:
+        """Historique complet, contenus inclus si ``include_content``"""
+        history = self.list_history()
+        if include_content:
+            self.load_contents(history)
+        else:
+            for item in history:
+                item.pop('_inline_content', None)
+        return {'research_history': history}
+
+    def load_contents(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Ajoute ``final_content`` à des entrées de ``list_history``
+
+        Les entrées antérieures au stockage séparé gardent leur contenu en
+        ligne. Un contenu introuvable reste à None.
+        """
+        for item in entries:
+            inline = item.pop('_inline_content', None)
+            if inline is not None:
+                item['final_content'] = inline
+            elif item.get('content_id'):
+                item['final_content'] = self.get_content(item['content_id'])
+
+    @abstractmethod
+    def clear(self) -> bool:
+        """Efface la mémoire, retourne False s'il n'y avait rien à effacer"""
+
+    @abstractmethod
+    def remove_entries(self, ids: Set[Any]) -> int:
+        """Supprime des entrées (sans toucher aux contenus), retourne le nombre supprimé"""
+
+    def rebuild_indexes(self) -> None:
+        self.index.optimize()
+
+    def search(self, text: str, style: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Recherche plein texte dans la requête, le contenu final et le feedback"""
+        return self.index.search(text, style=style, since=since, until=until,
+                                 limit=limit, offset=offset)
+
+    @abstractmethod
+    def repair_index(self) -> bool:
+        """
+        Reconstruit l'index plein texte, en une transaction, s'il ne couvre pas
+        exactement les entrées (entrées antérieures à l'index, écriture
+        interrompue); retourne True s'il a été reconstruit
+
+        Appelé au démarrage et par la compaction, jamais pendant une requête:
+        les contenus ne sont relus que si les comptes diffèrent.
+        """
+
+    def referenced_content_ids(self) -> Set[str]:
+        return {item['content_id'] for item in self.list_history() if item.get('content_id')}
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Taille de la mémoire: nombre d'entrées, octets de métadonnées et de contenus"""
+
+    def close(self) -> None:
+        self.index.close()
+
+    def _split_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Sépare le contenu (stocké une fois) des métadonnées de l'entrée"""
+        metadata = {key: value for key, value in record.items() if key != 'final_content'}
+        text = record.get('final_content') or ''
+        metadata['content_id'] = self.contents.put(text)
+        metadata['preview'] = text[:Config.MEMORY_PREVIEW_CHARS]
+        metadata['content_length'] = len(text)
+        return metadata
+
+
+class JsonMemoryStore(MemoryStore):
+    """Mémoire dans un fichier JSON, verrouillée pendant chaque lecture-écriture"""
+
+    def __init__(self, path: str, content_dir: str, index_path: str):
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+        self.contents = FileContentStore(content_dir)
+        self.index = SearchIndex(index_path)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'rb') as f:
+                return loads(f.read())
+        except FileNotFoundError:
+            return {'research_history': []}
+
+    def _write(self, memory: Dict[str, Any]) -> None:
+        # Écriture dans un fichier temporaire puis remplacement atomique:
+        # un lecteur ne voit jamais un fichier à moitié écrit
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.memory-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dumps(memory))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def append(self, record: Dict[str, Any]) -> None:
+        # Le contenu est écrit hors verrou: son identifiant ne dépend que du texte
+        entry = {'id': uuid.uuid4().hex, **self._split_record(record)}
+        with self.lock.acquire():
+            memory = self._read()
+            memory.setdefault('research_history', []).append(entry)
+            # La ligne d'index n'est validée qu'une fois le fichier remplacé:
+            # un échec d'écriture n'indexe pas une entrée absente
+            with self.index.transaction() as conn:
+                self.index.write_entry(conn, entry['id'], record, entry['content_id'])
+                self._write(memory)
+        self.revision += 1
+
+    def list_history(self) -> List[Dict[str, Any]]:
+        with self.lock.acquire():
+            return self._list_history_locked()
+
+    def _list_history_locked(self) -> List[Dict[str, Any]]:
+        """``list_history`` pour un appelant qui détient déjà le verrou"""
+        memory = self._read()
+        history = memory.get('research_history', [])
+        # Migration unique: les entrées antérieures reçoivent un identifiant
+        if any('id' not in item for item in history):
+            for item in history:
+                item.setdefault('id', uuid.uuid4().hex)
+            self._write(memory)
+        for item in history:
+            # Entrées antérieures au stockage séparé: contenu encore en ligne
+            if 'final_content' in item and 'content_id' not in item:
+                text = item.pop('final_content') or ''
+                item['preview'] = text[:Config.MEMORY_PREVIEW_CHARS]
+                item['content_length'] = len(text)
+                item['_inline_content'] = text
+        return history
+
+    def clear(self) -> bool:
+        with self.lock.acquire():
+            self.contents.clear()
+            self.index.clear()
+            self.revision += 1
+            if os.path.exists(self.path):
+                os.remove(self.path)
+                return True
+            return False
+
+    def remove_entries(self, ids: Set[Any]) -> int:
+        # Relecture sous verrou: les entrées ajoutées depuis l'instantané sont conservées
+        with self.lock.acquire():
+            memory = self._read()
+            history = memory.get('research_history', [])
+            kept = [item for item in history if item.get('id') not in ids]
+            removed = len(history) - len(kept)
+            with self.index.transaction() as conn:
+                self.index.delete_entries(conn, ids)
+                if removed:
+                    memory['research_history'] = kept
+                    self._write(memory)
+        self.revision += 1
+        return removed
+
+    def repair_index(self) -> bool:
+        # Verrou du fichier puis transaction de l'index: même ordre que les écrivains
+        with self.lock.acquire():
+            history = self._list_history_locked()
+            with self.index.transaction() as conn:
+                if self.index.count(conn) == len(history):
+                    return False
+                self.load_contents(history)
+                self.index.replace_all(conn, history)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock.acquire():
+            entries = len(self._read().get('research_history', []))
+            metadata_bytes = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {
+            'entries': entries,
+            'metadata_bytes': metadata_bytes,
+            'content_bytes': self.contents.size_bytes()
+        }
+
+
+class SqliteMemoryStore(MemoryStore):
+    """Mémoire dans une base SQLite (WAL), partageable entre workers et conteneurs"""
+
+    COLUMNS = ('timestamp', 'query', 'style', 'content_id', 'preview', 'content_length',
+               'validation_approved', 'feedback', 'search_count', 'input_tokens', 'output_tokens')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS research_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT,
+                    query TEXT,
+                    style TEXT,
+                    final_content TEXT,
+                    validation_approved INTEGER,
+                    feedback TEXT,
+                    search_count INTEGER
+                )
+            """)
+            # Migration des bases créées avant le stockage séparé des contenus
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(research_history)")}
+            for column, column_type in (('content_id', 'TEXT'), ('preview', 'TEXT'),
+                                        ('content_length', 'INTEGER'), ('input_tokens', 'INTEGER'),
+                                        ('output_tokens', 'INTEGER')):
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE research_history ADD COLUMN {column} {column_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON research_history (timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_history_content ON research_history (content_id)")
+        self.contents = SqliteContentStore(self._connection)
+        self.index = SearchIndex(path)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Une connexion par thread: sqlite3 interdit le partage par défaut
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def append(self, record: Dict[str, Any]) -> None:
+        entry = self._split_record(record)
+        values = [entry.get(column) for column in self.COLUMNS]
+        # L'index partage la base: entrée et ligne d'index dans la même transaction
+        with self._connection() as conn:
+            entry_id = conn.execute(
+                f"INSERT INTO research_history ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self.COLUMNS)})",
+                values
+            ).lastrowid
+            self.index.write_entry(conn, entry_id, record, entry['content_id'])
+        self.revision += 1
+
+    def list_history(self) -> List[Dict[str, Any]]:
+        # L'aperçu des anciennes entrées est calculé par SQLite, sans rapatrier le contenu
+        rows = self._connection().execute(
+            "SELECT id, timestamp, query, style, content_id, "
+            "COALESCE(preview, substr(final_content, 1, ?)), "
+            "COALESCE(content_length, length(final_content)), "
+            "validation_approved, feedback, search_count, input_tokens, output_tokens "
+            "FROM research_history ORDER BY id",
+            (Config.MEMORY_PREVIEW_CHARS,)
+        ).fetchall()
+        history = []
+        for row in rows:
+            item = dict(zip(('id',) + self.COLUMNS, row))
+            if item['validation_approved'] is not None:
+                item['validation_approved'] = bool(item['validation_approved'])
+            history.append(item)
+        return history
+
+    def load_contents(self, entries: List[Dict[str, Any]]) -> None:
+        super().load_contents(entries)
+        # Entrées antérieures au stockage séparé: contenu encore dans la colonne final_content
+        legacy = {item['id']: item for item in entries if not item.get('content_id')}
+        if legacy:
+            inline = dict(self._connection().execute(
+                "SELECT id, final_content FROM research_history WHERE content_id IS NULL"
+            ).fetchall())
+            for entry_id, item in legacy.items():
+                item['final_content'] = inline.get(entry_id)
+
+    def clear(self) -> bool:
+        with self._connection() as conn:
+            deleted = conn.execute("DELETE FROM research_history").rowcount
+        self.contents.clear()
+        self.index.clear()
+        self.revision += 1
+        return deleted > 0
+
+    def remove_entries(self, ids: Set[Any]) -> int:
+        if not ids:
+            return 0
+        with self._connection() as conn:
+            removed = conn.executemany(
+                "DELETE FROM research_history WHERE id = ?", [(entry_id,) for entry_id in ids]
+            ).rowcount
+            self.index.delete_entries(conn, ids)
+        self.revision += 1
+        return removed
+
+    def repair_index(self) -> bool:
+        # Comptes et reconstruction dans une seule transaction d'écriture:
+        # aucun ajout ne peut s'intercaler entre la lecture et la réécriture
+        with self.index.transaction(self._connection()) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM research_history").fetchone()[0]
+            if self.index.count(conn) == entries:
+                return False
+            history = self.load(include_content=True)['research_history']
+            self.index.replace_all(conn, history)
+        return True
+
+    def rebuild_indexes(self) -> None:
+        # Transactions courtes: les écrivains ne sont bloqués que le temps de chaque commande
+        conn = self._connection()
+        conn.execute("REINDEX idx_history_timestamp")
+        conn.execute("REINDEX idx_history_content")
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        self.index.optimize()
+
+    def referenced_content_ids(self) -> Set[str]:
+        rows = self._connection().execute(
+            "SELECT DISTINCT content_id FROM research_history WHERE content_id IS NOT NULL"
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM research_history").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connection()
+        entries, metadata_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(query) + LENGTH(COALESCE(preview, final_content, ''))"
+            " + LENGTH(COALESCE(feedback, ''))), 0) FROM research_history"
+        ).fetchone()
+        return {
+            'entries': entries,
+            'metadata_bytes': metadata_bytes,
+            'content_bytes': self.contents.size_bytes()
+        }
+
+    def close(self) -> None:
+        self.index.close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class BackgroundWriter:
+    """
+    Écritures en mémoire hors du chemin critique
+
+    Les états soumis sont persistés par un thread dédié, dans l'ordre de
+    soumission; la réponse n'attend donc pas l'écriture disque.
+    """
+
+    def __init__(self, write: Callable[[Dict[str, Any]], Any], name: str = "memory-writer"):
+        self.write = write
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, state: Dict[str, Any]) -> None:
+        self._queue.put(state)
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def _run(self) -> None:
+        while True:
+            state = self._queue.get()
+            try:
+                self.write(state)
+            except Exception as e:
+                print(f"[Memory Writer] Erreur d'écriture: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float) -> bool:
+        """Attend que toutes les écritures soumises soient faites, False si le délai expire"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+_store: Optional[MemoryStore] = None
+_store_lock = threading.Lock()
+
+def get_memory_store() -> MemoryStore:
+    """Retourne le backend de mémoire configuré (un par processus)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if Config.MEMORY_BACKEND == "sqlite":
+                _store = SqliteMemoryStore(Config.MEMORY_DB_FILE)
+            else:
+                _store = JsonMemoryStore(Config.MEMORY_FILE, Config.MEMORY_CONTENT_DIR,
+                                         Config.MEMORY_INDEX_FILE)
+        return _store
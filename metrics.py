@@ -0,0 +1,93 @@
+# metrics.py
+"""
+Métriques internes du système (compteurs, jauges, distributions de durées).
+
+Les valeurs sont propres à chaque processus: en mode multi-workers, chaque
+worker expose ses propres métriques sur ``/metrics``.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Deque, Optional
+
+
+def percentile(values, q: float) -> float:
+    """Percentile simple (plus proche rang) d'une liste de valeurs"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class MetricsRegistry:
+    """Registre de métriques thread-safe"""
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+        self._sample_counts: Dict[str, int] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.max_samples)
+                self._sample_counts[name] = 0
+            self._samples[name].append(value)
+            self._sample_counts[name] += 1
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def percentile(self, name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Percentile des derniers échantillons, None s'il y en a moins de ``min_samples``"""
+        with self._lock:
+            values = list(self._samples.get(name, ()))
+        if len(values) < max(1, min_samples):
+            return None
+        return percentile(values, q)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Vue instantanée de toutes les métriques"""
+        with self._lock:
+            timings = {}
+            for name, samples in self._samples.items():
+                values = list(samples)
+                timings[name] = {
+                    'count': self._sample_counts[name],
+                    'mean': round(sum(values) / len(values), 4) if values else 0.0,
+                    'p50': round(percentile(values, 50), 4),
+                    'p95': round(percentile(values, 95), 4),
+                    'p99': round(percentile(values, 99), 4),
+                    'max': round(max(values), 4) if values else 0.0
+                }
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'timings': timings
+            }
+
+
+# Registre global du processus
+metrics = MetricsRegistry()
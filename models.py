@@ -1,55 +1,103 @@
-# models.py
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from enum import Enum
-
-class AgentType(str, Enum):
-    RESEARCH = "research"
-    SUMMARIZER = "summarizer"
-    EDITOR = "editor"
-    VALIDATOR = "validator"
-    FEEDBACK = "feedback"
-    MEMORY = "memory"
-    ORCHESTRATOR = "orchestrator"
-
-class ResearchRequest(BaseModel):
-    query: str = Field(..., description="Requête de recherche")
-    style: Optional[str] = Field("académique", description="Style de sortie souhaité")
-    max_results: Optional[int] = Field(5, description="Nombre maximum de résultats")
-
-class AgentState(BaseModel):
-    """État global partagé entre tous les agents"""
-    query: str
-    style: str = "académique"
-    
-    # Résultats de chaque agent
-    search_results: Optional[List[Dict[str, Any]]] = None
-    summary: Optional[str] = None
-    edited_content: Optional[str] = None
-    validation_approved: Optional[bool] = None
-    feedback: Optional[str] = None
-    saved_to_memory: Optional[bool] = None
-    
-    # Métadonnées
-    timestamp: datetime = Field(default_factory=datetime.now)
-    current_agent: Optional[str] = None
-    error_message: Optional[str] = None
-    final_result: Optional[str] = None
-
-class SearchResult(BaseModel):
-    title: str
-    url: str
-    content: str
-    score: Optional[float] = None
-
-class ResearchOutput(BaseModel):
-    query: str
-    final_content: str
-    search_results: List[SearchResult]
-    summary: str
-    edited_content: str
-    validation_status: bool
-    feedback: Optional[str]
-    timestamp: datetime
-    processing_time: Optional[float] = None
\ No newline at end of file
+# models.py
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Dict, Any, Optional
+from datetime import datetime
+from enum import Enum
+
+class AgentType(str, Enum):
+    RESEARCH = "research"
+    SOURCES = "sources"
+    SUMMARIZER = "summarizer"
+    EDITOR = "editor"
+    VALIDATOR = "validator"
+    FEEDBACK = "feedback"
+    MEMORY = "memory"
+    ORCHESTRATOR = "orchestrator"
+
+class ResearchRequest(BaseModel):
+    query: str = Field(..., description="Requête de recherche")
+    style: Optional[str] = Field("académique", description="Style de sortie souhaité")
+    max_results: Optional[int] = Field(5, ge=1, le=20, description="Nombre maximum de résultats")
+    search_depth: Optional[str] = Field(None, description="Profondeur de recherche: basic, advanced ou adaptive")
+    styles: Optional[List[str]] = Field(None, description="Styles supplémentaires édités en parallèle à partir d'une seule recherche")
+    profile: Optional[str] = Field("full", description="Profil de pipeline: full, no-memory, summary-only ou search-only")
+    priority: Optional[str] = Field("interactive", description="Classe d'admission: interactive ou batch")
+    token_budget: Optional[int] = Field(None, ge=1, description="Budget de tokens Gemini de l'exécution (défaut: REQUEST_TOKEN_BUDGET)")
+
+def merge_stages(left: Optional[List[str]], right: Optional[List[str]]) -> List[str]:
+    """Réducteur LangGraph: étapes terminées, cumulées entre branches parallèles"""
+    merged = list(left or [])
+    merged += [stage for stage in right or [] if stage not in merged]
+    return merged
+
+class AgentState(BaseModel):
+    """État global partagé entre tous les agents"""
+    query: str
+    style: str = "académique"
+    
+    # Paramètres de recherche propres à la requête (défaut: Config)
+    max_results: Optional[int] = None
+    search_depth: Optional[str] = None
+    
+    # Résultats de chaque agent (sources référencées par identifiant, voir sources.py)
+    search_results: Optional[List[Dict[str, Any]]] = None
+    summary: Optional[str] = None
+    edited_content: Optional[str] = None
+    validation_approved: Optional[bool] = None
+    feedback: Optional[str] = None
+    saved_to_memory: Optional[bool] = None
+    
+    # Métadonnées
+    timestamp: datetime = Field(default_factory=datetime.now)
+    run_id: Optional[str] = None  # identifiant de l'exécution enregistrée (révisions)
+    revision: Optional[int] = None
+    deadline: Optional[float] = None  # échéance de l'exécution (epoch, secondes)
+    current_agent: Optional[str] = None
+    # Canal à réducteur: écrit par les étapes parallèles d'une même super-étape
+    completed_stages: Annotated[Optional[List[str]], merge_stages] = None
+    search_depth_used: Optional[str] = None
+    degraded: Optional[bool] = None  # résultat produit sans LLM (résumé extractif local)
+    token_usage: Optional[Dict[str, Any]] = None  # tokens Gemini de l'exécution (voir usage.py)
+    token_budget: Optional[int] = None  # budget de tokens propre à la requête (défaut: Config)
+    error_message: Optional[str] = None
+    final_result: Optional[str] = None
+
+class SearchResult(BaseModel):
+    source_id: Optional[str] = None
+    title: str
+    url: str
+    content: str
+    score: Optional[float] = None
+
+class ResearchOutput(BaseModel):
+    query: str
+    final_content: str
+    search_results: List[SearchResult]
+    summary: str
+    edited_content: str
+    validation_status: bool
+    feedback: Optional[str]
+    timestamp: datetime
+    processing_time: Optional[float] = None
+    run_id: Optional[str] = None
+    cached: bool = False
+    stale: bool = False
+    degraded: bool = False
+    search_depth: Optional[str] = None
+    token_usage: Optional[Dict[str, Any]] = None
+    styled_contents: Optional[Dict[str, str]] = None
+    # Styles non livrés (erreur ou édition rejetée) -> raison
+    failed_styles: Optional[Dict[str, str]] = None
+    # Avec dedupe=true: champ vidé -> champ portant le même texte
+    duplicates: Optional[Dict[str, str]] = None
+
+class RevisionRequest(BaseModel):
+    human_instructions: str = Field(..., min_length=1, description="Nouvelles instructions appliquées au dernier texte édité")
+
+class RevisionOutput(BaseModel):
+    run_id: str
+    revision: int
+    instructions: str
+    edited_content: str
+    processing_time: Optional[float] = None
+    token_usage: Optional[Dict[str, Any]] = None
\ No newline at end of file
@@ -0,0 +1,90 @@
+# offline.py
+"""
+Backends de substitution hors ligne pour Tavily et Gemini.
+
+Activés par ``Config.OFFLINE_MODE`` (variable ``OFFLINE_MODE=true``): aucun
+appel réseau ni clé d'API, des réponses déterministes dérivées de la requête
+et une latence simulée (``Config.OFFLINE_LATENCY``). Ils servent aux
+évaluations en masse, aux tests de charge et au développement.
+"""
+import hashlib
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+# Vocabulaire des contenus générés
+_TOPICS = [
+    "les données", "les modèles", "la recherche", "les usages", "la régulation",
+    "les coûts", "les performances", "la sécurité", "les perspectives", "l'industrie",
+]
+_VERBS = ["transforme", "influence", "accélère", "complique", "structure", "améliore"]
+
+
+def _rng(*parts: Any) -> random.Random:
+    """Générateur pseudo-aléatoire stable pour une même entrée"""
+    seed = hashlib.sha256("\x1f".join(str(p) for p in parts).encode('utf-8')).hexdigest()
+    return random.Random(int(seed[:16], 16))
+
+
+def _simulate_latency(rng: random.Random) -> None:
+    if Config.OFFLINE_LATENCY > 0:
+        # Distribution à queue longue: la plupart des appels sont proches de la médiane
+        time.sleep(Config.OFFLINE_LATENCY * rng.lognormvariate(0, 0.5))
+
+
+class OfflineSearchClient:
+    """Remplace ``TavilyClient``: mêmes paramètres, résultats synthétiques"""
+
+    def search(self, query: str, max_results: int = 5, search_depth: str = "basic",
+               **kwargs) -> Dict[str, Any]:
+        rng = _rng("search", query, max_results, search_depth)
+        _simulate_latency(rng)
+        results: List[Dict[str, Any]] = []
+        for i in range(max_results):
+            topic, other = rng.sample(_TOPICS, 2)
+            sentences = [
+                f"{query} {rng.choice(_VERBS)} {topic}.",
+                f"Selon cette source, {other} dépend fortement de {query.lower()}.",
+                f"L'analyse {search_depth} met en avant {topic} et {other}.",
+            ]
+            results.append({
+                'title': f"{query} : {topic} ({i + 1})",
+                'url': f"https://offline.example/{hashlib.md5(f'{query}{i}'.encode()).hexdigest()[:10]}",
+                'content': " ".join(sentences),
+                'score': round(max(0.0, 0.95 - i * 0.08 - rng.random() * 0.1), 3)
+            })
+        return {'results': results, 'answer': None}
+
+
+class OfflineResponse:
+    """Réponse au format ``GenerateContentResponse`` (attributs utilisés par les agents)"""
+
+    def __init__(self, text: str, prompt_tokens: int, output_tokens: int):
+        self.text = text
+        self.usage_metadata = type("UsageMetadata", (), {
+            'prompt_token_count': prompt_tokens,
+            'candidates_token_count': output_tokens,
+            'total_token_count': prompt_tokens + output_tokens,
+        })()
+
+
+class OfflineModel:
+    """Remplace ``genai.GenerativeModel``: texte synthétique tiré du prompt"""
+
+    def __init__(self, model_name: str = "offline"):
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                         **kwargs) -> OfflineResponse:
+        rng = _rng("generate", self.model_name, prompt)
+        _simulate_latency(rng)
+        lines = [line.strip() for line in prompt.splitlines() if len(line.strip()) > 40]
+        picked = rng.sample(lines, min(len(lines), 4)) if lines else []
+        text = "\n\n".join(["## Synthèse (hors ligne)"] + [f"- {line}" for line in picked])
+        max_output_tokens = (generation_config or {}).get('max_output_tokens')
+        if max_output_tokens:
+            text = text[:max_output_tokens * 4]
+        # Estimation usuelle: environ 4 caractères par token
+        return OfflineResponse(text, len(prompt) // 4, len(text) // 4)
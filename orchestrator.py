@@ -1,175 +1,730 @@
-# orchestrator.py
-from typing import Dict, Any
-from langgraph.graph import StateGraph, END
-from agents import (
-    ResearchAgent, SummarizerAgent, EditorAgent, 
-    HumanValidatorAgent, FeedbackAgent, MemoryAgent
-)
-from models import AgentState
-from datetime import datetime
-
-class MultiAgentOrchestrator:
-    """Orchestrateur principal utilisant LangGraph"""
-    
-    def __init__(self):
-        self.research_agent = ResearchAgent()
-        self.summarizer_agent = SummarizerAgent()
-        self.editor_agent = EditorAgent()
-        self.validator_agent = HumanValidatorAgent()
-        self.feedback_agent = FeedbackAgent()
-        self.memory_agent = MemoryAgent()
-        
-        # Construction du graphe LangGraph
-        self.workflow = self._build_workflow()
-    
-    def _build_workflow(self) -> StateGraph:
-        """Construit le workflow avec LangGraph"""
-        
-        # Création du graphe d'état
-        workflow = StateGraph(AgentState)
-        
-        # Ajout des nœuds (agents)
-        workflow.add_node("research", self._research_node)
-        workflow.add_node("summarize", self._summarize_node)
-        workflow.add_node("edit", self._edit_node)
-        workflow.add_node("validate", self._validate_node)
-        workflow.add_node("feedback_node", self._feedback_node)
-        workflow.add_node("memory", self._memory_node)
-        workflow.add_node("finalize", self._finalize_node)
-        
-        # Définition du flux
-        workflow.set_entry_point("research")
-        
-        # Flux principal
-        workflow.add_edge("research", "summarize")
-        workflow.add_edge("summarize", "edit")
-        workflow.add_edge("edit", "validate")
-        
-        # Branchement conditionnel après validation
-        workflow.add_conditional_edges(
-            "validate",
-            self._should_continue_after_validation,
-            {
-                "approved": "feedback_node",
-                "rejected": "edit",  # Retour à l'édition
-                "error": END
-            }
-        )
-        
-        workflow.add_edge("feedback_node", "memory")
-        workflow.add_edge("memory", "finalize")
-        workflow.add_edge("finalize", END)
-        
-        return workflow.compile()
-    
-    def _research_node(self, state) -> dict:
-        if not isinstance(state, dict):
-            state = state.__dict__
-        from models import AgentState
-        agent_state = AgentState(**state)
-        return self.research_agent.execute(agent_state).__dict__
-    
-    def _summarize_node(self, state) -> dict:
-        if not isinstance(state, dict):
-            state = state.__dict__
-        from models import AgentState
-        agent_state = AgentState(**state)
-        return self.summarizer_agent.execute(agent_state).__dict__
-    
-    def _edit_node(self, state) -> dict:
-        if not isinstance(state, dict):
-            state = state.__dict__
-        human_instructions = state.get("human_instructions")
-        from models import AgentState
-        agent_state = AgentState(**state)
-        return self.editor_agent.execute(agent_state, human_instructions).__dict__
-    
-    def _validate_node(self, state) -> dict:
-        if not isinstance(state, dict):
-            state = state.__dict__
-        from models import AgentState
-        agent_state = AgentState(**state)
-        return self.validator_agent.execute(agent_state).__dict__
-    
-    def _feedback_node(self, state) -> dict:
-        if not isinstance(state, dict):
-            state = state.__dict__
-        from models import AgentState
-        agent_state = AgentState(**state)
-        return self.feedback_agent.execute(agent_state).__dict__
-    
-    def _memory_node(self, state) -> dict:
-        if not isinstance(state, dict):
-            state = state.__dict__
-        from models import AgentState
-        agent_state = AgentState(**state)
-        return self.memory_agent.execute(agent_state).__dict__
-    
-    def _finalize_node(self, state) -> dict:
-        if not isinstance(state, dict):
-            state = state.__dict__
-        from models import AgentState
-        agent_state = AgentState(**state)
-        if agent_state.edited_content and agent_state.validation_approved:
-            agent_state.final_result = agent_state.edited_content
-        else:
-            agent_state.final_result = "Traitement incomplet ou rejeté"
-        return agent_state.__dict__
-    
-    def _should_continue_after_validation(self, state) -> str:
-        """Fonction de décision après validation"""
-        if state.get("error_message"):
-            return "error"
-        elif state.get("validation_approved"):
-            return "approved"
-        else:
-            return "rejected"
-    
-    async def process_research_request(self, query: str, style: str = "académique") -> dict:
-        """Traite une demande de recherche complète"""
-        
-        # État initial sous forme de dictionnaire avec timestamp
-        initial_state = {
-            "query": query,
-            "style": style,
-            "timestamp": datetime.now()
-        }
-        
-        print(f"🚀 Démarrage du processus de recherche pour: '{query}'")
-        print(f"📝 Style demandé: {style}")
-        print("-" * 50)
-        
-        # Exécution du workflow
-        try:
-            final_state = await self.workflow.ainvoke(initial_state)
-            
-            print("-" * 50)
-            if final_state.get("final_result"):
-                print("✅ Processus terminé avec succès!")
-            elif final_state.get("error_message"):
-                print(f"❌ Erreur dans l'orchestration: {final_state.get('error_message')}")
-            else:
-                print("❌ Processus terminé avec des erreurs")
-            
-            return final_state
-            
-        except Exception as e:
-            print(f"❌ Erreur dans l'orchestration: {str(e)}")
-            initial_state["error_message"] = f"Erreur d'orchestration: {str(e)}"
-            return initial_state
-    
-    def get_memory_history(self) -> Dict[str, Any]:
-        """Récupère l'historique des recherches"""
-        try:
-            import json
-            from config import Config
-            
-            with open(Config.MEMORY_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {'research_history': []}
-        except Exception as e:
-            return {'error': f"Erreur de lecture mémoire: {str(e)}"}
-
-# Instance globale de l'orchestrateur
+# orchestrator.py
+import asyncio
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+from langgraph.graph import StateGraph, END
+from agents import (
+    ResearchAgent, SourceAgent, SummarizerAgent, EditorAgent, 
+    HumanValidatorAgent, FeedbackAgent, MemoryAgent
+)
+from models import AgentState
+from datetime import datetime
+from admission import BATCH, AdmissionRejected, AdmissionTicket, get_admission_controller
+from cache import get_shared_cache
+from config import Config
+from memory_store import BackgroundWriter, get_memory_store
+from metrics import metrics
+from refresh import get_popularity_tracker, result_key, result_params
+from runs import RevisionConflict, get_run_store
+from usage import BudgetExceeded, check_daily_budget, get_usage_ledger
+
+# Étapes du graphe: étapes dont la sortie est lue ("after") et champs de l'état écrits ("writes").
+# Deux étapes sans dépendance entre elles s'exécutent dans la même super-étape LangGraph:
+# elles ne doivent pas écrire les mêmes champs (hors canaux à réducteur, voir AgentState).
+# "edit" attend aussi "sources": LangGraph 0.0.26 ne joint que des branches de même longueur,
+# et l'enregistrement des sources se termine bien avant le résumé. Le feedback porte sur le
+# brouillon édité, en parallèle de la validation; "review" joint les deux et décide de la
+# suite (finalisation, nouvelle édition ou arrêt sur erreur).
+STAGES: Dict[str, Dict[str, List[str]]] = {
+    "research": {"after": [], "writes": ["search_results", "search_depth_used", "current_agent", "error_message"]},
+    "sources": {"after": ["research"], "writes": ["search_results"]},
+    "summarize": {"after": ["research"],
+                  "writes": ["summary", "degraded", "token_usage", "current_agent", "error_message"]},
+    "edit": {"after": ["summarize", "sources"],
+             "writes": ["edited_content", "degraded", "token_usage", "current_agent", "error_message"]},
+    "validate": {"after": ["edit"], "writes": ["validation_approved", "current_agent", "error_message"]},
+    "feedback_node": {"after": ["edit"], "writes": ["feedback"]},
+    "review": {"after": ["validate", "feedback_node"], "writes": []},
+}
+
+# Étape de décision après validation (branchement conditionnel)
+DECISION_STAGE = "review"
+
+# Étape finale de chaque profil, après toutes ses étapes terminales
+FINAL_STAGE = "finalize"
+
+# Profils de pipeline: étapes exécutées (avant "finalize", dans l'ordre des dépendances)
+# et persistance en mémoire
+PIPELINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "full": {"stages": ["research", "sources", "summarize", "edit", "validate", "feedback_node", "review"], "persist": True},
+    "no-memory": {"stages": ["research", "sources", "summarize", "edit", "validate", "feedback_node", "review"], "persist": False},
+    "summary-only": {"stages": ["research", "sources", "summarize"], "persist": False},
+    "search-only": {"stages": ["research", "sources"], "persist": False},
+}
+
+# Profils internes du mode multi-styles: recherche et résumé communs, puis édition par style
+STYLE_BASE_PROFILE = "style-base"
+STYLE_EDIT_PROFILE = "style-edit"
+_INTERNAL_PROFILES: Dict[str, Dict[str, Any]] = {
+    STYLE_BASE_PROFILE: {"stages": ["research", "sources", "summarize"], "persist": False},
+    STYLE_EDIT_PROFILE: {"stages": ["edit", "validate", "feedback_node", "review"], "persist": True},
+}
+
+
+def stage_dependencies(stages: List[str], parallel: bool = True) -> Dict[str, List[str]]:
+    """
+    Dépendances des étapes d'un profil, "finalize" compris
+
+    ``parallel=False`` enchaîne les étapes dans l'ordre du profil (graphe
+    linéaire). Sinon chaque étape ne suit que ses dépendances déclarées dans
+    ``STAGES`` présentes dans le profil; "finalize" suit les étapes terminales.
+    Lève ``ValueError`` si le graphe obtenu n'est pas exécutable par LangGraph.
+    """
+    if not parallel:
+        chain = stages + [FINAL_STAGE]
+        return {stage: ([chain[i - 1]] if i else []) for i, stage in enumerate(chain)}
+    
+    dependencies = {stage: [d for d in STAGES[stage]["after"] if d in stages] for stage in stages}
+    needed = {d for after in dependencies.values() for d in after}
+    dependencies[FINAL_STAGE] = [stage for stage in stages if stage not in needed]
+    
+    roots = [stage for stage, after in dependencies.items() if not after]
+    if len(roots) != 1:
+        raise ValueError(f"Le graphe doit avoir une seule étape initiale (trouvé: {roots})")
+    
+    # Super-étape de chaque étape: plus long chemin depuis l'étape initiale
+    depth: Dict[str, int] = {}
+    for stage in stages + [FINAL_STAGE]:
+        missing = [d for d in dependencies[stage] if d not in depth]
+        if missing:
+            raise ValueError(f"L'étape {stage} précède ses dépendances {missing} dans le profil")
+        depth[stage] = 1 + max((depth[d] for d in dependencies[stage]), default=-1)
+        # Un nœud LangGraph s'exécute à chaque écriture de son entrée: une jointure
+        # n'attend pas, ses branches doivent donc se terminer à la même super-étape
+        if len({depth[d] for d in dependencies[stage]}) > 1:
+            raise ValueError(f"Branches de longueurs différentes jointes à l'étape {stage}: "
+                             f"{dependencies[stage]}")
+    
+    for level in set(depth.values()):
+        written: Dict[str, str] = {}
+        for stage in [s for s in stages if depth[s] == level]:
+            for field in STAGES[stage]["writes"]:
+                if field in written:
+                    raise ValueError(f"Étapes parallèles {written[field]} et {stage} "
+                                     f"écrivant le même champ: {field}")
+                written[field] = stage
+    return dependencies
+
+class MultiAgentOrchestrator:
+    """Orchestrateur principal utilisant LangGraph"""
+    
+    def __init__(self):
+        self.research_agent = ResearchAgent()
+        self.source_agent = SourceAgent()
+        self.summarizer_agent = SummarizerAgent()
+        self.editor_agent = EditorAgent()
+        self.validator_agent = HumanValidatorAgent()
+        self.feedback_agent = FeedbackAgent()
+        self.memory_agent = MemoryAgent()
+        
+        # Cache des résultats partagé entre workers
+        self.cache = get_shared_cache()
+        
+        # Suivi des traitements en cours pour un arrêt propre
+        self._inflight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        
+        # Exécutions en cours, indexées par clé de requête normalisée
+        self._flights: Dict[str, asyncio.Future] = {}
+        # Demande de place de chaque exécution, relevée si un appelant plus prioritaire la rejoint
+        self._flight_tickets: Dict[str, AdmissionTicket] = {}
+        
+        # Places d'exécution: priorité interactive, partage équitable entre tenants
+        self.admission = get_admission_controller()
+        
+        # Tokens consommés par jour et par style (budgets, /usage)
+        self.usage = get_usage_ledger()
+        
+        # Persistance en mémoire hors du chemin critique
+        self.memory_writer = BackgroundWriter(self._persist_state)
+        
+        # Exécutions enregistrées pour les révisions humaines ultérieures
+        self.runs = get_run_store()
+        self.run_writer = BackgroundWriter(self.runs.save, name="run-writer")
+        
+        # Popularité des requêtes (rafraîchissement en arrière-plan), journalisée hors du chemin critique
+        self.popularity = get_popularity_tracker()
+        self.access_writer = BackgroundWriter(self.popularity.record_access, name="access-log")
+        
+        # Graphes LangGraph compilés, un par profil
+        self._workflows: Dict[str, Any] = {}
+        self.workflow = self.get_workflow("full")
+    
+    def get_workflow(self, profile: str = "full"):
+        """Retourne le graphe compilé du profil (construit au premier usage)"""
+        if profile not in self._workflows:
+            self._workflows[profile] = self._build_workflow(profile)
+        return self._workflows[profile]
+    
+    @staticmethod
+    def _get_profile(profile: str) -> Dict[str, Any]:
+        definition = PIPELINE_PROFILES.get(profile) or _INTERNAL_PROFILES.get(profile)
+        if definition is None:
+            raise ValueError(
+                f"Profil de pipeline inconnu: {profile} "
+                f"(disponibles: {', '.join(PIPELINE_PROFILES)})"
+            )
+        return definition
+    
+    def _build_workflow(self, profile: str = "full", parallel: Optional[bool] = None) -> StateGraph:
+        """
+        Construit le workflow du profil avec LangGraph
+        
+        Les étapes indépendantes (voir ``STAGES``) partent en parallèle depuis
+        leur dépendance commune et se rejoignent à l'étape suivante: la latence
+        est celle de la plus longue chaîne, pas la somme des étapes.
+        ``parallel`` vaut ``Config.WORKFLOW_PARALLEL`` par défaut.
+        """
+        stages = self._get_profile(profile)["stages"]
+        if parallel is None:
+            parallel = Config.WORKFLOW_PARALLEL
+        dependencies = stage_dependencies(stages, parallel)
+        nodes = {
+            "research": self._research_node,
+            "sources": self._sources_node,
+            "summarize": self._summarize_node,
+            "edit": self._edit_node,
+            "validate": self._validate_node,
+            "feedback_node": self._feedback_node,
+            DECISION_STAGE: self._review_node,
+            FINAL_STAGE: self._finalize_node,
+        }
+        
+        # Création du graphe d'état
+        workflow = StateGraph(AgentState)
+        
+        # Ajout des nœuds (agents) du profil
+        for stage in dependencies:
+            workflow.add_node(stage, nodes[stage])
+        
+        # Définition du flux
+        workflow.set_entry_point(stages[0])
+        
+        # Une arête par dépendance: plusieurs successeurs = branches parallèles,
+        # plusieurs dépendances = jointure
+        successors: Dict[str, List[str]] = {stage: [] for stage in dependencies}
+        for stage, after in dependencies.items():
+            for dependency in after:
+                successors[dependency].append(stage)
+        
+        for current, following in successors.items():
+            if current == DECISION_STAGE:
+                if len(following) != 1:
+                    raise ValueError(f"La décision doit avoir un seul successeur (trouvé: {following})")
+                # Branchement conditionnel après validation et feedback
+                workflow.add_conditional_edges(
+                    DECISION_STAGE,
+                    self._should_continue_after_validation,
+                    {
+                        "approved": following[0],
+                        "rejected": "edit",  # Retour à l'édition
+                        "error": END
+                    }
+                )
+            else:
+                for stage in following:
+                    workflow.add_edge(current, stage)
+        workflow.add_edge(FINAL_STAGE, END)
+        
+        # Chaque rejet de la validation repasse par l'édition: six super-étapes de plus
+        return workflow.compile().with_config(recursion_limit=Config.WORKFLOW_RECURSION_LIMIT)
+    
+    @staticmethod
+    def _stage_update(stage: str, state: AgentState) -> dict:
+        """Champs écrits par l'étape: des branches parallèles n'écrivent jamais le même canal"""
+        values = state.__dict__
+        update = {field: values[field] for field in STAGES[stage]["writes"]}
+        update["completed_stages"] = [stage]
+        return update
+    
+    def _research_node(self, state) -> dict:
+        if not isinstance(state, dict):
+            state = state.__dict__
+        from models import AgentState
+        agent_state = AgentState(**state)
+        return self._stage_update("research", self.research_agent.execute(agent_state))
+    
+    def _sources_node(self, state) -> dict:
+        if not isinstance(state, dict):
+            state = state.__dict__
+        agent_state = AgentState(**state)
+        return self._stage_update("sources", self.source_agent.execute(agent_state))
+    
+    def _summarize_node(self, state) -> dict:
+        if not isinstance(state, dict):
+            state = state.__dict__
+        from models import AgentState
+        agent_state = AgentState(**state)
+        return self._stage_update("summarize", self.summarizer_agent.execute(agent_state))
+    
+    def _edit_node(self, state) -> dict:
+        if not isinstance(state, dict):
+            state = state.__dict__
+        human_instructions = state.get("human_instructions")
+        from models import AgentState
+        agent_state = AgentState(**state)
+        return self._stage_update("edit", self.editor_agent.execute(agent_state, human_instructions))
+    
+    def _validate_node(self, state) -> dict:
+        if not isinstance(state, dict):
+            state = state.__dict__
+        from models import AgentState
+        agent_state = AgentState(**state)
+        return self._stage_update("validate", self.validator_agent.execute(agent_state))
+    
+    def _feedback_node(self, state) -> dict:
+        if not isinstance(state, dict):
+            state = state.__dict__
+        from models import AgentState
+        agent_state = AgentState(**state)
+        return self._stage_update("feedback_node", self.feedback_agent.execute(agent_state))
+    
+    def _review_node(self, state) -> dict:
+        # Jointure de la validation et du feedback: la décision est prise par l'arête conditionnelle
+        return {"completed_stages": [DECISION_STAGE]}
+    
+    def _persist_state(self, state: dict) -> None:
+        """Sauvegarde exécutée par le writer en arrière-plan"""
+        self.memory_agent.execute(AgentState(**state))
+    
+    def _finalize_node(self, state) -> dict:
+        if not isinstance(state, dict):
+            state = state.__dict__
+        from models import AgentState
+        agent_state = AgentState(**state)
+        # Le résultat final est la sortie de la dernière étape exécutée par le profil
+        if agent_state.validation_approved is False:
+            agent_state.final_result = "Traitement incomplet ou rejeté"
+        elif agent_state.edited_content:
+            agent_state.final_result = agent_state.edited_content
+        elif agent_state.summary:
+            agent_state.final_result = agent_state.summary
+        elif agent_state.search_results:
+            agent_state.final_result = "\n".join(
+                f"- {r['title']} ({r['url']})" for r in agent_state.search_results
+            )
+        else:
+            agent_state.final_result = "Traitement incomplet ou rejeté"
+        return {"final_result": agent_state.final_result, "completed_stages": [FINAL_STAGE]}
+    
+    def _should_continue_after_validation(self, state) -> str:
+        """Fonction de décision après validation"""
+        if state.get("error_message"):
+            return "error"
+        elif state.get("validation_approved"):
+            return "approved"
+        else:
+            return "rejected"
+    
+    async def process_research_request(self, query: str, style: str = "académique",
+                                       max_results: Optional[int] = None,
+                                       search_depth: Optional[str] = None,
+                                       styles: Optional[List[str]] = None,
+                                       profile: str = "full",
+                                       priority: Optional[str] = None,
+                                       tenant: Optional[str] = None,
+                                       token_budget: Optional[int] = None) -> dict:
+        """
+        Traite une demande de recherche complète
+        
+        ``profile`` choisit les étapes exécutées (voir ``PIPELINE_PROFILES``).
+        Si ``styles`` est fourni, la recherche et le résumé sont faits une seule fois
+        puis édités dans chaque style en parallèle (voir ``_process_multi_style``).
+        ``priority`` (interactive ou batch) et ``tenant`` déterminent l'admission
+        de l'exécution (voir ``admission``); un résultat en cache est servi sans attente.
+        ``token_budget`` remplace ``Config.REQUEST_TOKEN_BUDGET`` pour cette exécution.
+        Lève ``AdmissionRejected`` si la file d'attente de la classe est pleine et
+        ``BudgetExceeded`` si le budget quotidien de tokens est épuisé.
+        """
+        definition = self._get_profile(profile)
+        priority = self.admission.normalize_priority(priority)
+        metrics.increment("research_requests_total")
+        metrics.increment(f"research_profile_{profile}")
+        
+        if styles and "edit" in definition["stages"]:
+            return await self._process_multi_style(query, styles, max_results, search_depth, profile,
+                                                   priority, tenant, token_budget)
+        
+        params = result_params(query, style, max_results, search_depth, profile, token_budget)
+        self.access_writer.submit({'params': params, 'at': datetime.now().timestamp()})
+        
+        # Un résultat récent pour la même requête (et le même budget) est servi depuis le cache partagé
+        cache_key = result_key(params)
+        cached = self.cache.get_entry(cache_key, max_stale=Config.RESULT_CACHE_STALE_TTL)
+        if cached:
+            cached_state, stale = cached
+            if not stale:
+                print(f"⚡ Résultat servi depuis le cache pour: '{query}' ({style})")
+                metrics.increment("research_cache_hits")
+                cached_state["cache_hit"] = True
+                return self._issue_run(cached_state)
+            
+            # Stale-while-revalidate: le résultat périmé est servi pendant qu'il est recalculé.
+            # La réservation (transaction SQLite partagée entre workers) est faite hors de la boucle
+            loop = asyncio.get_running_loop()
+            if cache_key in self._flights or await loop.run_in_executor(
+                    None, self.popularity.try_reserve_run, cache_key, Config.REFRESH_MAX_RUNS_PER_HOUR):
+                print(f"⚡ Résultat périmé servi, rafraîchissement en arrière-plan: '{query}' ({style})")
+                metrics.increment("research_cache_stale_hits")
+                if cache_key not in self._flights:
+                    # Recalcul en tâche de fond: classe batch, la réponse est déjà servie
+                    self._start_flight(cache_key, query, style, max_results, search_depth, profile,
+                                       persist=False, priority=BATCH, tenant=tenant,
+                                       token_budget=token_budget)
+                cached_state["cache_hit"] = True
+                cached_state["stale"] = True
+                return self._issue_run(cached_state)
+        
+        # Single-flight: les requêtes identiques concurrentes partagent la même exécution
+        flight = self._flights.get(cache_key)
+        if flight is not None:
+            print(f"🔗 Requête rattachée à l'exécution en cours pour: '{query}' ({style})")
+            metrics.increment("research_requests_coalesced")
+            # Une exécution batch encore en attente ne fait pas attendre un appelant interactif
+            if self.admission.promote(self._flight_tickets[cache_key], priority):
+                print(f"⏫ Exécution partagée relevée en classe {priority}: '{query}' ({style})")
+            final_state = await asyncio.shield(flight)
+            return self._issue_run({**final_state, "coalesced": True})
+        
+        flight = self._start_flight(cache_key, query, style, max_results, search_depth, profile,
+                                    priority=priority, tenant=tenant, token_budget=token_budget)
+        return self._issue_run(await asyncio.shield(flight))
+    
+    async def refresh_result(self, params: Dict[str, Any]) -> dict:
+        """
+        Recalcule le résultat d'une requête pour renouveler son entrée de cache
+        
+        Utilisé par le rafraîchissement en arrière-plan: le résultat n'est pas
+        réécrit en mémoire, et une exécution déjà en cours est réutilisée.
+        """
+        cache_key = result_key(params)
+        metrics.increment("research_refresh_runs")
+        flight = self._flights.get(cache_key) or self._start_flight(
+            cache_key, params['query'], params['style'], params['max_results'],
+            params['search_depth'], params['profile'], persist=False,
+            priority=BATCH, tenant="refresh", token_budget=params.get('token_budget')
+        )
+        return await asyncio.shield(flight)
+    
+    def _start_flight(self, cache_key: str, query: str, style: str, max_results: Optional[int],
+                      search_depth: Optional[str], profile: str,
+                      persist: Optional[bool] = None, priority: Optional[str] = None,
+                      tenant: Optional[str] = None,
+                      token_budget: Optional[int] = None) -> asyncio.Future:
+        """Lance l'exécution d'une requête et l'enregistre pour le single-flight"""
+        # La tâche est indépendante de l'appelant: son annulation n'interrompt pas les suiveurs
+        ticket = AdmissionTicket(priority, tenant)
+        flight = asyncio.ensure_future(
+            self._run_workflow(query, style, max_results, search_depth, profile, cache_key, persist,
+                               ticket, token_budget)
+        )
+        self._flights[cache_key] = flight
+        self._flight_tickets[cache_key] = ticket
+        metrics.set_gauge("research_flights_inflight", len(self._flights))
+        
+        def _release(_):
+            if self._flights.get(cache_key) is flight:
+                del self._flights[cache_key]
+                del self._flight_tickets[cache_key]
+            metrics.set_gauge("research_flights_inflight", len(self._flights))
+            if not flight.cancelled():
+                # Exception lue: un rafraîchissement refusé (sans appelant) n'est pas signalé par asyncio
+                flight.exception()
+        flight.add_done_callback(_release)
+        return flight
+    
+    async def _run_workflow(self, query: str, style: str, max_results: Optional[int],
+                            search_depth: Optional[str], profile: str, cache_key: str,
+                            persist: Optional[bool] = None, ticket: Optional[AdmissionTicket] = None,
+                            token_budget: Optional[int] = None) -> dict:
+        """Exécute le workflow du profil, met en cache et persiste le résultat validé"""
+        # État initial sous forme de dictionnaire avec timestamp
+        initial_state = {
+            "query": query,
+            "style": style,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "timestamp": datetime.now(),
+            "token_budget": token_budget
+        }
+        
+        # Exécution du workflow
+        try:
+            with self._track_inflight():
+                async with self.admission.slot(ticket=ticket):
+                    await self._check_daily_budget()
+                    metrics.increment("research_pipeline_runs")
+                    print(f"🚀 Démarrage du processus de recherche pour: '{query}'")
+                    print(f"📝 Style demandé: {style} (profil: {profile})")
+                    print("-" * 50)
+                    
+                    # L'échéance court à partir de l'admission, pas de la mise en file
+                    initial_state["deadline"] = time.time() + Config.RUN_DEADLINE
+                    with metrics.timer("research_pipeline_seconds"):
+                        final_state = await self.get_workflow(profile).ainvoke(initial_state)
+            
+            print("-" * 50)
+            if final_state.get("final_result"):
+                print("✅ Processus terminé avec succès!")
+            elif final_state.get("error_message"):
+                print(f"❌ Erreur dans l'orchestration: {final_state.get('error_message')}")
+            else:
+                print("❌ Processus terminé avec des erreurs")
+            
+            if persist is None:
+                persist = self._get_profile(profile)["persist"]
+            self._complete_run(final_state, cache_key, persist)
+            
+            return final_state
+            
+        except (AdmissionRejected, BudgetExceeded):
+            raise
+        except Exception as e:
+            print(f"❌ Erreur dans l'orchestration: {str(e)}")
+            initial_state["error_message"] = f"Erreur d'orchestration: {str(e)}"
+            return initial_state
+    
+    async def _process_multi_style(self, query: str, styles: List[str],
+                                   max_results: Optional[int],
+                                   search_depth: Optional[str],
+                                   profile: str = "full", priority: Optional[str] = None,
+                                   tenant: Optional[str] = None,
+                                   token_budget: Optional[int] = None) -> dict:
+        """
+        Recherche et résumé uniques, puis édition concurrente dans chaque style
+        
+        Chaque style édité est mis en cache comme un résultat simple: une requête
+        ultérieure sur un seul de ces styles est servie directement.
+        Le premier style de la liste sert de résultat principal.
+        """
+        styles = list(dict.fromkeys(styles))
+        styled_states: Dict[str, dict] = {}
+        missing = []
+        cache_keys: Dict[str, str] = {}
+        for style in styles:
+            params = result_params(query, style, max_results, search_depth, profile, token_budget)
+            self.access_writer.submit({'params': params, 'at': datetime.now().timestamp()})
+            cache_keys[style] = result_key(params)
+            cached_state = self.cache.get(cache_keys[style])
+            if cached_state:
+                metrics.increment("research_cache_hits")
+                cached_state["cache_hit"] = True
+                styled_states[style] = cached_state
+            else:
+                missing.append(style)
+        
+        if missing:
+            base_state = {
+                "query": query,
+                "style": missing[0],
+                "max_results": max_results,
+                "search_depth": search_depth,
+                "timestamp": datetime.now(),
+                "token_budget": token_budget
+            }
+            
+            try:
+                # Une seule place d'exécution pour la recherche commune et toutes les éditions
+                with self._track_inflight():
+                    async with self.admission.slot(priority, tenant):
+                        await self._check_daily_budget()
+                        print(f"🚀 Recherche multi-styles pour: '{query}'")
+                        print(f"📝 Styles demandés: {', '.join(missing)}")
+                        print("-" * 50)
+                        metrics.increment("research_multi_style_runs")
+                        base_state["deadline"] = time.time() + Config.RUN_DEADLINE
+                        
+                        # Étapes communes exécutées une seule fois
+                        base_state = await self.get_workflow(STYLE_BASE_PROFILE).ainvoke(base_state)
+                        if base_state.get("error_message"):
+                            print(f"❌ Erreur dans l'orchestration: {base_state['error_message']}")
+                            return base_state
+                        
+                        # Une édition (avec validation et feedback) par style, en parallèle.
+                        # final_result est remis à zéro: le profil commun l'a fixé au résumé,
+                        # une édition interrompue ne doit pas le présenter comme texte stylé
+                        edit_workflow = self.get_workflow(STYLE_EDIT_PROFILE)
+                        outcomes = await asyncio.gather(*[
+                            edit_workflow.ainvoke({**base_state, "style": style, "final_result": None})
+                            for style in missing
+                        ], return_exceptions=True)
+            except (AdmissionRejected, BudgetExceeded):
+                raise
+            except Exception as e:
+                print(f"❌ Erreur dans l'orchestration: {str(e)}")
+                base_state["error_message"] = f"Erreur d'orchestration: {str(e)}"
+                return base_state
+            
+            persist = self._get_profile(profile)["persist"]
+            for style, final_state in zip(missing, outcomes):
+                if isinstance(final_state, BaseException):
+                    # L'échec d'un style n'interrompt pas les autres
+                    print(f"❌ Erreur lors de l'édition du style '{style}': {final_state}")
+                    final_state = {**base_state, "style": style, "final_result": None,
+                                   "error_message": f"Erreur d'orchestration: {final_state}"}
+                self._complete_run(final_state, cache_keys[style], persist)
+                styled_states[style] = final_state
+            
+            print("-" * 50)
+            print(f"✅ {len(missing)} style(s) édité(s) à partir d'une seule recherche")
+        
+        # Un style en échec (erreur, édition rejetée) est signalé à part, jamais
+        # remplacé par un texte qui n'a pas été édité dans ce style
+        styled_contents, failed_styles = {}, {}
+        for style in styles:
+            style_state = styled_states[style]
+            if style_state.get("error_message"):
+                failed_styles[style] = style_state["error_message"]
+            elif style_state.get("validation_approved") is False or not style_state.get("final_result"):
+                failed_styles[style] = "Édition rejetée ou incomplète"
+            else:
+                styled_contents[style] = style_state["final_result"]
+        if failed_styles:
+            metrics.increment("research_multi_style_failures", len(failed_styles))
+        
+        primary_state = self._issue_run(styled_states[styles[0]])
+        return {
+            **primary_state,
+            "styled_contents": styled_contents,
+            "failed_styles": failed_styles or None
+        }
+    
+    async def resume_run(self, run_id: str, human_instructions: str,
+                         priority: Optional[str] = None, tenant: Optional[str] = None) -> dict:
+        """
+        Reprend une exécution enregistrée avec de nouvelles instructions humaines
+        
+        La recherche et le résumé sont réutilisés: seuls le dernier texte édité et
+        les nouvelles instructions sont envoyés au modèle. Chaque révision réussie
+        est historisée. Lève ``KeyError`` si l'exécution est inconnue,
+        ``AdmissionRejected`` si la file d'attente de la classe est pleine,
+        ``BudgetExceeded`` si le budget quotidien de tokens est épuisé et
+        ``RevisionConflict`` si une révision concurrente a été enregistrée
+        depuis le texte retravaillé (ses instructions ne sont pas écrasées).
+        """
+        loop = asyncio.get_running_loop()
+        run_state = await loop.run_in_executor(None, self.runs.get, run_id)
+        if run_state is None and self.run_writer.pending():
+            # Exécution tout juste terminée: sa sauvegarde peut être encore en attente
+            await loop.run_in_executor(None, self.run_writer.flush, 5)
+            run_state = await loop.run_in_executor(None, self.runs.get, run_id)
+        if run_state is None:
+            raise KeyError(run_id)
+        
+        latest = await loop.run_in_executor(None, self.runs.latest_revision, run_id)
+        base_revision = latest['revision'] if latest else 0
+        current_text = (latest['edited_content'] if latest
+                        else run_state.get("edited_content") or run_state.get("summary") or "")
+        
+        metrics.increment("research_revisions")
+        with self._track_inflight():
+            async with self.admission.slot(priority, tenant):
+                await self._check_daily_budget()
+                # Usage compté pour la seule révision (budget de l'exécution remis à zéro)
+                state = AgentState(**{**run_state, "token_usage": None,
+                                      "deadline": time.time() + Config.RUN_DEADLINE})
+                with metrics.timer("research_revision_seconds"):
+                    revised = await loop.run_in_executor(
+                        None, self.editor_agent.revise, state, current_text, human_instructions
+                    )
+        
+        result = revised.__dict__
+        if result.get("error_message"):
+            return result
+        try:
+            result["revision"] = await loop.run_in_executor(
+                None, self.runs.add_revision, run_id, human_instructions,
+                revised.edited_content, base_revision
+            )
+        except RevisionConflict:
+            metrics.increment("research_revision_conflicts")
+            raise
+        result["final_result"] = revised.edited_content
+        result["human_instructions"] = human_instructions
+        return result
+    
+    def _issue_run(self, state: dict) -> dict:
+        """
+        Copie de l'état remise à un appelant, enregistrée sous un run_id qui lui est propre
+        
+        Un résultat partagé (cache, exécution rejointe) n'expose jamais le run_id
+        d'un autre appelant: les révisions de chacun repartent de leur propre copie.
+        """
+        if not state.get("summary") or state.get("error_message"):
+            return state
+        # État conservé sous un run_id: les révisions repartent de la recherche et du résumé
+        issued = {**state, "run_id": uuid.uuid4().hex}
+        self.run_writer.submit(dict(issued))
+        return issued
+    
+    def _complete_run(self, final_state: dict, cache_key: str, persist: bool) -> None:
+        """Met en cache un résultat réussi (non dégradé) et planifie sa sauvegarde en arrière-plan"""
+        if final_state.get("error_message") or final_state.get("validation_approved") is False:
+            return
+        if final_state.get("degraded"):
+            # Réponse de secours: ni mise en cache ni mémorisée, la prochaine requête retente le LLM
+            metrics.increment("research_degraded_responses")
+            return
+        self.cache.set(cache_key, final_state, ttl=Config.RESULT_CACHE_TTL)
+        if persist and final_state.get("edited_content"):
+            self.memory_writer.submit(final_state)
+    
+    async def _check_daily_budget(self) -> None:
+        """``check_daily_budget`` hors de la boucle: le total du jour peut être relu dans SQLite"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, check_daily_budget, self.usage)
+    
+    @contextmanager
+    def _track_inflight(self):
+        """Compte un traitement en cours, attendu par ``drain`` lors de l'arrêt"""
+        self._inflight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._inflight -= 1
+            if self._inflight == 0:
+                self._idle.set()
+    
+    async def drain(self, timeout: float) -> bool:
+        """
+        Attend la fin des traitements en cours puis des sauvegardes en attente (arrêt propre)
+        
+        Retourne False si le délai expire.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        if self._inflight:
+            print(f"⏳ Attente de {self._inflight} traitement(s) en cours...")
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {self._inflight} traitement(s) interrompu(s) après {timeout}s")
+            return False
+        
+        flushed = True
+        for writer in (self.memory_writer, self.run_writer):
+            remaining = max(0.0, deadline - loop.time())
+            if not await loop.run_in_executor(None, writer.flush, remaining):
+                print(f"⚠️ {writer.pending()} sauvegarde(s) non écrite(s)")
+                flushed = False
+        return flushed
+    
+    def get_memory_history(self, include_content: bool = True) -> Dict[str, Any]:
+        """Récupère l'historique des recherches (métadonnées seules si ``include_content`` est faux)"""
+        try:
+            return get_memory_store().load(include_content)
+        except Exception as e:
+            return {'error': f"Erreur de lecture mémoire: {str(e)}"}
+
+    def search_memory(self, text: str, style: Optional[str] = None, since: Optional[str] = None,
+                      until: Optional[str] = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Recherche plein texte dans l'historique des recherches"""
+        return get_memory_store().search(text, style=style, since=since, until=until,
+                                         limit=limit, offset=offset)
+
+# Instance globale de l'orchestrateur
 orchestrator = MultiAgentOrchestrator()
\ No newline at end of file
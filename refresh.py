@@ -0,0 +1,268 @@
+# refresh.py
+"""
+Rafraîchissement en arrière-plan des résultats populaires.
+
+La popularité de chaque requête (clé de cache) est suivie dans la base du
+cache partagé: un score qui décroît exponentiellement avec le temps
+(demi-vie ``Config.REFRESH_HALF_LIFE``), alimenté par les accès et par
+l'historique récent de la mémoire. L'historique ne conserve ni
+``max_results`` ni profondeur de recherche: il ne fait que renforcer les
+clés déjà servies pour la même requête et le même style, jamais en créer.
+Le ``RefreshScheduler`` relance le
+pipeline pour les requêtes populaires dont l'entrée de cache expire bientôt,
+dans la limite d'un budget d'exécutions par heure partagé entre workers.
+"""
+import asyncio
+import json
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from cache import SharedCache, make_cache_key
+from config import Config
+from memory_store import FileLock, MemoryStore
+from metrics import metrics
+
+
+def result_params(query: str, style: str, max_results: Optional[int] = None,
+                  search_depth: Optional[str] = None, profile: str = "full",
+                  token_budget: Optional[int] = None) -> Dict[str, Any]:
+    """Paramètres d'une requête, suffisants pour la rejouer"""
+    params = {
+        'query': query,
+        'style': style,
+        'max_results': max_results,
+        'search_depth': search_depth,
+        'profile': profile
+    }
+    if token_budget:
+        params['token_budget'] = token_budget
+    return params
+
+
+def query_signature(query: str, style: str) -> str:
+    """Requête et style normalisés, communs à toutes les variantes de paramètres"""
+    return make_cache_key("query", query, style)
+
+
+def result_key(params: Dict[str, Any]) -> str:
+    """
+    Clé de cache du résultat d'une requête (identique à celle de l'orchestrateur)
+
+    Un budget de tokens propre à la requête réduit le contexte et plafonne la
+    sortie: son résultat a sa propre clé, jamais servie sans ce budget.
+    """
+    parts = [params['query'], params['style'], params['max_results'],
+             params['search_depth'], params['profile']]
+    if params.get('token_budget'):
+        parts.append(f"budget={params['token_budget']}")
+    return make_cache_key("result", *parts)
+
+
+class PopularityTracker:
+    """Scores de popularité et budget de rafraîchissement, partagés entre processus"""
+
+    def __init__(self, path: str, half_life: float):
+        self.path = path
+        self.half_life = half_life
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_access (
+                    key TEXT PRIMARY KEY,
+                    params TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS refresh_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    started_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_refresh_runs_started ON refresh_runs (started_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _decay(self, elapsed: float) -> float:
+        return math.pow(0.5, max(0.0, elapsed) / self.half_life)
+
+    def record_access(self, access: Dict[str, Any]) -> None:
+        """Compte un accès (``{'params': ..., 'at': timestamp}``) à une requête"""
+        params = access['params']
+        key = result_key(params)
+        at = access.get('at') or time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT score, last_access FROM result_access WHERE key = ?", (key,)
+            ).fetchone()
+            score = 1.0 + (row[0] * self._decay(at - row[1]) if row else 0.0)
+            conn.execute(
+                "INSERT OR REPLACE INTO result_access (key, params, score, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(params, ensure_ascii=False), score, max(at, row[1]) if row else at)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def popular(self, min_score: float) -> Dict[str, Dict[str, Any]]:
+        """Requêtes dont le score actuel atteint ``min_score``, avec leurs paramètres"""
+        now = time.time()
+        conn = self._connection()
+        # Au-delà de dix demi-vies le score est négligeable: l'entrée est oubliée
+        conn.execute("DELETE FROM result_access WHERE last_access < ?", (now - 10 * self.half_life,))
+        popular = {}
+        for key, params, score, last_access in conn.execute(
+            "SELECT key, params, score, last_access FROM result_access"
+        ).fetchall():
+            current = score * self._decay(now - last_access)
+            if current >= min_score:
+                popular[key] = {'params': json.loads(params), 'score': current}
+        return popular
+
+    def try_reserve_run(self, key: str, max_per_hour: int) -> bool:
+        """Réserve une exécution de rafraîchissement si le budget horaire le permet"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM refresh_runs WHERE started_at < ?", (now - 3600,))
+            used = conn.execute("SELECT COUNT(*) FROM refresh_runs").fetchone()[0]
+            if used >= max_per_hour:
+                conn.execute("COMMIT")
+                metrics.increment("refresh_budget_exhausted")
+                return False
+            conn.execute("INSERT INTO refresh_runs (key, started_at) VALUES (?, ?)", (key, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        metrics.set_gauge("refresh_budget_remaining", max_per_hour - used - 1)
+        return True
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def memory_popularity(store: MemoryStore, half_life: float) -> Dict[str, float]:
+    """Scores tirés de l'historique de la mémoire, par signature requête/style (``query_signature``)"""
+    now = datetime.now()
+    popular: Dict[str, float] = {}
+    for item in store.list_history():
+        try:
+            age = (now - datetime.fromisoformat(item['timestamp'])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            continue
+        if age > 10 * half_life or not item.get('query'):
+            continue
+        signature = query_signature(item['query'], item.get('style') or "académique")
+        popular[signature] = popular.get(signature, 0.0) + math.pow(0.5, max(0.0, age) / half_life)
+    return popular
+
+
+class RefreshScheduler:
+    """
+    Relance périodiquement le pipeline pour les requêtes populaires bientôt expirées
+
+    Tourne dans la boucle asyncio du serveur; un seul worker à la fois fait
+    une passe (verrou fichier non bloquant), le budget horaire est global.
+    """
+
+    def __init__(self, orchestrator, tracker: PopularityTracker, cache: SharedCache,
+                 store: MemoryStore, lock_path: str):
+        self.orchestrator = orchestrator
+        self.tracker = tracker
+        self.cache = cache
+        self.store = store
+        self.lock = FileLock(lock_path)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and Config.REFRESH_INTERVAL > 0 and Config.RESULT_CACHE_TTL > 0:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(Config.REFRESH_INTERVAL)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"[Refresh] Erreur: {str(e)}")
+
+    def select_due(self) -> List[Dict[str, Any]]:
+        """Requêtes populaires absentes du cache ou qui expirent dans ``REFRESH_AHEAD_SECONDS``"""
+        # Seules les clés réellement servies sont candidates; une exécution mémorisée a
+        # aussi été comptée comme accès: on garde le plus fort des deux scores
+        memory_scores = memory_popularity(self.store, self.tracker.half_life)
+        candidates = {}
+        for key, entry in self.tracker.popular(0.0).items():
+            params = entry['params']
+            signature = query_signature(params['query'], params['style'])
+            candidates[key] = {**entry, 'score': max(entry['score'], memory_scores.get(signature, 0.0))}
+
+        now = time.time()
+        due = []
+        for key, entry in candidates.items():
+            if entry['score'] < Config.REFRESH_MIN_SCORE:
+                continue
+            expires_at = self.cache.expires_at(key)
+            if expires_at is None or expires_at - now <= Config.REFRESH_AHEAD_SECONDS:
+                due.append({'key': key, **entry})
+        return sorted(due, key=lambda entry: entry['score'], reverse=True)
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Une passe de rafraîchissement, séquentielle pour limiter la charge"""
+        with self.lock.acquire(blocking=False) as acquired:
+            if not acquired:
+                return {'skipped': True}
+            loop = asyncio.get_running_loop()
+            due = await loop.run_in_executor(None, self.select_due)
+            refreshed = 0
+            for entry in due:
+                if not self.tracker.try_reserve_run(entry['key'], Config.REFRESH_MAX_RUNS_PER_HOUR):
+                    break
+                await self.orchestrator.refresh_result(entry['params'])
+                refreshed += 1
+            metrics.set_gauge("refresh_due", len(due))
+            if refreshed:
+                print(f"[Refresh] {refreshed}/{len(due)} requête(s) populaire(s) rafraîchie(s)")
+            return {'skipped': False, 'due': len(due), 'refreshed': refreshed}
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_tracker: Optional[PopularityTracker] = None
+_tracker_lock = threading.Lock()
+
+def get_popularity_tracker() -> PopularityTracker:
+    """Suivi de popularité du processus, dans la base du cache partagé"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = PopularityTracker(Config.CACHE_DB_FILE, Config.REFRESH_HALF_LIFE)
+        return _tracker
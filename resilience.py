@@ -0,0 +1,205 @@
+# resilience.py
+"""
+Appels externes protégés: délais, requêtes doublées (hedging) et disjoncteurs.
+
+Chaque appel à un fournisseur (Tavily, Gemini) passe par ``guarded_call``:
+- le disjoncteur du fournisseur refuse immédiatement l'appel s'il est ouvert
+- l'appel est exécuté dans un pool de threads dédié et abandonné au-delà de
+  son délai (le plus court entre le délai par appel et le délai global de
+  l'exécution), ce qui libère le worker même si l'amont ne répond plus
+- optionnellement, un second appel identique est lancé si le premier n'a pas
+  répondu après le p95 des latences observées; le premier résultat gagne
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from config import Config
+from metrics import metrics
+
+
+class CircuitOpenError(RuntimeError):
+    """Appel refusé: le disjoncteur du fournisseur est ouvert"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Délai d'un appel ou de l'exécution dépassé"""
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur classique: fermé, ouvert après ``failure_threshold`` échecs
+    consécutifs, puis semi-ouvert après ``reset_timeout`` secondes (un appel
+    d'essai est autorisé; son succès referme le circuit)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_inflight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_inflight = False
+        return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_inflight:
+                self._trial_inflight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_inflight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    print(f"[Circuit {self.name}] Ouvert après {self._failures} échec(s)")
+                    metrics.increment(f"circuit_{self.name}_opened")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_inflight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'retry_in_seconds': round(retry_in, 1)
+            }
+
+
+# Fournisseurs externes connus (toujours listés sur /health)
+PROVIDERS = ("tavily", "gemini")
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Disjoncteur du fournisseur (un par processus)"""
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(
+                provider, Config.BREAKER_FAILURE_THRESHOLD, Config.BREAKER_RESET_TIMEOUT
+            )
+        return _breakers[provider]
+
+
+def breakers_snapshot() -> Dict[str, Dict[str, Any]]:
+    for provider in PROVIDERS:
+        get_breaker(provider)
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+
+# Pool dédié: un appel abandonné après son délai n'occupe qu'un de ces threads
+_executor = ThreadPoolExecutor(max_workers=Config.EXTERNAL_CALL_THREADS,
+                               thread_name_prefix="external-call")
+
+
+def remaining_timeout(timeout: float, deadline: Optional[float]) -> float:
+    """Délai effectif d'un appel: borné par l'échéance globale (``time.time()``) si elle existe"""
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise DeadlineExceeded("Délai global de l'exécution dépassé")
+    return min(timeout, remaining)
+
+
+def hedge_delay(latency_metric: str) -> float:
+    """Délai avant la requête doublée: p95 observé, ou valeur par défaut faute de mesures"""
+    p95 = metrics.percentile(latency_metric, 95, min_samples=Config.SEARCH_HEDGE_MIN_SAMPLES)
+    if p95 is None:
+        return Config.SEARCH_HEDGE_DEFAULT_DELAY
+    return max(Config.SEARCH_HEDGE_MIN_DELAY, p95)
+
+
+def guarded_call(provider: str, fn: Callable[[], Any], timeout: float,
+                 deadline: Optional[float] = None, latency_metric: Optional[str] = None,
+                 hedge: bool = False) -> Any:
+    """
+    Exécute ``fn`` sous la protection du disjoncteur de ``provider``
+
+    Lève ``CircuitOpenError`` si le circuit est ouvert et ``DeadlineExceeded``
+    si aucun appel n'a abouti dans le délai; les exceptions de ``fn`` sont
+    propagées. Délais et exceptions comptent comme des échecs du fournisseur.
+    """
+    timeout = remaining_timeout(timeout, deadline)
+    breaker = get_breaker(provider)
+    if not breaker.allow():
+        metrics.increment(f"circuit_{provider}_rejected")
+        raise CircuitOpenError(f"Fournisseur {provider} indisponible (circuit ouvert)")
+
+    def attempt():
+        start = time.perf_counter()
+        result = fn()
+        if latency_metric:
+            metrics.observe(latency_metric, time.perf_counter() - start)
+        return result
+
+    end = time.monotonic() + timeout
+    pending = {_executor.submit(attempt)}
+    hedge_future = None
+    can_hedge = hedge and latency_metric is not None
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = min(remaining, hedge_delay(latency_metric)) if can_hedge else remaining
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    breaker.record_success()
+                    if future is hedge_future:
+                        metrics.increment(f"{provider}_hedge_wins")
+                    return future.result()
+                error = future.exception()
+            if can_hedge and not done:
+                # Premier appel plus lent que le p95: requête doublée, la première réponse gagne
+                can_hedge = False
+                metrics.increment(f"{provider}_hedged_requests")
+                hedge_future = _executor.submit(attempt)
+                pending.add(hedge_future)
+    finally:
+        for future in pending:
+            future.cancel()
+
+    breaker.record_failure()
+    if error is not None:
+        raise error
+    metrics.increment(f"{provider}_timeouts")
+    raise DeadlineExceeded(f"Pas de réponse de {provider} après {timeout:.1f}s")
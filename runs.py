@@ -0,0 +1,161 @@
+# runs.py
+"""
+Exécutions terminées et historique de leurs révisions.
+
+Chaque exécution qui a produit un résumé est conservée (recherche, résumé,
+texte édité) sous un ``run_id``: une édition ultérieure avec de nouvelles
+instructions humaines repart de cet état au lieu de relancer le pipeline, et
+chaque révision est historisée. La base SQLite est partagée entre workers.
+"""
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from serialization import dumps_str, loads
+
+
+class RevisionConflict(RuntimeError):
+    """Une autre révision a été enregistrée depuis le texte de base de celle-ci"""
+
+
+class RunStore:
+    """États d'exécution et révisions successives, persistés dans SQLite"""
+
+    # Intervalle minimal entre deux purges des exécutions expirées
+    PURGE_INTERVAL = 3600
+
+    def __init__(self, path: str, retention_days: int = 0):
+        self.path = path
+        self.retention_days = retention_days
+        self._local = threading.local()
+        self._last_purge = 0.0
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS run_revisions (
+                    run_id TEXT NOT NULL,
+                    revision INTEGER NOT NULL,
+                    instructions TEXT NOT NULL,
+                    edited_content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, revision)
+                )
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Enregistre l'état d'une exécution (``state['run_id']`` requis)"""
+        record = {key: value for key, value in state.items() if key != 'human_instructions'}
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, state, created_at) VALUES (?, ?, ?)",
+                (state['run_id'], dumps_str(record), time.time())
+            )
+        if self.retention_days and time.time() - self._last_purge > self.PURGE_INTERVAL:
+            self.purge(self.retention_days * 86400)
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT state FROM runs WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return loads(row[0]) if row else None
+
+    def add_revision(self, run_id: str, instructions: str, edited_content: str,
+                     base_revision: Optional[int] = None) -> int:
+        """
+        Ajoute une révision et retourne son numéro (1, 2, ...)
+
+        ``base_revision`` est la révision dont le texte a été retravaillé (0 pour
+        le texte d'origine): si une autre révision a été enregistrée depuis,
+        ``RevisionConflict`` est levée plutôt que d'écraser ses instructions.
+        """
+        conn = self._connection()
+        # Verrou d'écriture pris avant la lecture: numérotation atomique entre workers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            latest = conn.execute(
+                "SELECT COALESCE(MAX(revision), 0) FROM run_revisions WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            if base_revision is not None and latest != base_revision:
+                raise RevisionConflict(
+                    f"Révision {latest} enregistrée depuis la révision {base_revision} de l'exécution {run_id}"
+                )
+            conn.execute(
+                "INSERT INTO run_revisions (run_id, revision, instructions, edited_content, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, latest + 1, instructions, edited_content, time.time())
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return latest + 1
+
+    def latest_revision(self, run_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT revision, instructions, edited_content, created_at FROM run_revisions "
+            "WHERE run_id = ? ORDER BY revision DESC LIMIT 1", (run_id,)
+        ).fetchone()
+        return self._revision(row) if row else None
+
+    def revisions(self, run_id: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT revision, instructions, edited_content, created_at FROM run_revisions "
+            "WHERE run_id = ? ORDER BY revision", (run_id,)
+        ).fetchall()
+        return [self._revision(row) for row in rows]
+
+    @staticmethod
+    def _revision(row) -> Dict[str, Any]:
+        revision, instructions, edited_content, created_at = row
+        return {
+            'revision': revision,
+            'instructions': instructions,
+            'edited_content': edited_content,
+            'created_at': created_at
+        }
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Supprime les exécutions (et leurs révisions) plus anciennes que ``max_age_seconds``"""
+        self._last_purge = time.time()
+        limit = time.time() - max_age_seconds
+        with self._connection() as conn:
+            conn.execute(
+                "DELETE FROM run_revisions WHERE run_id IN (SELECT run_id FROM runs WHERE created_at < ?)",
+                (limit,)
+            )
+            return conn.execute("DELETE FROM runs WHERE created_at < ?", (limit,)).rowcount
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_runs: Optional[RunStore] = None
+_runs_lock = threading.Lock()
+
+def get_run_store() -> RunStore:
+    """Store des exécutions du processus"""
+    global _runs
+    with _runs_lock:
+        if _runs is None:
+            _runs = RunStore(Config.RUNS_DB_FILE, Config.RUN_RETENTION_DAYS)
+        return _runs
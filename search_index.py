@@ -0,0 +1,231 @@
+# search_index.py
+"""
+Index plein texte de la mémoire des recherches (SQLite FTS5).
+
+L'index est mis à jour de manière incrémentale à chaque ajout ou
+suppression d'entrée, dans la même transaction que l'entrée quand le
+store le permet; il couvre la requête, le contenu final et le feedback,
+et classe les résultats par BM25 (la requête pèse le plus).
+"""
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+# Poids BM25 des colonnes indexées: requête, contenu final, feedback, style
+BM25_WEIGHTS = (5.0, 1.0, 2.0, 0.0)
+
+MIN_PREFIX_CHARS = 3
+
+DATE_ONLY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def build_match_expression(text: str) -> Optional[str]:
+    """Convertit une saisie libre en expression FTS5 sûre (termes en ET, préfixe sur le dernier)"""
+    terms = re.findall(r"\w+", text, flags=re.UNICODE)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    # Un préfixe trop court ferait correspondre presque tout l'index
+    if len(terms[-1]) >= MIN_PREFIX_CHARS:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def upper_date_bound(until: str) -> str:
+    """Borne haute inclusive: une date seule (AAAA-MM-JJ) couvre toute la journée"""
+    if DATE_ONLY.match(until):
+        return until + "T23:59:59.999999"
+    return until
+
+
+class SearchIndex:
+    """
+    Index FTS5 des entrées de la mémoire
+
+    Les métadonnées de filtrage (date, identifiants) sont dans une table
+    ordinaire liée par rowid: les filtrer ne relit pas le texte indexé.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS research_fts USING fts5(
+                    query,
+                    final_content,
+                    feedback,
+                    style,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS research_fts_meta (
+                    rowid INTEGER PRIMARY KEY,
+                    entry_id TEXT NOT NULL,
+                    content_id TEXT,
+                    style TEXT,
+                    timestamp TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fts_meta_entry ON research_fts_meta (entry_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fts_meta_timestamp ON research_fts_meta (timestamp)")
+            # Classement par défaut (colonne cachée "rank") pondéré par colonne
+            conn.execute(
+                "INSERT INTO research_fts (research_fts, rank) VALUES ('rank', ?)",
+                (f"bm25({', '.join(str(w) for w in BM25_WEIGHTS)})",)
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self, conn: Optional[sqlite3.Connection] = None):
+        """
+        Transaction d'écriture (BEGIN IMMEDIATE) sur la connexion de l'index,
+        ou sur ``conn`` quand l'index partage la base du store
+        """
+        conn = conn or self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    @staticmethod
+    def write_entry(conn: sqlite3.Connection, entry_id: Any, record: Dict[str, Any],
+                    content_id: Optional[str] = None) -> None:
+        """Indexe une entrée dans la transaction en cours sur ``conn``"""
+        rowid = conn.execute(
+            "INSERT INTO research_fts (query, final_content, feedback, style) VALUES (?, ?, ?, ?)",
+            (record.get('query') or '', record.get('final_content') or '',
+             record.get('feedback') or '', record.get('style') or '')
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO research_fts_meta (rowid, entry_id, content_id, style, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (rowid, str(entry_id), content_id, record.get('style'), record.get('timestamp'))
+        )
+
+    @staticmethod
+    def delete_entries(conn: sqlite3.Connection, entry_ids: Iterable[Any]) -> None:
+        """Retire des entrées dans la transaction en cours sur ``conn``"""
+        for entry_id in entry_ids:
+            rowids = [row[0] for row in conn.execute(
+                "SELECT rowid FROM research_fts_meta WHERE entry_id = ?", (str(entry_id),)
+            )]
+            for rowid in rowids:
+                conn.execute("DELETE FROM research_fts WHERE rowid = ?", (rowid,))
+                conn.execute("DELETE FROM research_fts_meta WHERE rowid = ?", (rowid,))
+
+    @classmethod
+    def replace_all(cls, conn: sqlite3.Connection, entries: Iterable[Dict[str, Any]]) -> None:
+        """Reconstruit tout l'index dans la transaction en cours (entrées avec ``final_content``)"""
+        conn.execute("DELETE FROM research_fts")
+        conn.execute("DELETE FROM research_fts_meta")
+        for item in entries:
+            cls.write_entry(conn, item['id'], item, item.get('content_id'))
+
+    def add(self, entry_id: Any, record: Dict[str, Any], content_id: Optional[str] = None) -> None:
+        with self.transaction() as conn:
+            self.write_entry(conn, entry_id, record, content_id)
+
+    def remove(self, entry_ids: Iterable[Any]) -> None:
+        with self.transaction() as conn:
+            self.delete_entries(conn, entry_ids)
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM research_fts")
+            conn.execute("DELETE FROM research_fts_meta")
+
+    def count(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        conn = conn or self._connection()
+        return conn.execute("SELECT COUNT(*) FROM research_fts_meta").fetchone()[0]
+
+    def optimize(self) -> None:
+        """Fusionne les segments de l'index (appelé par la compaction)"""
+        with self._connection() as conn:
+            conn.execute("INSERT INTO research_fts (research_fts) VALUES ('optimize')")
+
+    def search(self, text: str, style: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Recherche classée, filtrée par style et par date (ISO 8601), paginée"""
+        match = build_match_expression(text)
+        if match is None:
+            return {'total': 0, 'results': []}
+
+        # Le style est filtré dans l'expression FTS (colonne indexée) plutôt qu'après coup
+        if style:
+            style_terms = build_match_expression(style)
+            if style_terms:
+                match = f"({match}) AND style : ({style_terms.rstrip('*')})"
+
+        joins, conditions = "", ["research_fts MATCH ?"]
+        params: List[Any] = [match]
+        if since or until:
+            joins = "JOIN research_fts_meta m ON m.rowid = research_fts.rowid"
+            if since:
+                conditions.append("m.timestamp >= ?")
+                params.append(since)
+            if until:
+                conditions.append("m.timestamp <= ?")
+                params.append(upper_date_bound(until))
+        where = " AND ".join(conditions)
+
+        conn = self._connection()
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM research_fts {joins} WHERE {where}", params
+        ).fetchone()[0]
+
+        # 1. Classement: seuls les rowids de la page sont retenus
+        page = conn.execute(
+            f"SELECT research_fts.rowid, research_fts.rank FROM research_fts {joins} "
+            f"WHERE {where} ORDER BY research_fts.rank LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        if not page:
+            return {'total': total, 'results': []}
+
+        # 2. Extraits et métadonnées calculés uniquement pour la page
+        placeholders = ", ".join("?" for _ in page)
+        details = {
+            row[0]: row[1:]
+            for row in conn.execute(
+                f"SELECT research_fts.rowid, m.entry_id, m.content_id, m.style, m.timestamp, "
+                f"research_fts.query, snippet(research_fts, 1, '**', '**', '…', 16) "
+                f"FROM research_fts JOIN research_fts_meta m ON m.rowid = research_fts.rowid "
+                f"WHERE research_fts MATCH ? AND research_fts.rowid IN ({placeholders})",
+                [match] + [rowid for rowid, _ in page]
+            )
+        }
+
+        results = []
+        for rowid, rank in page:
+            entry_id, content_id, row_style, timestamp, query, snippet = details[rowid]
+            results.append({
+                'id': entry_id,
+                'content_id': content_id,
+                'style': row_style,
+                'timestamp': timestamp,
+                'query': query,
+                'snippet': snippet,
+                'score': round(-rank, 4)
+            })
+        return {'total': total, 'results': results}
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,70 @@
+# serialization.py
+"""
+Sérialisation JSON rapide des réponses de l'API et des enregistrements persistés.
+
+``orjson`` est utilisé s'il est installé (dépendance optionnelle), le module
+``json`` de la bibliothèque standard sinon. Les deux chemins produisent le
+même JSON compact en UTF-8: dates au format ISO 8601, modèles pydantic
+convertis en dictionnaires, autres types inconnus convertis en chaîne.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, Union
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle: repli sur json
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(obj: Any) -> Any:
+    """Types non sérialisables nativement"""
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Encode ``obj`` en JSON compact (UTF-8)"""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any) -> bytes:
+        """Encode ``obj`` en JSON compact (UTF-8)"""
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'),
+                          default=_default).encode('utf-8')
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+def dumps_str(obj: Any) -> str:
+    """Comme ``dumps``, pour les colonnes texte et les fichiers ouverts en mode texte"""
+    return dumps(obj).decode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON encodée par ``dumps``
+
+    Retournée directement par un endpoint, elle court-circuite la validation
+    du ``response_model`` et ``jsonable_encoder`` de FastAPI: le contenu doit
+    donc déjà avoir la forme du modèle déclaré.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
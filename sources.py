@@ -0,0 +1,276 @@
+# sources.py
+"""
+Registre des sources web, partagé entre exécutions.
+
+Les URL renvoyées par la recherche sont canonisées (schéma et hôte en
+minuscules, ``www.``, port par défaut, fragment et paramètres de suivi
+retirés, paramètres triés): une même page obtenue par des requêtes
+différentes a donc un seul ``source_id``. Le registre conserve pour chaque
+source son titre, l'empreinte de son contenu et ses dates de récupération;
+les contenus eux-mêmes sont stockés une seule fois, compressés et adressés
+par leur empreinte (voir ``content_store``).
+
+``AgentState.search_results`` ne transporte plus que des références
+(``source_id``, ``content_id``, titre, URL, score): l'état mis en cache ou
+enregistré reste léger, et les contenus sont résolus à la demande par
+``resolve_sources``. Une réutilisation entre exécutions (résumés par source,
+embeddings de passages...) peut s'indexer sur ``source_id``/``content_id``.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import Config
+from content_store import SqliteContentStore, content_id
+from metrics import metrics
+
+# Paramètres de suivi sans effet sur le contenu de la page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "_hsenc", "_hsmi", "yclid", "spm",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """Forme canonique d'une URL, utilisée pour identifier une source"""
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        # http et https désignent la même page
+        scheme = "https"
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def source_id(url: str) -> str:
+    """Identifiant stable d'une source: empreinte de son URL canonique"""
+    return hashlib.sha256(canonical_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+def dedupe_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Résultats sans doublons (même URL canonique, ou même contenu sous deux
+    URL), en gardant la première occurrence, la mieux classée
+    """
+    unique: List[Dict[str, Any]] = []
+    seen_sources, seen_contents = set(), set()
+    for result in results:
+        sid = source_id(result.get('url', ''))
+        # Un contenu vide n'identifie rien: seules les URL départagent ces résultats
+        content = result.get('content')
+        cid = content_id(content) if content else None
+        if sid in seen_sources or (cid and cid in seen_contents):
+            metrics.increment("sources_deduplicated")
+            continue
+        seen_sources.add(sid)
+        if cid:
+            seen_contents.add(cid)
+        unique.append(result)
+    return unique
+
+
+class SourceRegistry:
+    """Sources connues et leurs contenus, persistés dans SQLite et partagés entre workers"""
+
+    # Intervalle minimal entre deux purges des sources expirées
+    PURGE_INTERVAL = 3600
+
+    def __init__(self, path: str, retention_days: int = 0, cache_size: int = 512):
+        self.path = path
+        self.retention_days = retention_days
+        self.cache_size = cache_size
+        self._local = threading.local()
+        self._last_purge = 0.0
+        # Contenus récemment utilisés, par content_id (immuables: jamais invalidés)
+        self._contents: "OrderedDict[str, str]" = OrderedDict()
+        self._contents_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    source_id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    canonical_url TEXT NOT NULL,
+                    title TEXT,
+                    content_id TEXT NOT NULL,
+                    first_fetched_at REAL NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    fetch_count INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sources_fetched ON sources (fetched_at)")
+        self.contents = SqliteContentStore(self._connection)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, cid: str, text: str) -> None:
+        with self._contents_lock:
+            self._contents[cid] = text
+            self._contents.move_to_end(cid)
+            while len(self._contents) > self.cache_size:
+                self._contents.popitem(last=False)
+
+    def register(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Enregistre des résultats de recherche et retourne leurs références
+
+        Les doublons sont éliminés (voir ``dedupe_results``).
+        """
+        now = time.time()
+        refs: List[Dict[str, Any]] = []
+        known = 0
+        with self._connection() as conn:
+            for result in dedupe_results(results):
+                url = result.get('url', '')
+                text = result.get('content') or ''
+                sid, cid = source_id(url), content_id(text)
+
+                self.contents.put(text)
+                cursor = conn.execute(
+                    "UPDATE sources SET url = ?, title = ?, content_id = ?, fetched_at = ?, "
+                    "fetch_count = fetch_count + 1 WHERE source_id = ?",
+                    (url, result.get('title', ''), cid, now, sid)
+                )
+                if cursor.rowcount:
+                    known += 1
+                else:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO sources (source_id, url, canonical_url, title, content_id, "
+                        "first_fetched_at, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (sid, url, canonical_url(url), result.get('title', ''), cid, now, now)
+                    )
+                self._remember(cid, text)
+                refs.append({
+                    'source_id': sid,
+                    'content_id': cid,
+                    'title': result.get('title', ''),
+                    'url': url,
+                    'score': result.get('score', 0.0)
+                })
+
+        metrics.increment("sources_registered", len(refs) - known)
+        metrics.increment("sources_reused", known)
+        if self.retention_days and now - self._last_purge > self.PURGE_INTERVAL:
+            self.purge(self.retention_days * 86400)
+        return refs
+
+    def content(self, cid: str) -> Optional[str]:
+        """Contenu d'une source par son empreinte"""
+        with self._contents_lock:
+            text = self._contents.get(cid)
+            if text is not None:
+                self._contents.move_to_end(cid)
+                return text
+        text = self.contents.get(cid)
+        if text is not None:
+            self._remember(cid, text)
+        return text
+
+    def resolve(self, refs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Résultats complets (avec ``content``) à partir de références"""
+        resolved = []
+        for ref in refs:
+            if 'content' in ref:
+                # Résultat déjà complet (état antérieur au registre)
+                resolved.append(ref)
+                continue
+            text = self.content(ref['content_id']) if ref.get('content_id') else None
+            resolved.append({**ref, 'content': text or ''})
+        return resolved
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT source_id, url, canonical_url, title, content_id, first_fetched_at, "
+            "fetched_at, fetch_count FROM sources WHERE source_id = ?", (sid,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('source_id', 'url', 'canonical_url', 'title', 'content_id',
+                'first_fetched_at', 'fetched_at', 'fetch_count')
+        return dict(zip(keys, row))
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Supprime les sources non récupérées depuis ``max_age_seconds`` et leurs contenus orphelins"""
+        self._last_purge = time.time()
+        limit = time.time() - max_age_seconds
+        with self._connection() as conn:
+            removed = conn.execute("DELETE FROM sources WHERE fetched_at < ?", (limit,)).rowcount
+            # Un contenu récent peut encore être référencé par un état en cache: délai de grâce identique
+            conn.execute(
+                "DELETE FROM contents WHERE (created_at IS NULL OR created_at < ?) "
+                "AND id NOT IN (SELECT content_id FROM sources)", (limit,)
+            )
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._connection()
+        sources, fetches = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(fetch_count), 0) FROM sources"
+        ).fetchone()
+        return {
+            'sources': sources,
+            'fetches': fetches,
+            'contents': conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0],
+            'content_bytes': self.contents.size_bytes()
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_registry: Optional[SourceRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_source_registry() -> SourceRegistry:
+    """Registre des sources du processus"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SourceRegistry(
+                Config.SOURCES_DB_FILE, Config.SOURCE_RETENTION_DAYS, Config.SOURCE_CACHE_SIZE
+            )
+        return _registry
+
+
+def resolve_sources(search_results: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Résultats de recherche d'un état, avec leurs contenus"""
+    if not search_results:
+        return []
+    return get_source_registry().resolve(search_results)
@@ -1,2 +1,2 @@
-from tavily import TavilyClient
-print("Tavily importé avec succès !")
+from tavily import TavilyClient
+print("Tavily importé avec succès !")
@@ -0,0 +1,12 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# Modules du projet à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Backends hors ligne, et fichiers par défaut (mémoire, cache, sources...) hors du dépôt
+os.environ["OFFLINE_MODE"] = "true"
+os.environ["OFFLINE_LATENCY"] = "0"
+os.chdir(tempfile.mkdtemp(prefix="tests-"))
@@ -0,0 +1,117 @@
+# tests/unit/test_admission.py
+import asyncio
+
+import pytest
+
+from admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected, AdmissionTicket, parse_weights
+
+
+def admission_order(controller, requests):
+    """Ordre d'admission de ``requests`` (priorité, tenant), mises en file derrière une place occupée"""
+    order = []
+
+    async def job(index, priority, tenant):
+        async with controller.slot(priority, tenant):
+            order.append(index)
+
+    async def scenario():
+        async with controller.slot(INTERACTIVE, "occupant"):
+            tasks = []
+            for index, (priority, tenant) in enumerate(requests):
+                tasks.append(asyncio.create_task(job(index, priority, tenant)))
+                await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_interactive_requests_are_served_before_batch():
+    controller = AdmissionController(1, {})
+    order = admission_order(controller, [(BATCH, "a"), (BATCH, "a"), (INTERACTIVE, "b"), (BATCH, "a")])
+    assert order == [2, 0, 1, 3]
+
+
+def test_tenants_share_a_class_fairly():
+    controller = AdmissionController(1, {})
+    requests = [(BATCH, "lot")] * 4 + [(BATCH, "autre")] * 2
+    assert admission_order(controller, requests) == [0, 4, 1, 5, 2, 3]
+
+
+def test_tenant_weights():
+    controller = AdmissionController(1, {}, parse_weights("lourd=2, leger=1"))
+    requests = [(BATCH, "leger")] * 3 + [(BATCH, "lourd")] * 4
+    assert admission_order(controller, requests) == [0, 3, 4, 1, 5, 6, 2]
+
+
+def test_batch_limit_reserves_places_for_interactive():
+    controller = AdmissionController(2, {BATCH: 1})
+
+    async def scenario():
+        async with controller.slot(BATCH, "a"):
+            waiting = asyncio.create_task(controller.slot(BATCH, "a").__aenter__())
+            await asyncio.sleep(0)
+            assert not waiting.done()
+            async with controller.slot(INTERACTIVE, "b"):
+                assert controller.snapshot()['classes'][INTERACTIVE]['active'] == 1
+            waiting.cancel()
+
+    asyncio.run(scenario())
+    batch = controller.snapshot()['classes'][BATCH]
+    assert (batch['active'], batch['queued']) == (0, 0)
+
+
+def test_full_queue_rejects_requests():
+    controller = AdmissionController(1, {}, max_queue=1)
+
+    async def scenario():
+        async with controller.slot(BATCH, "a"):
+            waiting = asyncio.create_task(controller.slot(BATCH, "a").__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected):
+                async with controller.slot(BATCH, "a"):
+                    pass
+            waiting.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        AdmissionController.normalize_priority("urgent")
+
+
+def test_promoted_request_leaves_the_batch_backlog():
+    controller = AdmissionController(1, {})
+    order = []
+
+    async def job(name, ticket):
+        async with controller.slot(ticket=ticket):
+            order.append(name)
+
+    async def scenario():
+        async with controller.slot(INTERACTIVE, "occupant"):
+            tasks = [asyncio.create_task(job(f"lot-{i}", AdmissionTicket(BATCH, "lot"))) for i in range(3)]
+            shared = AdmissionTicket(BATCH, "refresh")
+            tasks.append(asyncio.create_task(job("partagée", shared)))
+            await asyncio.sleep(0)
+            assert controller.promote(shared, INTERACTIVE)
+            assert not controller.promote(shared, BATCH)
+            assert controller.snapshot()['classes'][INTERACTIVE]['queued'] == 1
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert order == ["partagée", "lot-0", "lot-1", "lot-2"]
+    assert controller.snapshot()['classes'][INTERACTIVE]['active'] == 0
+
+
+def test_admitted_request_is_not_promoted():
+    controller = AdmissionController(1, {})
+
+    async def scenario():
+        ticket = AdmissionTicket(BATCH, "a")
+        async with controller.slot(ticket=ticket):
+            assert not controller.promote(ticket, INTERACTIVE)
+        assert controller.snapshot()['classes'][BATCH]['active'] == 0
+
+    asyncio.run(scenario())
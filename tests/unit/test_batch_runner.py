@@ -0,0 +1,29 @@
+# tests/unit/test_batch_runner.py
+import os
+
+from batch_runner import EVALUATION_STATE_PATHS, ResultShards, isolate_state
+from config import Config
+
+
+def test_failed_requests_are_replayed(tmp_path):
+    shards = ResultShards(str(tmp_path), shard_size=10)
+    shards.append({'id': "a", 'ok': True, 'error': None})
+    shards.append({'id': "b", 'ok': False, 'error': "Recherche indisponible"})
+    shards.close()
+    assert shards.completed_ids() == {"a"}
+
+    # Relance réussie: le dernier enregistrement fait foi
+    shards = ResultShards(str(tmp_path), shard_size=10)
+    shards.append({'id': "b", 'ok': True, 'error': None})
+    shards.close()
+    assert shards.completed_ids() == {"a", "b"}
+    assert shards.latest_records()["b"]['ok'] is True
+
+
+def test_evaluation_state_is_isolated(tmp_path, monkeypatch):
+    for key in EVALUATION_STATE_PATHS:
+        monkeypatch.setattr(Config, key, getattr(Config, key))
+    paths = isolate_state(str(tmp_path))
+    for key in EVALUATION_STATE_PATHS:
+        assert getattr(Config, key) == paths[key]
+        assert os.path.dirname(paths[key]) == str(tmp_path / "state")
@@ -0,0 +1,88 @@
+# tests/unit/test_compaction.py
+import sqlite3
+from datetime import datetime, timedelta
+
+from compaction import Compactor, MemoryArchive, RetentionPolicy
+from config import Config
+from memory_store import JsonMemoryStore, SqliteMemoryStore
+from serialization import dumps
+
+LEGACY_TEXT = "Contenu complet d'une entrée ancienne. " * 40
+
+
+def old_timestamp(days=30):
+    return (datetime.now() - timedelta(days=days)).isoformat()
+
+
+def make_compactor(store, tmp_path, **policy):
+    archive = MemoryArchive(str(tmp_path / "archive"))
+    return Compactor(store, archive, RetentionPolicy(**policy), str(tmp_path / "compaction.lock")), archive
+
+
+def test_sqlite_legacy_entry_round_trip(tmp_path):
+    path = str(tmp_path / "memory.db")
+    store = SqliteMemoryStore(path)
+    # Entrée antérieure au stockage séparé: contenu en ligne, sans content_id
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO research_history (timestamp, query, style, final_content) VALUES (?, ?, ?, ?)",
+                     (old_timestamp(), "ancienne requête", "académique", LEGACY_TEXT))
+    assert len(LEGACY_TEXT) > Config.MEMORY_PREVIEW_CHARS
+    store.append({'timestamp': datetime.now().isoformat(), 'query': "récente",
+                  'style': "académique", 'final_content': "texte récent"})
+
+    compactor, archive = make_compactor(store, tmp_path, max_age_days=7)
+    result = compactor.run()
+    assert result['expired_entries'] == 1
+    [entry] = archive.read_segment(result['archive_segment'])
+    assert entry['final_content'] == LEGACY_TEXT
+
+    assert archive.restore_segment(result['archive_segment'], store) == 1
+    restored = [item for item in store.load()['research_history'] if item['query'] == "ancienne requête"]
+    assert [item['final_content'] for item in restored] == [LEGACY_TEXT]
+
+
+def test_json_legacy_entry_round_trip(tmp_path):
+    path = tmp_path / "memory.json"
+    path.write_bytes(dumps({'research_history': [
+        {'timestamp': old_timestamp(), 'query': "ancienne requête", 'style': "académique",
+         'final_content': LEGACY_TEXT}
+    ]}))
+    store = JsonMemoryStore(str(path), str(tmp_path / "content"), str(tmp_path / "index.db"))
+
+    compactor, archive = make_compactor(store, tmp_path, max_age_days=7)
+    result = compactor.run()
+    assert result['expired_entries'] == 1
+    [entry] = archive.read_segment(result['archive_segment'])
+    assert entry['final_content'] == LEGACY_TEXT
+    assert '_inline_content' not in entry
+
+    archive.restore_segment(result['archive_segment'], store)
+    [restored] = store.load()['research_history']
+    assert restored['final_content'] == LEGACY_TEXT
+
+
+def test_entry_without_content_is_kept(tmp_path):
+    store = SqliteMemoryStore(str(tmp_path / "memory.db"))
+    store.append({'timestamp': old_timestamp(), 'query': "orpheline",
+                  'style': "académique", 'final_content': "texte perdu"})
+    store.contents.clear()
+
+    compactor, archive = make_compactor(store, tmp_path, max_age_days=7)
+    result = compactor.run()
+    assert result['expired_entries'] == 0
+    assert result['unexported_entries'] == 1
+    assert result['archive_segment'] is None
+    assert [item['query'] for item in store.list_history()] == ["orpheline"]
+
+
+def test_max_entries_keeps_most_recent(tmp_path):
+    store = SqliteMemoryStore(str(tmp_path / "memory.db"))
+    for i in range(5):
+        store.append({'timestamp': datetime.now().isoformat(), 'query': f"requête {i}",
+                      'style': "académique", 'final_content': f"texte {i}"})
+
+    compactor, archive = make_compactor(store, tmp_path, max_entries=2)
+    result = compactor.run()
+    assert result['expired_entries'] == 3
+    assert [item['query'] for item in store.list_history()] == ["requête 3", "requête 4"]
+    assert len(archive.read_segment(result['archive_segment'])) == 3
@@ -0,0 +1,40 @@
+# tests/unit/test_content_store.py
+import sqlite3
+
+import pytest
+
+from content_store import ContentStore, FileContentStore, SqliteContentStore
+
+TEXT = "Contenu de recherche stocké une seule fois. " * 20
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "file":
+        return FileContentStore(str(tmp_path / "contents"))
+    conn = sqlite3.connect(str(tmp_path / "contents.db"))
+    return SqliteContentStore(lambda: conn)
+
+
+def test_content_is_stored_once_and_compressed(store):
+    cid = store.put(TEXT)
+    assert store.put(TEXT) == cid
+    assert list(store.ids()) == [cid]
+    assert store.get(cid) == TEXT
+    assert 0 < store.blob_size(cid) < len(TEXT)
+
+
+def test_deleted_content_is_gone(store):
+    cid = store.put(TEXT)
+    store.delete(cid)
+    assert store.get(cid) is None
+    assert not store.exists(cid)
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class ReadOnlyStore(ContentStore):
+        def exists(self, cid):
+            return False
+
+    with pytest.raises(TypeError):
+        ReadOnlyStore()
@@ -0,0 +1,30 @@
+# tests/unit/test_flight_priority.py
+import asyncio
+
+from admission import BATCH, INTERACTIVE, AdmissionController
+from orchestrator import MultiAgentOrchestrator
+
+
+def test_interactive_follower_promotes_queued_batch_flight():
+    runner = MultiAgentOrchestrator()
+    runner.admission = controller = AdmissionController(1, {})
+    completed = []
+
+    async def request(query, priority):
+        state = await runner.process_research_request(query, profile="no-memory", priority=priority)
+        completed.append((query, priority, bool(state.get("coalesced"))))
+
+    async def scenario():
+        async with controller.slot(INTERACTIVE, "occupant"):
+            tasks = [asyncio.create_task(request(f"lot de requêtes numéro {i}", BATCH)) for i in range(2)]
+            tasks.append(asyncio.create_task(request("éoliennes flottantes en mer", BATCH)))
+            await asyncio.sleep(0.01)
+            tasks.append(asyncio.create_task(request("éoliennes flottantes en mer", INTERACTIVE)))
+            await asyncio.sleep(0.01)
+            classes = controller.snapshot()['classes']
+            assert (classes[INTERACTIVE]['queued'], classes[BATCH]['queued']) == (1, 2)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert [query for query, _, _ in completed[:2]] == ["éoliennes flottantes en mer"] * 2
+    assert sorted(coalesced for _, _, coalesced in completed[:2]) == [False, True]
@@ -0,0 +1,80 @@
+# tests/unit/test_memory_search.py
+import pytest
+
+from memory_store import JsonMemoryStore, MemoryStore, SqliteMemoryStore
+from search_index import upper_date_bound
+
+
+def make_store(tmp_path, backend="sqlite"):
+    if backend == "json":
+        store = JsonMemoryStore(str(tmp_path / "memory.json"), str(tmp_path / "content"),
+                                str(tmp_path / "index.db"))
+    else:
+        store = SqliteMemoryStore(str(tmp_path / "memory.db"))
+    for day, query in (("2026-10-18", "énergie solaire hier"),
+                       ("2026-10-19", "énergie solaire aujourd'hui"),
+                       ("2026-10-20", "énergie solaire demain")):
+        store.append({'timestamp': f"{day}T15:30:00.123456", 'query': query,
+                      'style': "académique", 'final_content': f"Rapport sur l'énergie solaire ({day})"})
+    return store
+
+
+def test_date_only_until_includes_whole_day(tmp_path):
+    store = make_store(tmp_path)
+    result = store.search("énergie", since="2026-10-19", until="2026-10-19")
+    assert [item['query'] for item in result['results']] == ["énergie solaire aujourd'hui"]
+
+
+def test_full_timestamp_until_is_kept_as_is():
+    assert upper_date_bound("2026-10-19T12:00:00") == "2026-10-19T12:00:00"
+    assert upper_date_bound("2026-10-19") == "2026-10-19T23:59:59.999999"
+
+
+def test_repair_skips_content_when_index_is_complete(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+
+    def fail_load(include_content=True):
+        raise AssertionError("contenus relus alors que l'index est à jour")
+
+    monkeypatch.setattr(store, "load", fail_load)
+    assert store.repair_index() is False
+    assert store.search("solaire")['total'] == 3
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_repair_rebuilds_missing_index(tmp_path, backend):
+    store = make_store(tmp_path, backend)
+    store.index.clear()
+    # La recherche ne reconstruit plus l'index pendant la requête
+    assert store.search("solaire")['total'] == 0
+    assert store.repair_index() is True
+    assert store.search("solaire")['total'] == 3
+    assert store.repair_index() is False
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_entry_and_index_row_are_written_together(tmp_path, monkeypatch, backend):
+    store = make_store(tmp_path, backend)
+
+    def fail(*args):
+        raise OSError("disque plein")
+
+    # JSON: échec du fichier après la ligne d'index; SQLite: échec de l'index après l'entrée
+    if backend == "json":
+        monkeypatch.setattr(store, "_write", fail)
+    else:
+        monkeypatch.setattr(store.index, "write_entry", fail)
+    with pytest.raises(OSError):
+        store.append({'timestamp': "2026-10-19T16:00:00", 'query': "énergie solaire perdue",
+                      'style': "académique", 'final_content': "texte"})
+    monkeypatch.undo()
+    assert store.count() == store.index.count() == 3
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class ListOnlyStore(MemoryStore):
+        def list_history(self):
+            return []
+
+    with pytest.raises(TypeError):
+        ListOnlyStore()
@@ -0,0 +1,29 @@
+# tests/unit/test_multi_style.py
+import asyncio
+
+from orchestrator import MultiAgentOrchestrator
+
+
+def test_failed_styles_are_reported_instead_of_the_summary():
+    runner = MultiAgentOrchestrator()
+    edit = runner.editor_agent.execute
+
+    def failing_edit(state, *args):
+        if state.style == "journalistique":
+            state.error_message = "Erreur d'édition"
+            return state
+        if state.style == "technique":
+            raise RuntimeError("panne de l'éditeur")
+        return edit(state, *args)
+
+    runner.editor_agent.execute = failing_edit
+    result = asyncio.run(runner.process_research_request(
+        "stockage de l'hydrogène vert", styles=["académique", "journalistique", "technique"],
+        profile="no-memory"
+    ))
+
+    assert list(result["styled_contents"]) == ["académique"]
+    assert result["styled_contents"]["académique"] != result["summary"]
+    assert "journalistique" in result["failed_styles"]
+    assert "panne de l'éditeur" in result["failed_styles"]["technique"]
+    assert not result.get("error_message")
@@ -0,0 +1,40 @@
+# tests/unit/test_projection.py
+import pytest
+
+from main import dedupe_output, parse_fields, project_output
+
+
+def test_parse_fields_groups_subfields():
+    assert parse_fields(None) is None
+    assert parse_fields("final_content, search_results.url,search_results.title") == {
+        'final_content': None, 'search_results': {'url', 'title'}
+    }
+
+
+def test_whole_field_wins_over_subfields():
+    assert parse_fields("search_results.url,search_results") == {'search_results': None}
+    assert parse_fields("search_results,search_results.url") == {'search_results': None}
+
+
+@pytest.mark.parametrize("fields", ["inconnu", "summary.texte", "search_results.inconnu"])
+def test_parse_fields_rejects_unknown_fields(fields):
+    with pytest.raises(ValueError):
+        parse_fields(fields)
+
+
+def test_project_output_keeps_requested_fields():
+    output = {'query': "q", 'summary': "s",
+              'search_results': [{'url': "https://example.com", 'title': "t", 'content': "c"}]}
+    assert project_output(output, parse_fields("query,search_results.url")) == {
+        'query': "q", 'search_results': [{'url': "https://example.com"}]
+    }
+
+
+def test_dedupe_output_points_to_the_field_carrying_the_text():
+    output = dedupe_output({'final_content': "texte", 'edited_content': "texte", 'summary': "résumé",
+                            'styled_contents': {'académique': "texte", 'technique': "autre"}})
+    assert output['edited_content'] is None
+    assert output['summary'] == "résumé"
+    assert output['styled_contents'] == {'académique': None, 'technique': "autre"}
+    assert output['duplicates'] == {'edited_content': "final_content",
+                                    'styled_contents.académique': "final_content"}
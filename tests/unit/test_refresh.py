@@ -0,0 +1,101 @@
+# tests/unit/test_refresh.py
+import asyncio
+import threading
+from datetime import datetime
+
+from cache import SharedCache
+from memory_store import JsonMemoryStore
+from models import ResearchRequest
+from refresh import PopularityTracker, RefreshScheduler, result_key, result_params
+
+
+class RecordingOrchestrator:
+    def __init__(self):
+        self.refreshed = []
+
+    async def refresh_result(self, params):
+        self.refreshed.append(params)
+
+
+def make_scheduler(tmp_path):
+    store = JsonMemoryStore(str(tmp_path / "memory.json"), str(tmp_path / "content"),
+                            str(tmp_path / "index.db"))
+    tracker = PopularityTracker(str(tmp_path / "cache.db"), half_life=86400)
+    cache = SharedCache(str(tmp_path / "cache.db"))
+    orchestrator = RecordingOrchestrator()
+    scheduler = RefreshScheduler(orchestrator, tracker, cache, store, str(tmp_path / "refresh.lock"))
+    return scheduler, orchestrator, store, tracker
+
+
+def api_params(query, style="académique"):
+    # Paramètres tels que l'API les passe à l'orchestrateur (valeurs par défaut de ResearchRequest)
+    request = ResearchRequest(query=query, style=style)
+    return result_params(request.query, request.style, request.max_results,
+                         request.search_depth, request.profile)
+
+
+def test_api_request_key_is_refreshed(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.Config.REFRESH_MIN_SCORE", 2.5)
+    scheduler, orchestrator, store, tracker = make_scheduler(tmp_path)
+    params = api_params("énergie solaire")
+    for _ in range(3):
+        tracker.record_access({'params': params, 'at': datetime.now().timestamp()})
+        store.append({'timestamp': datetime.now().isoformat(), 'query': "énergie solaire",
+                      'style': "académique", 'final_content': "contenu"})
+
+    due = scheduler.select_due()
+    assert [entry['key'] for entry in due] == [result_key(params)]
+
+    result = asyncio.run(scheduler.run_once())
+    assert result['refreshed'] == 1
+    assert orchestrator.refreshed == [params]
+
+
+def test_memory_history_only_boosts_served_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.Config.REFRESH_MIN_SCORE", 2.5)
+    scheduler, _, store, tracker = make_scheduler(tmp_path)
+    for _ in range(3):
+        store.append({'timestamp': datetime.now().isoformat(), 'query': "réseaux électriques",
+                      'style': "académique", 'final_content': "contenu"})
+    # Historique seul: aucune clé servie, rien à rafraîchir
+    assert scheduler.select_due() == []
+
+    params = api_params("Réseaux   électriques")
+    tracker.record_access({'params': params, 'at': datetime.now().timestamp()})
+    due = scheduler.select_due()
+    assert [entry['key'] for entry in due] == [result_key(params)]
+    assert due[0]["score"] > 2.5
+
+
+def test_cached_entry_far_from_expiry_is_not_due(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.Config.REFRESH_MIN_SCORE", 1.0)
+    scheduler, _, _, tracker = make_scheduler(tmp_path)
+    params = api_params("stockage batteries")
+    tracker.record_access({'params': params, 'at': datetime.now().timestamp()})
+    scheduler.cache.set(result_key(params), {'final_result': "x"}, ttl=3600)
+    monkeypatch.setattr("config.Config.REFRESH_AHEAD_SECONDS", 600)
+    assert scheduler.select_due() == []
+
+
+def test_stale_hit_reserves_refresh_off_the_event_loop():
+    from orchestrator import MultiAgentOrchestrator
+
+    runner = MultiAgentOrchestrator()
+    params = result_params("hydroliennes fluviales", "académique", None, None, "no-memory")
+    runner.cache.set(result_key(params), {'query': params['query'], 'summary': "ancien résumé"}, ttl=-1)
+    reservations = []
+
+    def try_reserve_run(key, max_per_hour):
+        reservations.append(threading.current_thread() is threading.main_thread())
+        return True
+
+    runner.popularity.try_reserve_run = try_reserve_run
+
+    async def scenario():
+        state = await runner.process_research_request(params['query'], profile="no-memory")
+        await asyncio.gather(*runner._flights.values())
+        return state
+
+    state = asyncio.run(scenario())
+    assert state["stale"] and state["summary"] == "ancien résumé"
+    assert reservations == [False]
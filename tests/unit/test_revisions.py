@@ -0,0 +1,89 @@
+# tests/unit/test_revisions.py
+import asyncio
+import threading
+
+import pytest
+
+from orchestrator import MultiAgentOrchestrator
+from runs import RevisionConflict, RunStore
+
+
+def revise_with(text):
+    def revise(state, current_text, instructions):
+        state.edited_content = f"{current_text}\n[{instructions}] {text}"
+        return state
+    return revise
+
+
+def test_add_revision_rejects_stale_base(tmp_path):
+    runs = RunStore(str(tmp_path / "runs.db"))
+    assert runs.add_revision("run", "plus court", "v1", base_revision=0) == 1
+    with pytest.raises(RevisionConflict):
+        runs.add_revision("run", "plus long", "v1 bis", base_revision=0)
+    assert runs.add_revision("run", "plus long", "v2", base_revision=1) == 2
+    assert [r['edited_content'] for r in runs.revisions("run")] == ["v1", "v2"]
+
+
+def test_cached_results_get_their_own_run_id():
+    runner = MultiAgentOrchestrator()
+    runner.editor_agent.revise = revise_with("révisé")
+    query = "isolation thermique des bâtiments anciens"
+
+    async def scenario():
+        first = await runner.process_research_request(query, profile="no-memory")
+        second = await runner.process_research_request(query, profile="no-memory")
+        revised = await runner.resume_run(first["run_id"], "ajoute un exemple")
+        other = await runner.resume_run(second["run_id"], "raccourcis")
+        return first, second, revised, other
+
+    first, second, revised, other = asyncio.run(scenario())
+    assert second.get("cache_hit")
+    assert first["run_id"] != second["run_id"]
+    assert revised["revision"] == other["revision"] == 1
+    # La révision du second appelant repart de son propre texte, pas de celle du premier
+    assert "ajoute un exemple" not in other["edited_content"]
+    assert runner.runs.revisions(first["run_id"])[0]['instructions'] == "ajoute un exemple"
+
+
+def test_coalesced_requests_get_their_own_run_id():
+    runner = MultiAgentOrchestrator()
+    query = "recyclage des batteries lithium-ion"
+
+    async def scenario():
+        return await asyncio.gather(*[
+            runner.process_research_request(query, profile="no-memory") for _ in range(2)
+        ])
+
+    owner, follower = asyncio.run(scenario())
+    assert follower.get("coalesced")
+    assert owner["run_id"] and follower["run_id"] and owner["run_id"] != follower["run_id"]
+
+
+def test_concurrent_revisions_do_not_overwrite_each_other():
+    runner = MultiAgentOrchestrator()
+    both_started = threading.Barrier(2, timeout=5)
+
+    def revise(state, current_text, instructions):
+        # Les deux révisions lisent le même texte de base avant d'enregistrer
+        both_started.wait()
+        return revise_with("révisé")(state, current_text, instructions)
+
+    runner.editor_agent.revise = revise
+
+    async def scenario():
+        result = await runner.process_research_request("géothermie de surface", profile="no-memory")
+        return result["run_id"], await asyncio.gather(
+            runner.resume_run(result["run_id"], "plus court"),
+            runner.resume_run(result["run_id"], "plus long"),
+            return_exceptions=True
+        )
+
+    run_id, outcomes = asyncio.run(scenario())
+    assert sorted(type(outcome).__name__ for outcome in outcomes) == ["RevisionConflict", "dict"]
+    assert len(runner.runs.revisions(run_id)) == 1
+
+
+def test_unknown_run_is_rejected():
+    runner = MultiAgentOrchestrator()
+    with pytest.raises(KeyError):
+        asyncio.run(runner.resume_run("inconnu", "plus court"))
@@ -0,0 +1,38 @@
+# tests/unit/test_sources.py
+import pytest
+
+from sources import canonical_url, dedupe_results, source_id
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTP://WWW.Example.com/Page/", "https://example.com/Page"),
+    ("https://example.com:443/a?b=2&a=1", "https://example.com/a?a=1&b=2"),
+    ("http://example.com:8080/a", "https://example.com:8080/a"),
+    ("https://example.com/a?utm_source=x&id=3&fbclid=y#section", "https://example.com/a?id=3"),
+    ("https://example.com", "https://example.com/"),
+    ("pas une url", "pas une url"),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_variants_share_a_source_id():
+    assert source_id("http://www.example.com/a/?utm_medium=mail") == source_id("https://example.com/a")
+
+
+def test_dedupe_keeps_first_occurrence_of_url_and_content():
+    results = [
+        {'url': "https://example.com/a", 'content': "texte A", 'score': 0.9},
+        {'url': "http://www.example.com/a/?utm_source=x", 'content': "texte A modifié", 'score': 0.8},
+        {'url': "https://miroir.example.org/a", 'content': "texte A", 'score': 0.7},
+        {'url': "https://example.com/b", 'content': "texte B", 'score': 0.6},
+    ]
+    assert [r['score'] for r in dedupe_results(results)] == [0.9, 0.6]
+
+
+def test_dedupe_does_not_merge_results_without_content():
+    results = [
+        {'url': "https://example.com/a", 'content': ""},
+        {'url': "https://example.com/b"},
+    ]
+    assert len(dedupe_results(results)) == 2
@@ -0,0 +1,47 @@
+# tests/unit/test_token_budget.py
+import asyncio
+
+from orchestrator import MultiAgentOrchestrator
+from refresh import result_key, result_params
+
+
+def test_budget_has_its_own_result_key():
+    unbudgeted = result_params("marées", "académique", 5, None, "no-memory")
+    budgeted = result_params("marées", "académique", 5, None, "no-memory", token_budget=3000)
+    assert 'token_budget' not in unbudgeted
+    assert result_key(budgeted) != result_key(unbudgeted)
+    assert result_key(result_params("marées", "académique", 5, None, "no-memory", None)) == result_key(unbudgeted)
+
+
+def test_budgeted_run_is_not_served_to_unbudgeted_request():
+    runner = MultiAgentOrchestrator()
+    query = "courants de marée et production d'électricité"
+
+    async def scenario():
+        budgeted = await runner.process_research_request(query, max_results=5, profile="no-memory",
+                                                         token_budget=3000)
+        unbudgeted = await runner.process_research_request(query, max_results=5, profile="no-memory")
+        again = await runner.process_research_request(query, max_results=5, profile="no-memory",
+                                                      token_budget=3000)
+        return budgeted, unbudgeted, again
+
+    budgeted, unbudgeted, again = asyncio.run(scenario())
+    assert budgeted["token_usage"]
+    assert not unbudgeted.get("cache_hit")
+    assert again.get("cache_hit")
+
+
+def test_budgeted_request_does_not_join_unbudgeted_flight():
+    runner = MultiAgentOrchestrator()
+    query = "stockage d'énergie par air comprimé"
+
+    async def scenario():
+        first = asyncio.ensure_future(runner.process_research_request(query, profile="no-memory"))
+        await asyncio.sleep(0)
+        second = await runner.process_research_request(query, profile="no-memory", token_budget=3000)
+        return await first, second
+
+    first, second = asyncio.run(scenario())
+    assert not second.get("coalesced")
+    assert second.get("token_budget") == 3000
+    assert first.get("token_budget") is None
@@ -0,0 +1,82 @@
+# tests/unit/test_usage.py
+import pytest
+
+from agents import SummarizerAgent
+from config import Config
+from models import AgentState
+from offline import OfflineModel
+from usage import MIN_CALL_TOKENS, BudgetExceeded, UsageLedger, check_daily_budget, plan_call
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return UsageLedger(str(tmp_path / "usage.db"))
+
+
+def usage(tokens):
+    return {'input_tokens': tokens, 'output_tokens': 0, 'calls': 1, 'cost_usd': 0.0}
+
+
+def test_no_budget_keeps_default_limits(ledger, monkeypatch):
+    monkeypatch.setattr(Config, "REQUEST_TOKEN_BUDGET", 0)
+    plan = plan_call(ledger, None, 100_000)
+    assert plan.max_output_tokens == Config.GEMINI_MAX_TOKENS
+    assert plan.max_input_tokens is None
+
+
+def test_output_is_capped_to_a_quarter_of_the_remaining_budget(ledger):
+    plan = plan_call(ledger, usage(2000), 100, run_budget=6000)
+    assert plan.max_output_tokens == 1000
+    assert plan.max_input_tokens is None
+
+
+def test_context_is_limited_when_prompt_does_not_fit(ledger):
+    plan = plan_call(ledger, None, 5000, run_budget=4000)
+    assert plan.max_output_tokens == 1000
+    assert plan.max_input_tokens == 3000
+
+
+def test_call_is_refused_below_min_call_tokens(ledger):
+    with pytest.raises(BudgetExceeded):
+        plan_call(ledger, usage(1000), 10, run_budget=1000 + MIN_CALL_TOKENS - 1)
+    plan = plan_call(ledger, usage(1000), 10, run_budget=1000 + MIN_CALL_TOKENS)
+    assert plan.max_output_tokens == MIN_CALL_TOKENS // 2
+
+
+def test_daily_budget_downgrades_then_refuses(ledger, monkeypatch):
+    monkeypatch.setattr(Config, "DAILY_TOKEN_BUDGET", 1000)
+    monkeypatch.setattr(Config, "BUDGET_DOWNGRADE_RATIO", 0.5)
+    monkeypatch.setattr(Config, "GEMINI_BUDGET_MODEL", "modele-economique")
+    ledger.record("académique", Config.GEMINI_MODEL, 600, 0)
+    assert plan_call(ledger, None, 10).model == "modele-economique"
+    ledger.record("académique", Config.GEMINI_MODEL, 400, 0)
+    with pytest.raises(BudgetExceeded):
+        check_daily_budget(ledger)
+
+
+class RecordingModel(OfflineModel):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        self.calls.append((prompt, generation_config))
+        return super().generate_content(prompt, generation_config, **kwargs)
+
+
+def test_generate_shrinks_context_to_the_budget(ledger):
+    agent = SummarizerAgent()
+    agent.ledger = ledger
+    model = agent._models[Config.GEMINI_MODEL] = RecordingModel()
+    state = AgentState(query="q", token_budget=2000)
+    long_prompt = "x" * 40_000
+
+    agent.generate(state, long_prompt, shrink=lambda max_tokens: "y" * (max_tokens * 4))
+    [(prompt, config)] = model.calls
+    assert config['max_output_tokens'] == 500
+    assert len(prompt) == 1500 * 4
+    assert state.token_usage['calls'] == 1
+
+    with pytest.raises(BudgetExceeded):
+        agent.generate(AgentState(query="q", token_budget=2000), long_prompt)
+    assert len(model.calls) == 1
@@ -0,0 +1,72 @@
+# tests/unit/test_workflow.py
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import orchestrator as orchestrator_module
+from orchestrator import PIPELINE_PROFILES, STAGES, MultiAgentOrchestrator, stage_dependencies
+
+
+def test_full_profile_runs_independent_stages_in_parallel():
+    dependencies = stage_dependencies(PIPELINE_PROFILES["full"]["stages"])
+    assert dependencies["sources"] == ["research"]
+    assert dependencies["summarize"] == ["research"]
+    assert sorted(dependencies["edit"]) == ["sources", "summarize"]
+    assert dependencies["validate"] == ["edit"]
+    assert dependencies["feedback_node"] == ["edit"]
+    assert sorted(dependencies["review"]) == ["feedback_node", "validate"]
+    assert dependencies["finalize"] == ["review"]
+
+
+def test_linear_build_chains_profile_stages():
+    stages = PIPELINE_PROFILES["summary-only"]["stages"]
+    assert stage_dependencies(stages, parallel=False) == {
+        "research": [], "sources": ["research"], "summarize": ["sources"], "finalize": ["summarize"]
+    }
+
+
+def test_join_of_unequal_branches_is_rejected(monkeypatch):
+    stages = {**STAGES, "edit": {**STAGES["edit"], "after": ["summarize", "research"]}}
+    monkeypatch.setattr(orchestrator_module, "STAGES", stages)
+    with pytest.raises(ValueError, match="longueurs différentes"):
+        stage_dependencies(["research", "sources", "summarize", "edit"])
+
+
+def test_parallel_stages_writing_same_field_are_rejected(monkeypatch):
+    stages = {**STAGES, "sources": {**STAGES["sources"], "writes": ["summary"]}}
+    monkeypatch.setattr(orchestrator_module, "STAGES", stages)
+    with pytest.raises(ValueError, match="même champ"):
+        stage_dependencies(["research", "sources", "summarize"])
+
+
+def test_rejected_drafts_are_edited_again_until_approved():
+    runner = MultiAgentOrchestrator()
+    verdicts = iter([False, False, True])
+    calls = {'edit': 0, 'feedback': 0}
+    edit, feedback = runner.editor_agent.execute, runner.feedback_agent.execute
+
+    def counted_edit(state, *args):
+        calls['edit'] += 1
+        return edit(state, *args)
+
+    def counted_feedback(state):
+        calls['feedback'] += 1
+        return feedback(state)
+
+    def validate(state):
+        state.validation_approved = next(verdicts)
+        return state
+
+    runner.editor_agent.execute = counted_edit
+    runner.feedback_agent.execute = counted_feedback
+    runner.validator_agent.execute = validate
+
+    state = asyncio.run(runner.get_workflow("full").ainvoke(
+        {'query': "énergie et climat", 'style': "académique", 'timestamp': datetime.now()}
+    ))
+    assert state['validation_approved'] is True
+    assert state['final_result'] == state['edited_content']
+    assert state['feedback']
+    assert calls == {'edit': 3, 'feedback': 3}
+    assert {"sources", "summarize", "review", "finalize"} <= set(state['completed_stages'])
@@ -0,0 +1,244 @@
+# usage.py
+"""
+Comptabilité des tokens Gemini et budgets.
+
+Chaque appel au modèle est compté: tokens d'entrée et de sortie renvoyés par
+``usage_metadata``, ou estimés localement (environ 4 caractères par token) si
+la réponse n'en fournit pas. Les totaux sont cumulés:
+- par exécution, dans ``AgentState.token_usage`` (conservé avec l'exécution
+  et dans l'entrée de mémoire)
+- par jour, style et modèle dans un registre SQLite partagé entre workers,
+  exposé par ``/usage``
+
+Avant chaque appel, ``plan_call`` applique les budgets:
+- budget quotidien global (``DAILY_TOKEN_BUDGET``): au-delà de
+  ``BUDGET_DOWNGRADE_RATIO``, les appels passent sur ``GEMINI_BUDGET_MODEL``;
+  une fois épuisé, les nouveaux appels sont refusés
+- budget par exécution (``REQUEST_TOKEN_BUDGET`` ou ``token_budget`` de la
+  requête): la sortie est plafonnée au reste du budget, le contexte est
+  réduit s'il ne tient plus, l'appel est refusé s'il ne reste rien d'utile
+"""
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from metrics import metrics
+
+# Estimation locale faute de métadonnées d'usage
+CHARS_PER_TOKEN = 4
+
+# En dessous de ce reste de budget, un appel ne produirait rien d'exploitable
+MIN_CALL_TOKENS = 256
+
+
+class BudgetExceeded(RuntimeError):
+    """Budget de tokens (quotidien ou de l'exécution) épuisé"""
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // CHARS_PER_TOKEN)
+
+
+def response_usage(response: Any, prompt: str, text: str) -> Tuple[int, int]:
+    """Tokens d'entrée et de sortie d'une réponse, estimés si ``usage_metadata`` manque"""
+    metadata = getattr(response, 'usage_metadata', None)
+    input_tokens = getattr(metadata, 'prompt_token_count', 0) or 0
+    output_tokens = getattr(metadata, 'candidates_token_count', 0) or 0
+    if not input_tokens:
+        input_tokens = estimate_tokens(prompt)
+        metrics.increment("token_usage_estimated")
+    if not output_tokens:
+        output_tokens = estimate_tokens(text)
+    return input_tokens, output_tokens
+
+
+def call_cost(input_tokens: int, output_tokens: int) -> float:
+    """Coût estimé d'un appel en USD"""
+    return (input_tokens * Config.GEMINI_INPUT_COST_PER_1M
+            + output_tokens * Config.GEMINI_OUTPUT_COST_PER_1M) / 1_000_000
+
+
+def add_usage(usage: Optional[Dict[str, Any]], model: str,
+              input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    """Cumul d'un appel dans l'usage d'une exécution (nouveau dictionnaire)"""
+    usage = dict(usage or {'input_tokens': 0, 'output_tokens': 0, 'calls': 0, 'cost_usd': 0.0})
+    usage['input_tokens'] += input_tokens
+    usage['output_tokens'] += output_tokens
+    usage['calls'] += 1
+    usage['cost_usd'] = round(usage['cost_usd'] + call_cost(input_tokens, output_tokens), 6)
+    models = dict(usage.get('models') or {})
+    models[model] = models.get(model, 0) + input_tokens + output_tokens
+    usage['models'] = models
+    return usage
+
+
+def total_tokens(usage: Optional[Dict[str, Any]]) -> int:
+    if not usage:
+        return 0
+    return usage.get('input_tokens', 0) + usage.get('output_tokens', 0)
+
+
+class UsageLedger:
+    """Tokens consommés par jour, style et modèle, persistés dans SQLite"""
+
+    # Durée de validité du total du jour lu avant chaque appel
+    TOTAL_TTL = 5.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._today_total: Optional[Tuple[str, float, int]] = None
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS token_usage (
+                    day TEXT NOT NULL,
+                    style TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    input_tokens INTEGER NOT NULL DEFAULT 0,
+                    output_tokens INTEGER NOT NULL DEFAULT 0,
+                    cost_usd REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, style, model)
+                )
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def record(self, style: str, model: str, input_tokens: int, output_tokens: int) -> None:
+        day = date.today().isoformat()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO token_usage (day, style, model, calls, input_tokens, output_tokens, cost_usd) "
+                "VALUES (?, ?, ?, 1, ?, ?, ?) ON CONFLICT (day, style, model) DO UPDATE SET "
+                "calls = calls + 1, input_tokens = input_tokens + excluded.input_tokens, "
+                "output_tokens = output_tokens + excluded.output_tokens, "
+                "cost_usd = cost_usd + excluded.cost_usd",
+                (day, style or "", model, input_tokens, output_tokens, call_cost(input_tokens, output_tokens))
+            )
+        metrics.increment("gemini_input_tokens", input_tokens)
+        metrics.increment("gemini_output_tokens", output_tokens)
+        with self._lock:
+            # Les appels du worker sont ajoutés sans relire la base
+            if self._today_total and self._today_total[0] == day:
+                self._today_total = (day, self._today_total[1],
+                                     self._today_total[2] + input_tokens + output_tokens)
+
+    def today_total(self) -> int:
+        """Tokens consommés aujourd'hui par tous les workers (relu au plus toutes les ``TOTAL_TTL`` s)"""
+        day = date.today().isoformat()
+        with self._lock:
+            cached = self._today_total
+            if cached and cached[0] == day and time.monotonic() - cached[1] < self.TOTAL_TTL:
+                return cached[2]
+        row = self._connection().execute(
+            "SELECT COALESCE(SUM(input_tokens + output_tokens), 0) FROM token_usage WHERE day = ?", (day,)
+        ).fetchone()
+        with self._lock:
+            self._today_total = (day, time.monotonic(), row[0])
+        return row[0]
+
+    def summary(self, days: int = 7) -> Dict[str, Any]:
+        """Usage des ``days`` derniers jours: par jour, par style et par modèle"""
+        since = (date.today() - timedelta(days=max(0, days - 1))).isoformat()
+        rows = self._connection().execute(
+            "SELECT day, style, model, calls, input_tokens, output_tokens, cost_usd "
+            "FROM token_usage WHERE day >= ? ORDER BY day", (since,)
+        ).fetchall()
+        by_day: Dict[str, Dict[str, Any]] = {}
+        by_style: Dict[str, Dict[str, Any]] = {}
+        by_model: Dict[str, Dict[str, Any]] = {}
+        for day, style, model, calls, input_tokens, output_tokens, cost in rows:
+            for group, key in ((by_day, day), (by_style, style), (by_model, model)):
+                entry = group.setdefault(key, {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0})
+                entry['calls'] += calls
+                entry['input_tokens'] += input_tokens
+                entry['output_tokens'] += output_tokens
+                entry['cost_usd'] = round(entry['cost_usd'] + cost, 6)
+        return {'since': since, 'by_day': by_day, 'by_style': by_style, 'by_model': by_model}
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class CallPlan:
+    """Paramètres d'un appel au modèle après application des budgets"""
+
+    def __init__(self, model: str, max_output_tokens: int, max_input_tokens: Optional[int] = None):
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        # None: pas de limite sur le prompt
+        self.max_input_tokens = max_input_tokens
+
+
+def budget_status(ledger: "UsageLedger") -> Dict[str, Any]:
+    """État du budget quotidien"""
+    used = ledger.today_total()
+    budget = Config.DAILY_TOKEN_BUDGET
+    return {
+        'daily_budget': budget,
+        'used_today': used,
+        'remaining_today': max(0, budget - used) if budget else None,
+        'downgraded': bool(budget and Config.GEMINI_BUDGET_MODEL
+                           and used >= budget * Config.BUDGET_DOWNGRADE_RATIO),
+        'exhausted': bool(budget and used >= budget),
+        'request_budget': Config.REQUEST_TOKEN_BUDGET
+    }
+
+
+def check_daily_budget(ledger: "UsageLedger") -> None:
+    """Refuse une nouvelle exécution si le budget quotidien est épuisé"""
+    if Config.DAILY_TOKEN_BUDGET and ledger.today_total() >= Config.DAILY_TOKEN_BUDGET:
+        metrics.increment("budget_refusals_daily")
+        raise BudgetExceeded("Budget quotidien de tokens épuisé")
+
+
+def plan_call(ledger: "UsageLedger", run_usage: Optional[Dict[str, Any]],
+              prompt_tokens: int, run_budget: Optional[int] = None) -> CallPlan:
+    """Modèle, plafond de sortie et taille maximale du prompt pour le prochain appel"""
+    check_daily_budget(ledger)
+    model = Config.GEMINI_MODEL
+    if (Config.DAILY_TOKEN_BUDGET and Config.GEMINI_BUDGET_MODEL
+            and ledger.today_total() >= Config.DAILY_TOKEN_BUDGET * Config.BUDGET_DOWNGRADE_RATIO):
+        model = Config.GEMINI_BUDGET_MODEL
+        metrics.increment("budget_model_downgrades")
+
+    plan = CallPlan(model, Config.GEMINI_MAX_TOKENS)
+    budget = run_budget or Config.REQUEST_TOKEN_BUDGET
+    if not budget:
+        return plan
+
+    remaining = budget - total_tokens(run_usage)
+    if remaining < MIN_CALL_TOKENS:
+        metrics.increment("budget_refusals_request")
+        raise BudgetExceeded(f"Budget de l'exécution épuisé ({budget} tokens)")
+    # Sortie plafonnée au quart du reste: le prompt garde l'essentiel du budget
+    plan.max_output_tokens = max(MIN_CALL_TOKENS // 2, min(plan.max_output_tokens, remaining // 4))
+    if prompt_tokens + plan.max_output_tokens > remaining:
+        plan.max_input_tokens = remaining - plan.max_output_tokens
+    return plan
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+def get_usage_ledger() -> UsageLedger:
+    """Registre d'usage du processus"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger(Config.USAGE_DB_FILE)
+        return _ledger